@@ -0,0 +1,121 @@
+// Draws the hexapod on the figure of a page in the browser,
+// given the payload of the page callback (see HexapodPlotter.make_payload)
+// whose coordinates are encoded by hexapod.plotter.encode_array
+// This is what HexapodPlotter.update() then change_camera_view() do on the server
+//
+// The rows of the points of the hexapod (see VirtualHexapod.points)
+// - rows 4i to 4i + 3 are the body contact, coxia, femur and tibia points of leg i
+//   (the body contact of leg i is also the vertex i of the hexagon)
+// - row 24 is the center of gravity
+// - row 25 is the head
+var HEXAPOD_VERTEX_ROWS = [0, 4, 8, 12, 16, 20];
+var HEXAPOD_COG_ROW = 24;
+var HEXAPOD_HEAD_ROW = 25;
+
+var HEXAPOD_TYPED_ARRAYS = {
+    float32: Float32Array,
+    int16: Int16Array,
+    int32: Int32Array,
+};
+
+// The array of numbers encoded by hexapod.plotter.encode_array
+function hexapodDecodeArray(encoded) {
+    if (Array.isArray(encoded)) {
+        return encoded;
+    }
+
+    var text = atob(encoded.data);
+    var bytes = new Uint8Array(text.length);
+    for (var i = 0; i < text.length; i++) {
+        bytes[i] = text.charCodeAt(i);
+    }
+
+    var values = Array.from(new HEXAPOD_TYPED_ARRAYS[encoded.dtype](bytes.buffer));
+    if (encoded.scale) {
+        var scale = encoded.scale;
+        return values.map(function (value) {
+            return value * scale;
+        });
+    }
+    return values;
+}
+
+function hexapodTraceXYZ(points, rows, dz) {
+    var x = [];
+    var y = [];
+    var z = [];
+    rows.forEach(function (row) {
+        x.push(points[3 * row]);
+        y.push(points[3 * row + 1]);
+        z.push(points[3 * row + 2] + dz);
+    });
+    return { x: x, y: y, z: z };
+}
+
+function hexapodAxisXYZ(cog, end) {
+    return {
+        x: [cog.x[0], end[0]],
+        y: [cog.y[0], end[1]],
+        z: [cog.z[0], end[2]],
+    };
+}
+
+function drawHexapod(payload, relayoutData, figure) {
+    if (!payload || !figure) {
+        return window.dash_clientside.no_update;
+    }
+
+    var points = hexapodDecodeArray(payload.points);
+    var scale = payload.scale;
+    var xyz = [];
+
+    // Body surface mesh and body outline
+    var bodyRows = HEXAPOD_VERTEX_ROWS.concat([HEXAPOD_VERTEX_ROWS[0]]);
+    xyz[0] = hexapodTraceXYZ(points, bodyRows, 0);
+    xyz[1] = xyz[0];
+
+    var cog = hexapodTraceXYZ(points, [HEXAPOD_COG_ROW], 0);
+    xyz[2] = cog;
+    xyz[3] = hexapodTraceXYZ(points, [HEXAPOD_HEAD_ROW], 0);
+
+    for (var i = 0; i < 6; i++) {
+        xyz[4 + i] = hexapodTraceXYZ(points, [4 * i, 4 * i + 1, 4 * i + 2, 4 * i + 3], 0);
+    }
+
+    // Support polygon mesh, slightly below the ground
+    xyz[10] = hexapodTraceXYZ(points, payload.contacts, -1);
+
+    // The local frame of the hexapod and the global frame
+    var axes = hexapodDecodeArray(payload.axes);
+    for (var j = 0; j < 3; j++) {
+        xyz[11 + j] = hexapodAxisXYZ(cog, axes.slice(3 * j, 3 * j + 3));
+    }
+    xyz[14] = { x: [0, scale], y: [0, 0], z: [0, 0] };
+    xyz[15] = { x: [0, 0], y: [0, scale], z: [0, 0] };
+    xyz[16] = { x: [0, 0], y: [0, 0], z: [0, scale] };
+
+    var data = figure.data.map(function (trace, k) {
+        return Object.assign({}, trace, xyz[k]);
+    });
+
+    // Change range of view for all axes
+    var range = payload.range;
+    var zStart = -10;
+    var scene = Object.assign({}, figure.layout.scene);
+    scene.xaxis = Object.assign({}, scene.xaxis, { range: [-range, range] });
+    scene.yaxis = Object.assign({}, scene.yaxis, { range: [-range, range] });
+    scene.zaxis = Object.assign({}, scene.zaxis, {
+        range: [zStart, (range - zStart) * 2],
+    });
+
+    if (relayoutData && relayoutData["scene.camera"]) {
+        scene.camera = relayoutData["scene.camera"];
+    }
+
+    var layout = Object.assign({}, figure.layout, { scene: scene });
+    return { data: data, layout: layout };
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    hexapod: { drawHexapod: drawHexapod },
+});
@@ -0,0 +1,50 @@
+# Compare hexapod.kinematics.batch_forward
+# with looping VirtualHexapod.update over the same poses
+#
+# $ python -m benchmarks.bench_batch_forward
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.kinematics import batch_forward
+from hexapod.const import BASE_DIMENSIONS, NAMES_LEG
+
+POSE_COUNT = 1000
+
+
+def make_poses(angles):
+    return {
+        i: {
+            "id": i,
+            "name": NAMES_LEG[i],
+            "coxia": angles[i, 0],
+            "femur": angles[i, 1],
+            "tibia": angles[i, 2],
+        }
+        for i in range(VirtualHexapod.LEG_COUNT)
+    }
+
+
+def loop_update(dimensions, all_poses):
+    for poses in all_poses:
+        try:
+            VirtualHexapod(dimensions).update(poses)
+        except Exception:
+            pass
+
+
+def main():
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(-1, 1, (POSE_COUNT, 6, 3)) * [30, 60, 60]
+    all_poses = [make_poses(pose_angles) for pose_angles in angles]
+
+    loop_time = timeit.timeit(lambda: loop_update(BASE_DIMENSIONS, all_poses), number=1)
+    batch_time = timeit.timeit(lambda: batch_forward(BASE_DIMENSIONS, angles), number=1)
+
+    print(f"poses: {POSE_COUNT}")
+    print(f"VirtualHexapod.update loop: {loop_time * 1e3:10.2f} ms")
+    print(f"batch_forward:              {batch_time * 1e3:10.2f} ms")
+    print(f"speedup:                    {loop_time / batch_time:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Time the ground contact solver of the kinematics page (with the random tie break)
+# over the poses of a slider drag (each pose is a small step from the one before)
+# searching all leg trios, or starting from the ground contacts
+# of the pose before (see hexapod.ground_contact_solver.tracker)
+#
+# $ python -m benchmarks.bench_contact_tracker
+import random
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.const import BASE_DIMENSIONS
+from hexapod.ground_contact_solver import ground_contact_solver2 as gc2
+from hexapod.ground_contact_solver.tracker import ContactTracker
+
+STEP_COUNT = 500
+REPEAT = 3
+
+
+def make_drag(step_count):
+    # The 18 angles of each pose of the drag
+    rng = np.random.default_rng(0)
+    steps = rng.uniform(-1, 1, (step_count, 6, 3))
+    start = rng.uniform(-1, 1, (6, 3)) * [20, 40, 40]
+    return np.clip(start + np.cumsum(steps, axis=0), -60, 60)
+
+
+def make_all_legs(dimensions, drag):
+    all_legs = []
+    for angles in drag:
+        hexapod = VirtualHexapod(dimensions)
+        for leg, (alpha, beta, gamma) in zip(hexapod.legs, angles.tolist()):
+            leg.change_pose(alpha, beta, gamma)
+        all_legs.append(hexapod.legs)
+    return all_legs
+
+
+def main():
+    all_legs = make_all_legs(BASE_DIMENSIONS, make_drag(STEP_COUNT))
+    print(f"poses: {STEP_COUNT}")
+
+    tracker = ContactTracker()
+    rng = random.Random(0)
+
+    def loop(tracker):
+        for legs in all_legs:
+            gc2.compute_orientation_properties(legs, rng=rng, tracker=tracker)
+
+    full = min(timeit.repeat(lambda: loop(None), number=1, repeat=REPEAT))
+    tracked = min(timeit.repeat(lambda: loop(tracker), number=1, repeat=REPEAT))
+    print("ground_contact_solver2")
+    print(f"  {'full search':30} {full / STEP_COUNT * 1e6:10.2f} us")
+    print(f"  {'tracked':30} {tracked / STEP_COUNT * 1e6:10.2f} us")
+    print(f"  {tracker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Compare hexapod.ik_solver.ik_kernel.inverse_kinematics_batch
+# with looping ik_solver2.inverse_kinematics_update
+# and ik_kernel.compute_ik over the same ik parameters
+#
+# $ python -m benchmarks.bench_ik_batch
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.const import BASE_DIMENSIONS
+from hexapod.ik_solver.ik_solver2 import inverse_kinematics_update
+from hexapod.ik_solver.ik_kernel import (
+    IK_PARAMETER_NAMES,
+    compute_ik,
+    inverse_kinematics_batch,
+)
+
+BATCH_SIZE = 100000
+LOOP_SIZE = 1000
+
+
+def loop_update(dimensions, all_ik_parameters):
+    for ik_parameters in all_ik_parameters:
+        try:
+            inverse_kinematics_update(VirtualHexapod(dimensions), ik_parameters)
+        except Exception:
+            pass
+
+
+def loop_kernel(dimensions, all_ik_parameters):
+    for ik_parameters in all_ik_parameters:
+        compute_ik(dimensions, ik_parameters)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    limits = [45, 90, 0.5, 0.5, 0.5, 15, 15, 15]
+    params = rng.uniform(-1, 1, (BATCH_SIZE, 8)) * limits
+    all_ik_parameters = [
+        dict(zip(IK_PARAMETER_NAMES, row)) for row in params[:LOOP_SIZE].tolist()
+    ]
+
+    def per_pose(function, args, count):
+        return timeit.timeit(lambda: function(BASE_DIMENSIONS, args), number=1) / count
+
+    update_time = per_pose(loop_update, all_ik_parameters, LOOP_SIZE)
+    kernel_time = per_pose(loop_kernel, all_ik_parameters, LOOP_SIZE)
+    batch_time = per_pose(inverse_kinematics_batch, params, BATCH_SIZE)
+    _, valid, _ = inverse_kinematics_batch(BASE_DIMENSIONS, params)
+
+    print(f"poses: {BATCH_SIZE} ({np.count_nonzero(valid)} possible)")
+    for name, time in [
+        ("inverse_kinematics_update loop", update_time),
+        ("compute_ik loop", kernel_time),
+        ("inverse_kinematics_batch", batch_time),
+    ]:
+        print(f"{name:32} {time * 1e6:10.2f} us {60 / time:14.0f} poses per minute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Frames per second of the inverse kinematics of a trajectory
+# (small steps of the ik parameters, the stance changes once in a while)
+# ik_solver2.inverse_kinematics_update and ik_kernel.compute_ik in a loop
+# and ik_trajectory.ik_trajectory (a wrapper of compute_ik which keeps
+# the stance between frames, it is about as fast as the compute_ik loop)
+#
+# $ python -m benchmarks.bench_ik_trajectory
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.const import BASE_DIMENSIONS
+from hexapod.ik_solver.ik_solver2 import try_inverse_kinematics_update
+from hexapod.ik_solver.ik_kernel import IK_PARAMETER_NAMES, compute_ik
+from hexapod.ik_solver.ik_trajectory import ik_trajectory
+
+FRAME_COUNT = 2000
+STANCE_EVERY = 50
+REPEAT = 3
+
+
+def make_trajectory(frame_count, stance_every):
+    rng = np.random.default_rng(0)
+    limits = np.array([45, 90, 0.5, 0.5, 0.5, 15, 15, 15])
+    steps = rng.uniform(-0.02, 0.02, (frame_count, 8)) * limits
+    steps[np.arange(frame_count) % stance_every != 0, :2] = 0
+    params = np.clip(np.cumsum(steps, axis=0), -limits / 2, limits / 2)
+    return [dict(zip(IK_PARAMETER_NAMES, row)) for row in params.tolist()]
+
+
+def loop_update(dimensions, trajectory):
+    hexapod = VirtualHexapod(dimensions)
+    for ik_parameters in trajectory:
+        try_inverse_kinematics_update(hexapod, ik_parameters)
+
+
+def loop_kernel(dimensions, trajectory):
+    for ik_parameters in trajectory:
+        compute_ik(dimensions, ik_parameters)
+
+
+def loop_trajectory(dimensions, trajectory):
+    for _ in ik_trajectory(dimensions, trajectory):
+        pass
+
+
+def main():
+    trajectory = make_trajectory(FRAME_COUNT, STANCE_EVERY)
+    frames = ik_trajectory(BASE_DIMENSIONS, trajectory)
+    possible = sum(status.max() <= 1 for _, status in frames)
+    print(f"frames: {FRAME_COUNT} ({possible} possible)")
+    print(f"stances found by ik_trajectory: {frames.stance_count}")
+
+    for name, loop in [
+        ("inverse_kinematics_update loop", loop_update),
+        ("compute_ik loop", loop_kernel),
+        ("ik_trajectory", loop_trajectory),
+    ]:
+        time = min(
+            timeit.repeat(
+                lambda: loop(BASE_DIMENSIONS, trajectory), number=1, repeat=REPEAT
+            )
+        )
+        print(f"{name:32} {FRAME_COUNT / time:10.0f} frames per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Time the update of the kinematics page while one joint is dragged at a time,
+# building a new hexapod for each update or reusing the same one
+# (reset then update, as the hexapods of hexapod.pool are)
+# which only poses the leg which changed and, given the tracker the pool keeps
+# for the dimensions, checks the ground contacts of the update before first
+#
+# $ python -m benchmarks.bench_kinematics_page
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.ground_contact_solver.tracker import ContactTracker
+from hexapod.const import BASE_DIMENSIONS
+from pages.helpers import make_pose
+
+STEP_COUNT = 500
+REPEAT = 3
+
+
+def make_drag(step_count):
+    # The poses of each step, one joint changes by a degree at each step
+    rng = np.random.default_rng(0)
+    poses = make_pose(10, 20, -10)
+    all_poses = []
+    for step in range(step_count):
+        pose = poses[(step // 30) % 6]
+        joint_name = ("coxia", "femur", "tibia")[(step // 10) % 3]
+        pose[joint_name] = float(
+            np.clip(pose[joint_name] + rng.choice([-1, 1]), -45, 45)
+        )
+        all_poses.append({i: dict(leg) for i, leg in poses.items()})
+    return all_poses
+
+
+def main():
+    all_poses = make_drag(STEP_COUNT)
+    reused = VirtualHexapod(BASE_DIMENSIONS)
+    tracker = ContactTracker()
+
+    def new_hexapods():
+        for poses in all_poses:
+            VirtualHexapod(BASE_DIMENSIONS).update(poses, assume_ground_targets=False)
+
+    def reused_hexapod():
+        for poses in all_poses:
+            reused.reset()
+            reused.update(poses, assume_ground_targets=False, contact_tracker=tracker)
+
+    print(f"poses: {STEP_COUNT}")
+    for name, loop in [
+        ("new hexapod", new_hexapods),
+        ("reused hexapod", reused_hexapod),
+    ]:
+        time = min(timeit.repeat(loop, number=1, repeat=REPEAT))
+        print(f"{name:30} {time / STEP_COUNT * 1e6:10.2f} us")
+
+    print(reused.update_info(tracker))
+
+
+if __name__ == "__main__":
+    main()
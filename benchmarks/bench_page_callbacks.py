@@ -0,0 +1,207 @@
+# Bytes sent and received, and time spent by the server, for each slider tick
+# of the pages, posting the callbacks of a tick as the browser does.
+# With SINGLE_HOP_CALLBACKS the callback which updates the page takes the values
+# of the widgets, otherwise the callback which collects the values of the widgets
+# (as json) is posted first, then the one which updates the page.
+# Each page is dragged twice, the second drag is answered by the page cache
+# (see pages.shared.PAGE_CACHE, the kinematics page is not cached with
+# RANDOM_GROUND_CONTACT_TIE_BREAK). With SHARED_PAGE_CACHE_PATH, it is dragged
+# a third time with an empty PAGE_CACHE, as by another worker of the server
+#
+# $ python -m benchmarks.bench_page_callbacks
+import json
+import time
+from index import app
+from hexapod.const import BASE_DIMENSIONS, BASE_FIGURE
+from widgets.dimensions_ui import DIMENSION_CALLBACK_INPUTS
+from pages.shared import PAGE_CACHE, SHARED_PAGE_CACHE
+
+TICK_COUNT = 60
+
+# The ids of the message and hidden parameters sections of each page,
+# the values its widgets start from and the widget dragged at each tick
+PAGES = {
+    "kinematics": (
+        "message-kinematics",
+        "parameters-kinematics",
+        [0] * 18,
+        lambda tick: tick // 10 % 18,
+    ),
+    "inverse": (
+        "message-inverse",
+        "parameters-inverse",
+        [0] * 8,
+        lambda tick: 2 + tick // 10 % 6,
+    ),
+    "patterns": (
+        "message-patterns",
+        "parameters-pattens",
+        [0] * 3,
+        lambda tick: tick // 10 % 3,
+    ),
+}
+
+# The values of the dimension widgets, in the order of their callback inputs
+DIMENSION_VALUES = [
+    BASE_DIMENSIONS[item.component_id.split("-")[-1]]
+    for item in DIMENSION_CALLBACK_INPUTS
+]
+
+
+def find_callback(output):
+    # The callback whose outputs include output (an "id.property")
+    for callback_id, callback in app.callback_map.items():
+        if output in callback_id.strip(".").split("..."):
+            return callback_id, callback
+    raise KeyError(output)
+
+
+def make_request(callback_id, callback, values, changed_prop_id, stored=None):
+    # stored maps the "id.property" of the states the server set before
+    # (eg the dimensions of the figure) to their value
+    outputs = [
+        dict(zip(("id", "property"), output.split(".")))
+        for output in callback_id.strip(".").split("...")
+    ]
+    inputs = [
+        dict(item, value=value) for item, value in zip(callback["inputs"], values)
+    ]
+
+    state = []
+    for item in callback["state"]:
+        value = BASE_FIGURE if item["property"] == "figure" else None
+        value = (stored or {}).get(f"{item['id']}.{item['property']}", value)
+        state.append(dict(item, value=value))
+
+    return {
+        "output": callback_id,
+        "outputs": outputs if len(outputs) > 1 else outputs[0],
+        "inputs": inputs,
+        "state": state,
+        "changedPropIds": [changed_prop_id],
+    }
+
+
+class Totals:
+    __slots__ = ("sent", "received", "seconds", "count")
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.seconds = 0.0
+        self.count = 0
+
+    def post(self, client, request):
+        body = json.dumps(request)
+        start = time.perf_counter()
+        response = client.post(
+            "/_dash-update-component", data=body, content_type="application/json"
+        )
+        self.seconds += time.perf_counter() - start
+        self.sent += len(body)
+        self.received += len(response.data)
+        self.count += 1
+        return json.loads(response.data)["response"] if response.data else None
+
+
+def store_response(stored, response):
+    # Remember the properties the server set, as the browser does
+    for component_id, properties in (response or {}).items():
+        for name, value in properties.items():
+            stored[f"{component_id}.{name}"] = value
+
+
+def drag_page(client, page_name):
+    # The totals of the callback which collects the widget values (if any)
+    # and of the callback which updates the page
+    message_id, params_id, values, dragged = PAGES[page_name]
+    values = list(values)
+    page_callback_id, page_callback = find_callback(f"{message_id}.children")
+    single_hop = f"{params_id}.children" not in app.callback_map
+    if not single_hop:
+        params_callback_id, params_callback = find_callback(f"{params_id}.children")
+
+    dimensions_json = json.dumps(BASE_DIMENSIONS)
+    params_totals, page_totals = Totals(), Totals()
+    stored = {}
+    for tick in range(TICK_COUNT):
+        i = dragged(tick)
+        values[i] += 1.5 if tick // 5 % 2 == 0 else -1.5
+
+        if single_hop:
+            widget_id = page_callback["inputs"][len(DIMENSION_VALUES) + i]["id"]
+            request = make_request(
+                page_callback_id,
+                page_callback,
+                DIMENSION_VALUES + values,
+                f"{widget_id}.value",
+                stored,
+            )
+            store_response(stored, page_totals.post(client, request))
+            continue
+
+        widget_id = params_callback["inputs"][i]["id"]
+        request = make_request(
+            params_callback_id, params_callback, values, f"{widget_id}.value"
+        )
+        response = params_totals.post(client, request)
+        params_json = response[params_id]["children"]
+
+        request = make_request(
+            page_callback_id,
+            page_callback,
+            [dimensions_json, params_json],
+            f"{params_id}.children",
+            stored,
+        )
+        store_response(stored, page_totals.post(client, request))
+
+    return params_totals, page_totals
+
+
+def main():
+    client = app.server.test_client()
+    print(f"ticks: {TICK_COUNT}, per tick:")
+    print(
+        f"{'callback':24} {'requests':>9} {'sent':>12} {'received':>12} {'server':>12}"
+    )
+    for page_name in PAGES:
+        PAGE_CACHE.clear()
+        if SHARED_PAGE_CACHE is not None:
+            SHARED_PAGE_CACHE.clear()
+        params_totals, page_totals = drag_page(client, page_name)
+        tick_totals = Totals()
+        for name in Totals.__slots__:
+            value = getattr(params_totals, name) + getattr(page_totals, name)
+            setattr(tick_totals, name, value)
+
+        _, cached_page_totals = drag_page(client, page_name)
+
+        rows = [
+            ("widgets", params_totals),
+            ("page", page_totals),
+            ("tick", tick_totals),
+            ("page cached", cached_page_totals),
+        ]
+        if SHARED_PAGE_CACHE is not None:
+            PAGE_CACHE.clear()
+            rows.append(("page shared", drag_page(client, page_name)[1]))
+
+        for name, totals in rows:
+            print(
+                f"{page_name + ' ' + name:24} {totals.count / TICK_COUNT:9.1f}"
+                f" {totals.sent / TICK_COUNT:10.0f} B"
+                f" {totals.received / TICK_COUNT:10.0f} B"
+                f" {totals.seconds / TICK_COUNT * 1e3:9.2f} ms"
+            )
+        for name, cache in [("cache", PAGE_CACHE), ("shared", SHARED_PAGE_CACHE)]:
+            if cache is not None:
+                info = cache.info()
+                print(
+                    f"{page_name + ' ' + name:24} hits {info['hits']}"
+                    f" misses {info['misses']} hit rate {info['hit_rate']:.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Size of the payload of the page callbacks and time to make and serialize it
+# for each encoding of its coordinates (see hexapod.plotter.encode_array)
+# - over the ticks of the page callbacks (see bench_page_callbacks)
+# - for the hexapods of a drag of the kinematics page (see bench_kinematics_page)
+#
+# $ python -m benchmarks.bench_payload_encoding
+import json
+import timeit
+from hexapod import plotter
+from hexapod.plotter import HexapodPlotter
+from hexapod.models import VirtualHexapod
+from hexapod.const import BASE_DIMENSIONS
+from benchmarks.bench_page_callbacks import PAGES, TICK_COUNT, drag_page
+from benchmarks.bench_kinematics_page import make_drag
+from index import app
+from pages.shared import PAGE_CACHE, SHARED_PAGE_CACHE
+
+ENCODINGS = [("json", None), ("float32", None), ("fixed", 0.01), ("fixed", 0.1)]
+HEXAPOD_COUNT = 100
+
+
+def make_hexapods(count):
+    hexapods = []
+    for poses in make_drag(count):
+        hexapod = VirtualHexapod(BASE_DIMENSIONS)
+        hexapod.update(poses, assume_ground_targets=False)
+        hexapods.append(hexapod)
+    return hexapods
+
+
+def main():
+    client = app.server.test_client()
+    hexapods = make_hexapods(HEXAPOD_COUNT)
+
+    print(f"page callbacks, per tick ({TICK_COUNT} ticks)")
+    print(f"{'encoding':16} " + " ".join(f"{name:>16}" for name in PAGES))
+    for encoding, precision in ENCODINGS:
+        plotter.PAYLOAD_ENCODING = encoding
+        plotter.PAYLOAD_PRECISION = precision
+        results = []
+        for page_name in PAGES:
+            PAGE_CACHE.clear()
+            if SHARED_PAGE_CACHE is not None:
+                SHARED_PAGE_CACHE.clear()
+            _, totals = drag_page(client, page_name)
+            results.append(
+                f"{totals.received / TICK_COUNT:5.0f} B "
+                f"{totals.seconds / TICK_COUNT * 1e3:5.2f} ms"
+            )
+        name = encoding if precision is None else f"{encoding} {precision}"
+        print(f"{name:16} " + " ".join(f"{result:>16}" for result in results))
+
+    print(f"\npayload of {HEXAPOD_COUNT} hexapods, per hexapod")
+    print(f"{'encoding':16} {'size':>10} {'make + json':>14}")
+    for encoding, precision in ENCODINGS:
+        plotter.PAYLOAD_ENCODING = encoding
+        plotter.PAYLOAD_PRECISION = precision
+
+        def serialize():
+            return [json.dumps(HexapodPlotter.make_payload(h)) for h in hexapods]
+
+        size = sum(len(text) for text in serialize()) / HEXAPOD_COUNT
+        time = min(timeit.repeat(serialize, number=1, repeat=5)) / HEXAPOD_COUNT
+        name = encoding if precision is None else f"{encoding} {precision}"
+        print(f"{name:16} {size:8.0f} B {time * 1e6:11.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Time the inverse kinematics page's work on the hexapod:
+# ik_solver2.inverse_kinematics_update followed by
+# recompute_hexapod or recompute_hexapod_in_place
+# over the same possible ik parameters
+#
+# $ python -m benchmarks.bench_recompute
+import timeit
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.const import BASE_DIMENSIONS
+from hexapod.ik_solver.ik_solver2 import inverse_kinematics_update
+from hexapod.ik_solver.ik_kernel import IK_PARAMETER_NAMES, inverse_kinematics_batch
+from hexapod.ik_solver.recompute_hexapod import (
+    find_recomputed_points,
+    recompute_hexapod,
+    recompute_hexapod_in_place,
+)
+
+SAMPLE_SIZE = 1000
+REPEAT = 3
+
+
+def loop(recompute, dimensions, all_ik_parameters):
+    hexapod = VirtualHexapod(dimensions)
+    for ik_parameters in all_ik_parameters:
+        poses, hexapod = inverse_kinematics_update(hexapod, ik_parameters)
+        try:
+            recompute(dimensions, ik_parameters, poses, hexapod)
+        except Exception:
+            pass
+
+
+def loop_ik_only(dimensions, all_ik_parameters):
+    hexapod = VirtualHexapod(dimensions)
+    for ik_parameters in all_ik_parameters:
+        inverse_kinematics_update(hexapod, ik_parameters)
+
+
+def count_fallbacks(dimensions, all_ik_parameters):
+    count = 0
+    for ik_parameters in all_ik_parameters:
+        poses, hexapod = inverse_kinematics_update(
+            VirtualHexapod(dimensions), ik_parameters
+        )
+        if find_recomputed_points(dimensions, ik_parameters, poses, hexapod) is None:
+            count += 1
+    return count
+
+
+def main():
+    rng = np.random.default_rng(0)
+    limits = [45, 90, 0.5, 0.5, 0.5, 15, 15, 15]
+    params = rng.uniform(-1, 1, (4 * SAMPLE_SIZE, 8)) * limits
+    _, valid, _ = inverse_kinematics_batch(BASE_DIMENSIONS, params)
+    all_ik_parameters = [
+        dict(zip(IK_PARAMETER_NAMES, row))
+        for row in params[valid][:SAMPLE_SIZE].tolist()
+    ]
+    n = len(all_ik_parameters)
+
+    def report(name, function):
+        time = min(timeit.repeat(function, number=1, repeat=REPEAT)) / n
+        print(f"{name:44} {time * 1e6:10.2f} us")
+        return time
+
+    print(f"possible poses: {n}")
+    ik_only = report(
+        "inverse_kinematics_update",
+        lambda: loop_ik_only(BASE_DIMENSIONS, all_ik_parameters),
+    )
+    old = report(
+        "... + recompute_hexapod",
+        lambda: loop(recompute_hexapod, BASE_DIMENSIONS, all_ik_parameters),
+    )
+    new = report(
+        "... + recompute_hexapod_in_place",
+        lambda: loop(recompute_hexapod_in_place, BASE_DIMENSIONS, all_ik_parameters),
+    )
+    print(f"recomputing: {(old - ik_only) / (new - ik_only):.1f} x faster")
+    print(f"ik and recomputing: {old / new:.1f} x faster")
+    fallbacks = count_fallbacks(BASE_DIMENSIONS, all_ik_parameters)
+    print(f"fell back to recompute_hexapod: {fallbacks} of {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Compare hexapod.stability.compute_stability over many poses at once
+# with checking ground_contact_solver.shared.is_stable for
+# each trio of legs on the ground of each pose
+# (which only tells if the pose is stable, not by how much)
+#
+# $ python -m benchmarks.bench_stability
+import timeit
+from itertools import combinations
+import numpy as np
+from hexapod.const import BASE_DIMENSIONS
+from hexapod.points import Vector
+from hexapod.kinematics import batch_forward
+from hexapod.ground_contact_solver.shared import is_stable
+from hexapod.stability import compute_stability, find_ground_contacts
+
+BATCH_SIZE = 10000
+LOOP_SIZE = 1000
+
+
+def loop_is_stable(all_contacts, all_on_ground, all_cogs):
+    for contacts, on_ground, cog in zip(all_contacts, all_on_ground, all_cogs):
+        # is_stable projects the origin, the points are wrt to the cog
+        points = [Vector(*(p - cog)) for p, down in zip(contacts, on_ground) if down]
+        any(is_stable(*trio) for trio in combinations(points, 3))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(-1, 1, (BATCH_SIZE, 6, 3)) * [30, 60, 60]
+    points = batch_forward(BASE_DIMENSIONS, angles)
+
+    contacts, on_ground = find_ground_contacts(points[:LOOP_SIZE])
+    cogs = points[:LOOP_SIZE, :, 0].mean(axis=1)
+
+    loop_time = (
+        timeit.timeit(lambda: loop_is_stable(contacts, on_ground, cogs), number=1)
+        / LOOP_SIZE
+    )
+    batch_time = timeit.timeit(lambda: compute_stability(points), number=1) / BATCH_SIZE
+    _, margins = compute_stability(points)
+
+    print(
+        f"poses: {BATCH_SIZE} ({np.count_nonzero(margins > 0)} with a positive margin)"
+    )
+    print(f"{'is_stable of each trio':32} {loop_time * 1e6:10.2f} us per pose")
+    print(f"{'compute_stability':32} {batch_time * 1e6:10.2f} us per pose")
+
+
+if __name__ == "__main__":
+    main()
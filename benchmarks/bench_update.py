@@ -0,0 +1,67 @@
+# Time and memory used by one VirtualHexapod.update() call
+# and by the copies it (and update_stance) makes of the ground contacts
+# and of the poses, compared with copy.deepcopy of the same objects.
+# update() keeps the old ground contacts as the rows of the points array
+# which they are (see models.contact_rows), one array copy
+#
+# $ python -m benchmarks.bench_update
+import timeit
+import tracemalloc
+from copy import deepcopy
+from hexapod.models import VirtualHexapod, contact_rows
+from hexapod.const import BASE_DIMENSIONS, HEXAPOD_POSE
+from hexapod.templates.pose_template import copy_poses
+from pages.helpers import make_pose
+
+CALL_COUNT = 2000
+
+
+def peak_memory(function):
+    # Peak bytes allocated while calling function once
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def report(name, function):
+    time = timeit.timeit(function, number=CALL_COUNT) / CALL_COUNT
+    peak = peak_memory(function)
+    print(f"{name:32} {time * 1e6:10.2f} us {peak:10d} bytes")
+    return time
+
+
+def main():
+    hexapod = VirtualHexapod(BASE_DIMENSIONS)
+    poses = make_pose(15, 30, -15)
+    hexapod.update(poses)
+    contacts = hexapod.ground_contacts
+
+    def deepcopy_contacts():
+        deepcopy(contacts)
+
+    def copy_contact_rows():
+        hexapod.points[contact_rows(hexapod.ground_contact_ids)]
+
+    def deepcopy_poses():
+        deepcopy(HEXAPOD_POSE)
+
+    def shallow_copy_poses():
+        copy_poses(HEXAPOD_POSE)
+
+    print(f"calls: {CALL_COUNT}")
+    print(f"{'':32} {'per call':>13} {'peak memory':>16}")
+    update = report("VirtualHexapod.update", lambda: hexapod.update(poses))
+    old = report("deepcopy(ground_contacts)", deepcopy_contacts)
+    new = report("points[contact_rows(...)]", copy_contact_rows)
+    old += report("deepcopy(HEXAPOD_POSE)", deepcopy_poses)
+    new += report("copy_poses(HEXAPOD_POSE)", shallow_copy_poses)
+    print(f"saved per update_stance: {(old - new) * 1e6:.2f} us")
+    print(
+        f"which is {(old - new) / (update + old) * 100:.1f} % of the time with deepcopy"
+    )
+
+
+if __name__ == "__main__":
+    main()
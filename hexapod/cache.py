@@ -0,0 +1,277 @@
+# A bounded cache which forgets the least recently used entries first.
+# It counts its hits and misses so that we can tell if it is big enough.
+# Given a ttl (in seconds), entries older than that are also forgotten.
+# It is safe to share between threads (the dash development server is threaded)
+#
+# SQLiteCache is the same kind of cache kept in an SQLite database file,
+# so that the processes of the server (the workers of gunicorn) share it
+# and it is still there when they restart
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock, local
+
+
+class LRUCache:
+    __slots__ = ("maxsize", "ttl", "hits", "misses", "_entries", "_lock")
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if self.ttl is not None:
+                if self._expired(value):
+                    del self._entries[key]
+                    self.misses += 1
+                    return default
+                value = value[0]
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _expired(self, value):
+        # The values are (value, expiry time) when there is a ttl
+        return self.ttl is not None and time.monotonic() >= value[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        if self.ttl is not None:
+            value = (value, time.monotonic() + self.ttl)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        # Expired entries are counted until they are looked up or pushed out
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        # Same as get() but without counting a hit or a miss
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                return False
+
+            if self._expired(value):
+                del self._entries[key]
+                return False
+            return True
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self):
+        return f"LRUCache({self.info()})"
+
+
+class SQLiteCache:
+    """
+    A bounded cache of json values in an SQLite database file
+    shared by all the processes which open it. The values are encoded
+    with json_encoder (a json.JSONEncoder class), get returns them decoded
+    (so a tuple comes back as a list).
+    When it has more than maxsize entries, the oldest ones are forgotten
+    (not the least recently used ones, so that reading is not writing).
+    It is only a cache: when the database is busy or cannot be used
+    get misses, put does nothing, it looks empty and counts an error,
+    instead of holding up the request.
+    The hits, misses and errors are those of this process
+    """
+
+    __slots__ = (
+        "path",
+        "maxsize",
+        "ttl",
+        "json_encoder",
+        "hits",
+        "misses",
+        "errors",
+        "_puts",
+        "_local",
+    )
+
+    # Forget the entries over maxsize (and the expired ones) every so many puts
+    PRUNE_INTERVAL = 256
+    # How long to wait for the other processes to finish writing, in seconds
+    TIMEOUT = 0.1
+
+    def __init__(self, path, maxsize=100000, ttl=None, json_encoder=None):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.json_encoder = json_encoder
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._puts = 0
+        self._local = local()
+
+    def _connect(self):
+        # One connection per thread, which is not inherited by forked processes
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        connection = sqlite3.connect(self.path, timeout=self.TIMEOUT)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries"
+                " (key TEXT PRIMARY KEY, value TEXT, created_at REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at)"
+            )
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _read(self, query, args=()):
+        # The first row of the query, None if there is none
+        # or if the database cannot be used
+        try:
+            return self._connect().execute(query, args).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            return None
+
+    def _write(self, *statements):
+        # Runs the (query, args) statements in one transaction,
+        # does nothing if the database cannot be used
+        try:
+            connection = self._connect()
+            with connection:
+                for query, args in statements:
+                    connection.execute(query, args)
+        except sqlite3.Error:
+            self.errors += 1
+
+    def _oldest_kept(self):
+        # Entries created before this time have expired
+        return float("-inf") if self.ttl is None else time.time() - self.ttl
+
+    def get(self, key, default=None):
+        row = self._read(
+            "SELECT value FROM entries WHERE key = ? AND created_at > ?",
+            (key, self._oldest_kept()),
+        )
+        if row is not None:
+            try:
+                value = json.loads(row[0])
+            except (TypeError, ValueError):
+                # Not written by this cache
+                self.errors += 1
+            else:
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        text = json.dumps(value, cls=self.json_encoder, separators=(",", ":"))
+        self._write(
+            (
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, text, time.time()),
+            )
+        )
+        self._puts += 1
+        if self._puts % self.PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def prune(self):
+        self._write(
+            ("DELETE FROM entries WHERE created_at <= ?", (self._oldest_kept(),)),
+            (
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            ),
+        )
+
+    def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._write(("DELETE FROM entries", ()))
+
+    def __len__(self):
+        # Expired entries are counted until they are pruned
+        row = self._read("SELECT COUNT(*) FROM entries")
+        return 0 if row is None else row[0]
+
+    def __contains__(self, key):
+        row = self._read(
+            "SELECT 1 FROM entries WHERE key = ? AND created_at > ?",
+            (key, self._oldest_kept()),
+        )
+        return row is not None
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self):
+        return f"SQLiteCache({self.path!r}, {self.info()})"
+
+
+def make_params_key(*params):
+    # The same key for the same dimensions and parameters
+    # whatever the order of their keys and whether they came from json
+    # (whose object keys are strings) or were built from the widget values
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
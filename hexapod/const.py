@@ -1,4 +1,10 @@
 from copy import deepcopy
+from settings import (
+    BODY_MAX_ANGLE,
+    HIP_STANCE_MAX_ANGLE,
+    LEG_STANCE_MAX_ANGLE,
+    SLIDER_ANGLE_RESOLUTION,
+)
 from hexapod.plotter import HexapodPlotter
 from hexapod.models import VirtualHexapod, Hexagon, Linkage
 from hexapod.templates.figure_template import HEXAPOD_FIGURE
@@ -28,6 +34,27 @@ BASE_IK_PARAMS = {
     "rot_z": 0,
 }
 
+# The min, max and step of the slider of each ik parameter
+# (see widgets.ik_ui and hexapod.ik_solver.reachability)
+IK_SLIDER_RANGES = {
+    "hip_stance": (
+        -HIP_STANCE_MAX_ANGLE,
+        HIP_STANCE_MAX_ANGLE,
+        SLIDER_ANGLE_RESOLUTION,
+    ),
+    "leg_stance": (
+        -LEG_STANCE_MAX_ANGLE,
+        LEG_STANCE_MAX_ANGLE,
+        SLIDER_ANGLE_RESOLUTION,
+    ),
+    "percent_x": (-1.0, 1.0, 0.05),
+    "percent_y": (-1.0, 1.0, 0.05),
+    "percent_z": (-1.0, 1.0, 0.05),
+    "rot_x": (-BODY_MAX_ANGLE, BODY_MAX_ANGLE, SLIDER_ANGLE_RESOLUTION),
+    "rot_y": (-BODY_MAX_ANGLE, BODY_MAX_ANGLE, SLIDER_ANGLE_RESOLUTION),
+    "rot_z": (-BODY_MAX_ANGLE, BODY_MAX_ANGLE, SLIDER_ANGLE_RESOLUTION),
+}
+
 BASE_POSE = deepcopy(HEXAPOD_POSE)
 
 BASE_HEXAPOD = VirtualHexapod(BASE_DIMENSIONS)
@@ -25,18 +25,34 @@ For each combination:
     4. For each of the three other legs, check all points (3 points of each leg)
         if so, next. (9 points total)
     5. If no condition is violated, then this is good, return this!
+
+All 540 combinations are checked at once with numpy.
+Steps 3 and 4 are the same as checking that none of the 18 points
+(except the body contacts) is lower than the plane.
+The winner is the first combination (in the order described below)
+that doesn't violate any condition.
+
+The leg trios are shuffled to pick one of possibly many stable positions
+at random. Without shuffling (rng=None), the first stable position
+in the order above is always picked, the same legs always yield
+the same result, so the results are cached given the leg points.
 """
 import random
+from functools import partial
+import numpy as np
+from settings import (
+    RANDOM_GROUND_CONTACT_TIE_BREAK,
+    GROUND_CONTACT_CACHE_SIZE,
+    GROUND_CONTACT_CACHE_RESOLUTION,
+)
+from hexapod.cache import LRUCache
 from hexapod.ground_contact_solver.shared import (
-    is_stable,
-    is_lower,
+    find_planes,
     find_legs_on_ground,
     SOME_LEG_TRIOS,
     ADJACENT_LEG_TRIOS,
 )
-from hexapod.points import get_normal_given_three_points, dot
-
-OTHER_POINTS_MAP = {1: (2, 3), 2: (3, 1), 3: (1, 2)}
+from hexapod.points import Vector
 
 JOINT_TRIOS = []
 for i in range(3, 0, -1):
@@ -44,60 +60,101 @@ for i in range(3, 0, -1):
         for k in range(3, 0, -1):
             JOINT_TRIOS.append((i, j, k))
 
+JOINT_TRIOS_ARRAY = np.array(JOINT_TRIOS)
+
+DEFAULT_RNG = random if RANDOM_GROUND_CONTACT_TIE_BREAK else None
+
+# Maps the rounded leg points to (ids of legs on ground, normal, height)
+CACHE = LRUCache(GROUND_CONTACT_CACHE_SIZE)
 
-def compute_orientation_properties(legs):
+
+def compute_orientation_properties(legs, rng=DEFAULT_RNG, tracker=None):
     """
     Returns:
       - Which legs are on the ground
       - Normal vector of the plane defined by these legs
       - Distance of this plane to center of gravity
-    """
-    # prefer leg combinations where legs are not adjacent to each other
-    # introduce some randomness so we are not bias in
-    # choosing one stable position over another
-    shuffled_some_leg_trios = random.sample(SOME_LEG_TRIOS, len(SOME_LEG_TRIOS))
-    leg_trios = shuffled_some_leg_trios + ADJACENT_LEG_TRIOS
-
-    for leg_trio in leg_trios:
-
-        other_leg_trio = [i for i in range(6) if i not in leg_trio]
-        other_three_legs = [legs[i] for i in other_leg_trio]
-        three_legs = [legs[i] for i in leg_trio]
-
-        for joint_trio in JOINT_TRIOS:
-
-            p0, p1, p2 = [legs[i].get_point(j) for i, j in zip(leg_trio, joint_trio)]
 
-            if not is_stable(p0, p1, p2):
-                continue
+    rng is used to shuffle the leg trios, pass a seeded random.Random
+    to pick stable positions reproducibly,
+    or None to not shuffle at all and use the cache
 
-            n = get_normal_given_three_points(p0, p1, p2)
-            height = -dot(n, p0)
-
-            if same_leg_joints_break_condition(three_legs, joint_trio, n, height):
-                continue
-
-            if other_leg_joints_break_condition(other_three_legs, n, height):
-                continue
-
-            legs_on_ground = find_legs_on_ground(legs, n, height)
-            return legs_on_ground, n, height
-
-    return [], None, None
-
-
-def same_leg_joints_break_condition(three_legs, three_point_ids, n, height):
-    for leg, point_id in zip(three_legs, three_point_ids):
-        for other_point_id in OTHER_POINTS_MAP[point_id]:
-            point = leg.get_point(other_point_id)
-            if is_lower(point, height, n):
-                return True
-    return False
-
-
-def other_leg_joints_break_condition(other_three_legs, n, height):
-    for leg in other_three_legs:
-        for point in leg.all_points[1:]:
-            if is_lower(point, height, n):
-                return True
-    return False
+    If tracker (a ContactTracker) is given and the leg trios are shuffled,
+    the leg trio and joint trio it remembers are checked first
+    (see ground_contact_solver.tracker). Without shuffling, the tracker
+    is not used: the first stable position in order is picked
+    whatever the last update was, and only depends on the leg points
+    """
+    points = np.array([leg.points_array for leg in legs])
+
+    if rng is None:
+        key = make_cache_key(points)
+        cached = CACHE.get(key)
+        if cached is not None:
+            leg_ids, n, height = cached
+            if n is None:
+                return [], None, None
+            return [legs[i] for i in leg_ids], Vector(*n), height
+
+        leg_trios = SOME_LEG_TRIOS + ADJACENT_LEG_TRIOS
+    else:
+        # prefer leg combinations where legs are not adjacent to each other
+        # introduce some randomness so we are not bias in
+        # choosing one stable position over another
+        shuffled_some_leg_trios = rng.sample(SOME_LEG_TRIOS, len(SOME_LEG_TRIOS))
+        leg_trios = shuffled_some_leg_trios + ADJACENT_LEG_TRIOS
+
+    if tracker is None or rng is None:
+        found = find_first_ground_plane(points, leg_trios)
+    else:
+        find_first = partial(find_first_ground_plane, points)
+        found = tracker.find(find_first, leg_trios, JOINT_TRIOS)
+
+    if found is None:
+        legs_on_ground, n, height = [], None, None
+    else:
+        n, height, _, _ = found
+        legs_on_ground = find_legs_on_ground(legs, n, height)
+
+    if rng is None:
+        leg_ids = [legs.index(leg) for leg in legs_on_ground]
+        CACHE.put(key, (leg_ids, None if n is None else n.vec, height))
+
+    return legs_on_ground, n, height
+
+
+def make_cache_key(points):
+    # Only the coxia, femur and tibia points matter
+    rounded = np.rint(points[:, 1:] / GROUND_CONTACT_CACHE_RESOLUTION)
+    return rounded.astype(np.int64).tobytes()
+
+
+def find_first_ground_plane(points, leg_trios, joint_trios=JOINT_TRIOS_ARRAY):
+    """
+    points is the (6, 4, 3) array of the points of each leg.
+    Check each combination of a leg trio and joint trio, in order.
+    Returns the normal vector and height of the plane defined by the first
+    combination that meets the conditions, its leg trio and joint trio, or None
+    """
+    leg_ids = np.repeat(np.asarray(leg_trios), len(joint_trios), axis=0)
+    joint_ids = np.tile(joint_trios, (len(leg_trios), 1))
+    trio_points = points[leg_ids, joint_ids]
+
+    stable, n, height = find_planes(
+        trio_points[:, 0], trio_points[:, 1], trio_points[:, 2]
+    )
+
+    # No point of any leg should be lower than the plane
+    # (the three points of the plane themselves are not lower)
+    with np.errstate(invalid="ignore"):
+        leg_points = points[:, 1:].reshape(-1, 3)
+        heights = -np.matmul(n, leg_points.T)
+        no_point_lower = np.all(heights <= height[:, np.newaxis] + 1, axis=1)
+
+    valid = stable & no_point_lower
+    if not valid.any():
+        return None
+
+    i = np.argmax(valid)
+    nx, ny, nz = n[i]
+    return Vector(nx, ny, nz), height[i], leg_ids[i].tolist(), joint_ids[i].tolist()
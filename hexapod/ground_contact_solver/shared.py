@@ -1,4 +1,5 @@
 from math import isclose
+import numpy as np
 from hexapod.points import (
     Vector,
     dot,
@@ -67,6 +68,45 @@ def is_stable(p1, p2, p3, tol=0.001):
     return cond1 and cond2 and cond3
 
 
+def find_planes(p1, p2, p3, tol=0.001):
+    """
+    Vectorized version of is_stable and get_normal_given_three_points.
+    p1, p2, p3 are arrays of shape (..., 3), each (p1, p2, p3)
+    defines a triangle. Returns:
+      - If the pose is stable for each triangle (see is_stable)
+      - The unit normal vector of each triangle (..., 3)
+      - The height of the center of gravity wrt to the plane of each triangle
+    Degenerate triangles are never stable.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = p2 - p1
+        v = p3 - p1
+        n = cross_vectors(u, v)
+        w = -p1
+        n2 = np.einsum("...i,...i", n, n)
+        beta = np.einsum("...i,...i", cross_vectors(u, w), n) / n2
+        gamma = np.einsum("...i,...i", cross_vectors(w, v), n) / n2
+        alpha = 1 - gamma - beta
+
+        stable = np.ones(n2.shape, dtype=bool)
+        for coordinate in (alpha, beta, gamma):
+            stable &= (-tol <= coordinate) & (coordinate <= 1 + tol)
+
+        n = n / np.sqrt(n2)[..., np.newaxis]
+        height = -np.einsum("...i,...i", n, p1)
+
+    return stable, n, height
+
+
+def cross_vectors(u, v):
+    # Same as np.cross(u, v) for arrays of shape (..., 3) (the same products
+    # and differences) without its overhead, which dominates on a few triangles
+    # (eg when checking only the ground contacts of the last update)
+    ux, uy, uz = u[..., 0], u[..., 1], u[..., 2]
+    vx, vy, vz = v[..., 0], v[..., 1], v[..., 2]
+    return np.stack((uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx), axis=-1)
+
+
 def is_lower(point, height, n, tol=1):
     _height = -dot(n, point)
     return _height > height + tol
@@ -0,0 +1,115 @@
+# Remembers which ground contacts defined the ground plane
+# the last time a hexapod was updated.
+#
+# Dragging a slider updates the hexapod with poses which are close to each other,
+# the leg trio (and joint trio) which defined the ground plane of the last update
+# almost always defines it again. Instead of checking the trios from the top
+# of their (shuffled) list, ground_contact_solver2 checks
+# 1. the leg trio and joint trio of the last update
+# 2. the trios near it: the same leg trio with any joint trio, then the leg trios
+#    which share two legs with it with the same joint trio
+# 3. all trios in their usual order (the full search)
+#
+# Any trio which passes the checks of the solver is a stable position,
+# when many of them do (eg all feet are on the ground)
+# the one of the last update is kept instead of the first in the list.
+# So it is only used when the tie break is random anyway: a solver which
+# picks the first stable position in a fixed order ignores it.
+#
+# A hexapod has its own tracker, which VirtualHexapod.reset() forgets
+# (a reset hexapod is the same as a new one). The kinematics page updates
+# hexapods borrowed from hexapod.pool, which are reset, so it passes
+# the tracker the pool keeps for the dimensions to update() instead.
+# That tracker can be used by many requests at the same time,
+# it is only a hint of which trio to check first (the solver checks it
+# all the same) and its counters might miss a few updates.
+
+
+class ContactTracker:
+    __slots__ = ("leg_trio", "joint_trio", "hits", "near_hits", "misses")
+
+    def __init__(self):
+        self.leg_trio = None
+        self.joint_trio = None
+        # How many times the ground plane was found by the last trio,
+        # by a trio near it, or by the full search
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def find(self, find_first, leg_trios, joint_trios):
+        """
+        find_first(leg_trios, joint_trios) returns what the solver found given
+        the first combination of a leg trio and joint trio (in this order)
+        which defines the ground plane, or None if no combination does.
+        Its last two items are the leg trio and joint trio of this combination.
+        """
+        # Read once, another request might change them in the meantime
+        last_trios = self.leg_trio, self.joint_trio
+        if None not in last_trios:
+            found = self._find_near(find_first, leg_trios, joint_trios, *last_trios)
+            if found is not None:
+                self.remember(*found[-2:])
+                return found
+
+        self.misses += 1
+        found = find_first(leg_trios, joint_trios)
+        if found is None:
+            self.forget()
+        else:
+            self.remember(*found[-2:])
+        return found
+
+    def _find_near(self, find_first, leg_trios, joint_trios, leg_trio, joint_trio):
+        found = find_first([leg_trio], [joint_trio])
+        if found is not None:
+            self.hits += 1
+            return found
+
+        near_leg_trios = [
+            trio for trio in leg_trios if len(set(trio) & set(leg_trio)) == 2
+        ]
+        candidates = [([leg_trio], joint_trios), (near_leg_trios, [joint_trio])]
+
+        for near_leg_trios, near_joint_trios in candidates:
+            if not near_leg_trios:
+                continue
+            found = find_first(near_leg_trios, near_joint_trios)
+            if found is not None:
+                self.near_hits += 1
+                return found
+
+        return None
+
+    def remember(self, leg_trio, joint_trio):
+        self.leg_trio = tuple(leg_trio)
+        self.joint_trio = tuple(joint_trio)
+
+    def forget(self):
+        self.leg_trio = None
+        self.joint_trio = None
+
+    def clear(self):
+        self.forget()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        # How often the full search was not needed
+        total = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / total if total else 0.0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "leg_trio": self.leg_trio,
+            "joint_trio": self.joint_trio,
+        }
+
+    def __repr__(self):
+        return f"ContactTracker({self.info()})"
@@ -1,20 +1,87 @@
 # Used for checking edge cases
 # and also for printing final results
 import json
+from enum import IntEnum
 import numpy as np
 from settings import (
     PRINT_IK_LOCAL_LEG,
     ASSERTION_ENABLED,
     PRINT_IK,
+    ALPHA_MAX_ANGLE,
     BETA_MAX_ANGLE,
     GAMMA_MAX_ANGLE,
 )
+from hexapod.models import (
+    find_poses_range_error,
+    make_stance_poses,
+    pose_unstable_msg,
+    poses_range_error_msg,
+)
 from hexapod.points import length, vector_from_to, angle_between
 
 COXIA_ON_GROUND_ALERT_MSG = "Impossible at given height.\ncoxia joint shoved on ground"
 BODY_ON_GROUND_ALERT_MSG = "Impossible at given height.\nbody contact shoved on ground"
 
 
+class IKStatus(IntEnum):
+    # What happened when solving the angles of one leg
+    # OK and IN_THE_AIR are solved, anything else is a failure
+    # (roughly in the order the failures are checked)
+    OK = 0
+    IN_THE_AIR = 1
+    STANCE_OUT_OF_RANGE = 2
+    UNSTABLE = 3
+    BODY_ON_GROUND = 4
+    COXIA_ON_GROUND = 5
+    FEMUR_TOO_LONG = 6
+    TIBIA_TOO_LONG = 7
+    TOO_MANY_LEGS_UP = 8
+    BLOCKED = 9
+    BETA_OUT_OF_RANGE = 10
+    GAMMA_OUT_OF_RANGE = 11
+    ALPHA_OUT_OF_RANGE = 12
+
+
+def ik_status_alert_msg(status, leg_name, angles, legs_up_in_the_air):
+    # The alert message of a failed leg given its status
+    # and its angles (alpha, beta, gamma) as computed
+    # legs_up_in_the_air is the list of names of the legs up to this one
+    # which cannot reach the ground.
+    # A stance out of range is not the failure of one leg,
+    # see stance_range_error_msg
+    alpha, beta, gamma = angles
+
+    if status == IKStatus.BODY_ON_GROUND:
+        return BODY_ON_GROUND_ALERT_MSG
+    if status == IKStatus.COXIA_ON_GROUND:
+        return COXIA_ON_GROUND_ALERT_MSG
+    if status == IKStatus.FEMUR_TOO_LONG:
+        return cant_reach_alert_msg(leg_name, "femur")
+    if status == IKStatus.TIBIA_TOO_LONG:
+        return cant_reach_alert_msg(leg_name, "tibia")
+    if status == IKStatus.TOO_MANY_LEGS_UP:
+        return legs_too_short(legs_up_in_the_air)[1]
+    if status == IKStatus.BLOCKED:
+        return cant_reach_alert_msg(leg_name, "blocking")
+    if status == IKStatus.BETA_OUT_OF_RANGE:
+        return angle_above_limit(beta, BETA_MAX_ANGLE, leg_name, "(beta/femur)")[1]
+    if status == IKStatus.GAMMA_OUT_OF_RANGE:
+        return angle_above_limit(gamma, GAMMA_MAX_ANGLE, leg_name, "(gamma/tibia)")[1]
+    if status == IKStatus.ALPHA_OUT_OF_RANGE:
+        return angle_above_limit(alpha, ALPHA_MAX_ANGLE, leg_name, "(alpha/coxia)")[1]
+
+    if status == IKStatus.UNSTABLE:
+        return pose_unstable_msg()
+
+    raise ValueError(f"No alert message for the {leg_name} leg status {status!r}")
+
+
+def stance_range_error_msg(hip_stance, leg_stance):
+    # Same alert as VirtualHexapod.update_stance(hip_stance, leg_stance)
+    range_error = find_poses_range_error(make_stance_poses(hip_stance, leg_stance))
+    return poses_range_error_msg(*range_error)
+
+
 def cant_reach_alert_msg(leg_name, problem):
     msg = "Cannot reach target ground point.\n"
     if problem == "femur":
@@ -0,0 +1,538 @@
+# This module solves the inverse kinematics problem
+# of hexapod.ik_solver.ik_solver2 (please read it first)
+# without building or modifying any model object.
+#
+# Given only the dimensions of the hexapod and the ik parameters
+# it returns the 18 angles and what happened to each leg.
+# It does exactly what ik_solver2 did for a hexapod in its neutral pose:
+#
+# 1. Put the hexapod in its stance (hip_stance and leg_stance)
+#    All the legs are the same so the ground is the plane z = 0
+#    through their lowest points (no need for the ground contact solver)
+# 2. Rotate and translate the body
+#    (the foot tips stay where they are, those are the targets)
+# 3. Find the angles of each leg so it reaches its target
+#
+# The math is done one number at a time, no Vector or array is built
+# except for the results, so it is cheap to call in a loop.
+from math import acos, cos, degrees, isnan, radians, sin, sqrt
+import numpy as np
+from settings import ALPHA_MAX_ANGLE, BETA_MAX_ANGLE, GAMMA_MAX_ANGLE
+from hexapod.models import Hexagon
+from hexapod.ground_contact_solver.shared import LEG_TRIOS
+from hexapod.points import frame_rotxyz, frame_rotxyz_batch
+from hexapod.ik_solver.helpers import IKStatus
+from hexapod.ik_solver.shared import compute_twist_wrt_to_world
+
+LEG_COUNT = 6
+LEG_SIDES = tuple(name.split("-")[0] for name in Hexagon.VERTEX_NAMES)
+# Which legs have their hips turned by -hip_stance (-1) or +hip_stance (1)
+HIP_STANCE_SIGNS = (0, -1, 1, 0, -1, 1)
+
+
+def compute_ik(dimensions, ik_parameters, points=None):
+    """
+    Return the (6, 3) array of angles (alpha, beta, gamma) of each leg
+    and the (6,) array of the IKStatus of each leg.
+
+    If points is given, a (6, 4, 3) array, it is filled with the body contact,
+    coxia, femur and tibia points of each leg wrt to the world frame.
+
+    The angles of a leg are only meaningful when its status
+    is IKStatus.OK or IKStatus.IN_THE_AIR, the angles of a leg with an
+    out of range status are the ones found to be out of range.
+    A pose is possible only if all legs have one of these two statuses.
+    """
+    hip_stance = ik_parameters["hip_stance"]
+    leg_stance = ik_parameters["leg_stance"]
+    stance = find_stance(dimensions, hip_stance, leg_stance)
+    code = stance_alert(hip_stance, leg_stance, stance)
+    if code != IKStatus.OK:
+        status = np.full(LEG_COUNT, code, dtype=np.int8)
+        return np.zeros((LEG_COUNT, 3)), status
+
+    # The rotation and translation of the body
+    frame = frame_rotxyz(
+        ik_parameters["rot_x"], ik_parameters["rot_y"], ik_parameters["rot_z"]
+    )
+    rotation = frame[:3, :3].tolist()
+    return solve_stance(dimensions, stance, rotation, ik_parameters, points)
+
+
+def solve_stance(dimensions, stance, rotation, ik_parameters, points=None):
+    """
+    Same as compute_ik given the (possible) stance of the hip stance
+    and leg stance, as returned by find_stance,
+    and the rotation of the body (the 3x3 nested list of frame_rotxyz)
+    """
+    s, m = dimensions["side"], dimensions["middle"]
+    a, b, c = dimensions["coxia"], dimensions["femur"], dimensions["tibia"]
+
+    angles = np.zeros((LEG_COUNT, 3))
+    status = np.zeros(LEG_COUNT, dtype=np.int8)
+
+    vertices = _body_vertices(dimensions)
+    feet, height = stance
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = rotation
+    tx = ik_parameters["percent_x"] * m
+    ty = ik_parameters["percent_y"] * s
+    tz = ik_parameters["percent_z"] * c
+
+    # The x and z axes of the hexapod (the body) after the rotation
+    axes = (r00, r10, r20), (r02, r12, r22)
+
+    contacts = [
+        (
+            r00 * vx + r01 * vy + r02 * height + tx,
+            r10 * vx + r11 * vy + r12 * height + ty,
+            r20 * vx + r21 * vy + r22 * height + tz,
+        )
+        for vx, vy in vertices
+    ]
+
+    body_on_ground = any(p0[2] < p3[2] for p0, p3 in zip(contacts, feet))
+    legs_up_in_the_air = []
+
+    for i in range(LEG_COUNT):
+        if body_on_ground:
+            if contacts[i][2] < feet[i][2]:
+                status[i] = IKStatus.BODY_ON_GROUND
+            continue
+
+        status[i] = _solve_leg(
+            i, (a, b, c), contacts[i], feet[i], axes, legs_up_in_the_air, angles, points
+        )
+
+    return angles, status
+
+
+def stance_alert(hip_stance, leg_stance, stance):
+    # The IKStatus of all legs if the stance is not possible, IKStatus.OK if it is
+    if (
+        abs(hip_stance) > ALPHA_MAX_ANGLE
+        or abs(leg_stance) > BETA_MAX_ANGLE
+        or abs(leg_stance) > GAMMA_MAX_ANGLE
+    ):
+        return IKStatus.STANCE_OUT_OF_RANGE
+    if stance is None:
+        return IKStatus.UNSTABLE
+    return IKStatus.OK
+
+
+def find_stance(dimensions, hip_stance, leg_stance):
+    """
+    Return the six foot tips wrt to the world frame and the height of the body
+    of a hexapod in its neutral pose after update_stance(hip_stance, leg_stance)
+    or None if this stance is unstable.
+    These foot tips are the targets of the inverse kinematics solver.
+    """
+    a, b, c = dimensions["coxia"], dimensions["femur"], dimensions["tibia"]
+    vertices = _body_vertices(dimensions)
+    return _find_stance(vertices, a, b, c, hip_stance, leg_stance)
+
+
+def _body_vertices(dimensions):
+    f, s, m = dimensions["front"], dimensions["side"], dimensions["middle"]
+    return ((m, 0), (f, s), (-f, s), (-m, 0), (-f, -s), (f, -s))
+
+
+def _find_stance(vertices, a, b, c, hip_stance, leg_stance):
+    # Same as VirtualHexapod.update_stance() of a hexapod in its neutral pose
+    # Returns the foot tips and the height of the body
+    # or None if the stance is unstable
+    #
+    # All the legs have the same femur and tibia angles
+    # so the ground contacts (the lowest points of the legs) have the same z
+    # and the ground plane is parallel to the body.
+    # The lowest point is the foot tip unless the foot tip is above the body
+    # The tibia is vertical in the stance (gamma = -leg_stance = -beta)
+    beta = radians(leg_stance)
+    reach = a + b * cos(beta)
+    foot_z = b * sin(beta) - c
+    contact_reach, contact_z = (reach, foot_z) if foot_z <= 0 else (a, 0.0)
+
+    feet = []
+    contacts = []
+    for i, (vx, vy) in enumerate(vertices):
+        twist = radians(Hexagon.COXIA_AXES[i] + HIP_STANCE_SIGNS[i] * hip_stance)
+        c_twist, s_twist = cos(twist), sin(twist)
+        feet.append((vx + reach * c_twist, vy + reach * s_twist))
+        contacts.append((vx + contact_reach * c_twist, vy + contact_reach * s_twist))
+
+    # Same as ground_contact_solver.find_ground_plane_properties
+    # The normal of the first stable trio points up (or down!)
+    # depending on the order of its points
+    for trio in LEG_TRIOS:
+        normal_z = _stable_trio_normal_z(*[contacts[i] for i in trio])
+        if normal_z is None:
+            continue
+
+        height = -normal_z * contact_z
+        return [(x, y, foot_z + height) for x, y in feet], height
+
+    return None
+
+
+def _stable_trio_normal_z(p1, p2, p3, tol=0.001):
+    # Same as ground_contact_solver.shared.is_stable
+    # when p1, p2 and p3 have the same z, returns None if not stable
+    # or the z of the unit vector normal to the plane of the points
+    ux, uy = p2[0] - p1[0], p2[1] - p1[1]
+    vx, vy = p3[0] - p1[0], p3[1] - p1[1]
+    wx, wy = -p1[0], -p1[1]
+    nz = ux * vy - uy * vx
+    if nz == 0:
+        return None
+
+    beta = (ux * wy - uy * wx) * nz / (nz * nz)
+    gamma = (wx * vy - wy * vx) * nz / (nz * nz)
+    alpha = 1 - gamma - beta
+    min_val, max_val = -tol, 1 + tol
+    if min_val <= alpha <= max_val and min_val <= beta <= max_val:
+        if min_val <= gamma <= max_val:
+            return 1.0 if nz > 0 else -1.0
+
+    return None
+
+
+def _solve_leg(
+    i, links, body_contact, foot_tip, axes, legs_up_in_the_air, angles, points
+):
+    # Same as ik_solver2.IKSolver given one leg
+    # body_contact and foot_tip are wrt to the world frame
+    # axes are the x and z axes of the body
+    a, b, c = links
+    (xx, xy, xz), (nx, ny, nz) = axes
+    p0x, p0y, p0z = body_contact
+    ux, uy, uz = foot_tip[0] - p0x, foot_tip[1] - p0y, foot_tip[2] - p0z
+
+    # The coxia vector is the body to foot vector
+    # projected on the plane of the body
+    k = (ux * nx + uy * ny + uz * nz) / (nx * nx + ny * ny + nz * nz)
+    cx, cy, cz = ux - nx * k, uy - ny * k, uz - nz * k
+    coxia_length = sqrt(cx * cx + cy * cy + cz * cz)
+    cx, cy, cz = cx / coxia_length, cy / coxia_length, cz / coxia_length
+
+    if p0z + cz * a < foot_tip[2]:
+        return IKStatus.COXIA_ON_GROUND
+
+    # Points wrt to the leg frame (the plane of the leg is the xz plane)
+    body_to_foot_length = sqrt(ux * ux + uy * uy + uz * uz)
+    rho = _angle_between(cx, cy, cz, ux, uy, uz)
+    p3x = body_to_foot_length * cos(radians(rho))
+    p3z = -body_to_foot_length * sin(radians(rho))
+
+    dx, dz = p3x - a, p3z
+    d = sqrt(dx * dx + dz * dz)
+    in_the_air = False
+
+    if (c + b > d) and (c + d > b) and (b + d > c):
+        # We can form a triangle with the femur, tibia and coxia to foot vector
+        theta = degrees(acos((d * d + b * b - c * c) / (2 * d * b)))
+        phi = _angle_between(dx, 0, dz, 1, 0, 0)
+        beta = theta + phi if p3z > 0 else theta - phi
+
+        p2x = a + b * cos(radians(beta))
+        p2z = b * sin(radians(beta))
+        gamma = 90 - _angle_between(p2x - a, 0, p2z, p3x - p2x, 0, p3z - p2z)
+        blocked = p2z < p3z
+    else:
+        if d + c < b:
+            return IKStatus.FEMUR_TOO_LONG
+        if d + b < c:
+            return IKStatus.TIBIA_TOO_LONG
+
+        # The leg is too short, stretch it towards the target
+        in_the_air = True
+        legs_up_in_the_air.append(LEG_SIDES[i])
+        if _too_many_legs_up(legs_up_in_the_air):
+            return IKStatus.TOO_MANY_LEGS_UP
+
+        ex, ez = dx / d, dz / d
+        p2x, p2z = a + ex * b, ez * b
+        p3x, p3z = p2x + ex * c, p2z + ez * c
+        gamma = 0.0
+        beta = _angle_between(1, 0, 0, ex * b, 0, p2z)
+        if p2z < 0:
+            beta = -beta
+        blocked = False
+
+    # The twist of the leg wrt to the body x axis
+    twist = _angle_between(cx, cy, cz, xx, xy, xz)
+    # Same as is_counter_clockwise(coxia vector, x axis, z axis)
+    ccw = cx * (xy * nz - xz * ny) + cy * (xz * nx - xx * nz) + cz * (xx * ny - xy * nx)
+    if ccw > 0:
+        twist = -twist
+    alpha = compute_twist_wrt_to_world(twist, Hexagon.COXIA_AXES[i])
+    angles[i] = alpha, beta, gamma
+
+    if blocked:
+        return IKStatus.BLOCKED
+    if abs(beta) > BETA_MAX_ANGLE:
+        return IKStatus.BETA_OUT_OF_RANGE
+    if abs(gamma) > GAMMA_MAX_ANGLE:
+        return IKStatus.GAMMA_OUT_OF_RANGE
+    if abs(alpha) > ALPHA_MAX_ANGLE:
+        return IKStatus.ALPHA_OUT_OF_RANGE
+
+    if points is not None:
+        # Twist the leg frame about the body z axis
+        # which is the same as twisting about the z axis then rotating the body
+        t = radians(twist)
+        ct, st = cos(t), sin(t)
+        # The leg x axis wrt to the world frame
+        lx = (
+            ct * xx + st * (ny * xz - nz * xy),
+            ct * xy + st * (nz * xx - nx * xz),
+            ct * xz + st * (nx * xy - ny * xx),
+        )
+        # The leg y axis is perpendicular to the leg x axis and body z axis
+        # so only the x and z of the leg points are needed
+        leg_points = points[i]
+        leg_points[0] = body_contact
+        for j, (x, z) in enumerate(((a, 0.0), (p2x, p2z), (p3x, p3z)), start=1):
+            leg_points[j] = (
+                p0x + x * lx[0] + z * nx,
+                p0y + x * lx[1] + z * ny,
+                p0z + x * lx[2] + z * nz,
+            )
+
+    return IKStatus.IN_THE_AIR if in_the_air else IKStatus.OK
+
+
+def _angle_between(ax, ay, az, bx, by, bz):
+    # Same as hexapod.points.angle_between
+    cos_theta = (ax * bx + ay * by + az * bz) / sqrt(
+        (ax * ax + ay * ay + az * az) * (bx * bx + by * by + bz * bz)
+    )
+    theta = degrees(acos(cos_theta))
+    return 0.0 if isnan(theta) else theta
+
+
+def _too_many_legs_up(sides):
+    # Same as helpers.legs_too_short
+    return len(sides) >= 4 or sides.count("left") == 3 or sides.count("right") == 3
+
+
+# *********************************************
+# The same kernel for N sets of ik parameters at once
+# Every step above is done on arrays of shape (N,) or (N, 6)
+# *********************************************
+IK_PARAMETER_NAMES = (
+    "hip_stance",
+    "leg_stance",
+    "percent_x",
+    "percent_y",
+    "percent_z",
+    "rot_x",
+    "rot_y",
+    "rot_z",
+)
+COXIA_AXES_ARRAY = np.array(Hexagon.COXIA_AXES, dtype=float)
+HIP_STANCE_SIGNS_ARRAY = np.array(HIP_STANCE_SIGNS, dtype=float)
+LEG_TRIOS_ARRAY = np.array(LEG_TRIOS)
+LEFT_LEGS_ARRAY = np.array([side == "left" for side in LEG_SIDES])
+RIGHT_LEGS_ARRAY = np.array([side == "right" for side in LEG_SIDES])
+
+
+def ik_parameters_to_array(all_ik_parameters):
+    """
+    Convert a list of ik parameters dictionaries
+    into an array of shape (N, 8) which can be used by inverse_kinematics_batch
+    """
+    return np.array(
+        [[params[name] for name in IK_PARAMETER_NAMES] for params in all_ik_parameters],
+        dtype=float,
+    )
+
+
+def inverse_kinematics_batch(dimensions, params):
+    """
+    Given the dimensions of the hexapod and an array of shape (N, 8)
+    of ik parameters (columns in the order of IK_PARAMETER_NAMES)
+    Return
+    - the (N, 6, 3) array of angles (alpha, beta, gamma) of each leg,
+      NaN for the rows which are not possible
+    - the (N,) boolean array, True if the row is possible
+    - the (N,) array of IKStatus codes, the alert that
+      ik_solver2.inverse_kinematics_update would raise (IKStatus.OK if none)
+
+    Unlike compute_ik, cosines out of [-1, 1] because of
+    rounding errors are clipped instead of raising an error.
+    """
+    params = np.asarray(params, dtype=float)
+    f, s, m = dimensions["front"], dimensions["side"], dimensions["middle"]
+    a, b, c = dimensions["coxia"], dimensions["femur"], dimensions["tibia"]
+    hip_stance, leg_stance = params[:, 0], params[:, 1]
+    vertices = np.array([(m, 0), (f, s), (-f, s), (-m, 0), (-f, -s), (f, -s)], float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        feet, height = _find_stances(vertices, a, b, c, hip_stance, leg_stance)
+
+        # The rotation and translation of the body
+        r = frame_rotxyz_batch(params[:, 5], params[:, 6], params[:, 7])[:, :3, :3]
+        body = np.empty(feet.shape)
+        body[..., :2] = vertices
+        body[..., 2] = height[:, np.newaxis]
+        contacts = np.einsum("nij,nlj->nli", r, body)
+        contacts += (params[:, 2:5] * (m, s, c))[:, np.newaxis]
+
+        angles, status = _solve_legs(a, b, c, contacts, feet, r)
+
+    # The same order of checks as compute_ik
+    body_on_ground = contacts[..., 2] < feet[..., 2]
+    status[np.any(body_on_ground, axis=1)] = IKStatus.OK
+    status[body_on_ground] = IKStatus.BODY_ON_GROUND
+    status[np.isnan(height)] = IKStatus.UNSTABLE
+    stance_out_of_range = (np.abs(hip_stance) > ALPHA_MAX_ANGLE) | (
+        np.abs(leg_stance) > min(BETA_MAX_ANGLE, GAMMA_MAX_ANGLE)
+    )
+    status[stance_out_of_range] = IKStatus.STANCE_OUT_OF_RANGE
+
+    codes = first_alerts(status)
+    valid = codes == IKStatus.OK
+    angles[~valid] = np.nan
+    return angles, valid, codes
+
+
+def first_alerts(status):
+    """
+    Given the (..., 6) IKStatus of the legs (as returned by compute_ik)
+    return the (...) IKStatus of the alert that would be raised
+    (see ik_solver2.might_raise_ik_alert), IKStatus.OK if none
+    """
+    status = np.asarray(status)
+    failed = status > IKStatus.IN_THE_AIR
+    first = np.take_along_axis(status, np.argmax(failed, axis=-1)[..., None], -1)
+    codes = np.where(np.any(failed, axis=-1), first[..., 0], IKStatus.OK)
+    body_on_ground = np.any(status == IKStatus.BODY_ON_GROUND, axis=-1)
+    return np.where(body_on_ground, IKStatus.BODY_ON_GROUND, codes).astype(np.int8)
+
+
+def _find_stances(vertices, a, b, c, hip_stance, leg_stance):
+    # Same as _find_stance, the (N, 6, 3) foot tips and the (N,) heights,
+    # NaN if the stance is unstable
+    stance = np.radians(leg_stance)
+    reach = a + b * np.cos(stance)
+    foot_z = b * np.sin(stance) - c
+    on_feet = foot_z <= 0
+    contact_reach = np.where(on_feet, reach, a)
+    contact_z = np.where(on_feet, foot_z, 0.0)
+
+    twist = np.radians(COXIA_AXES_ARRAY + HIP_STANCE_SIGNS_ARRAY * hip_stance[:, None])
+    direction = np.stack([np.cos(twist), np.sin(twist)], axis=-1)
+    feet_xy = vertices + reach[:, None, None] * direction
+    contacts = vertices + contact_reach[:, None, None] * direction
+
+    # The first stable trio (all ground contacts have the same z)
+    p1, p2, p3 = np.moveaxis(contacts[:, LEG_TRIOS_ARRAY], 2, 0)
+    u, v, w = p2 - p1, p3 - p1, -p1
+    nz = u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+    beta = (u[..., 0] * w[..., 1] - u[..., 1] * w[..., 0]) * nz / (nz * nz)
+    gamma = (w[..., 0] * v[..., 1] - w[..., 1] * v[..., 0]) * nz / (nz * nz)
+    alpha = 1 - gamma - beta
+    tol = 0.001
+    stable = (nz != 0) & np.all(
+        (np.stack([alpha, beta, gamma]) >= -tol)
+        & (np.stack([alpha, beta, gamma]) <= 1 + tol),
+        axis=0,
+    )
+    first = np.argmax(stable, axis=1)
+    normal_z = np.sign(nz[np.arange(len(nz)), first])
+    normal_z[~np.any(stable, axis=1)] = np.nan
+
+    height = -normal_z * contact_z
+    feet = np.empty(feet_xy.shape[:-1] + (3,))
+    feet[..., :2] = feet_xy
+    feet[..., 2] = (foot_z + height)[:, None]
+    return feet, height
+
+
+def _solve_legs(a, b, c, body_contact, foot_tip, r):
+    # Same as _solve_leg for (N, 6) legs, returns the angles and the status
+    x_axis, n = r[:, np.newaxis, :, 0], r[:, np.newaxis, :, 2]
+    u = foot_tip - body_contact
+
+    k = np.sum(u * n, axis=-1) / np.sum(n * n, axis=-1)
+    coxia = u - n * k[..., None]
+    coxia /= np.linalg.norm(coxia, axis=-1)[..., None]
+    coxia_on_ground = body_contact[..., 2] + coxia[..., 2] * a < foot_tip[..., 2]
+
+    body_to_foot_length = np.linalg.norm(u, axis=-1)
+    rho = np.radians(_angles_between(coxia, u))
+    p3x = body_to_foot_length * np.cos(rho)
+    p3z = -body_to_foot_length * np.sin(rho)
+    dx, dz = p3x - a, p3z
+    d = np.sqrt(dx * dx + dz * dz)
+
+    # We can form a triangle with the femur, tibia and coxia to foot vector
+    triangle = (c + b > d) & (c + d > b) & (b + d > c)
+    theta = np.degrees(np.arccos(np.clip((d * d + b * b - c * c) / (2 * d * b), -1, 1)))
+    phi = np.degrees(np.arccos(np.clip(dx / d, -1, 1)))
+    beta = np.where(p3z > 0, theta + phi, theta - phi)
+    p2x = a + b * np.cos(np.radians(beta))
+    p2z = b * np.sin(np.radians(beta))
+    femur = np.stack([p2x - a, np.zeros_like(dx), p2z], axis=-1)
+    tibia = np.stack([p3x - p2x, np.zeros_like(dx), p3z - p2z], axis=-1)
+    gamma = 90 - _angles_between(femur, tibia)
+    blocked = triangle & (p2z < p3z)
+
+    # Otherwise the leg is too long or too short
+    femur_too_long = ~triangle & (d + c < b)
+    tibia_too_long = ~triangle & ~femur_too_long & (d + b < c)
+    in_the_air = ~coxia_on_ground & ~triangle & ~femur_too_long & ~tibia_too_long
+    legs_up = np.cumsum(in_the_air, axis=1)
+    left_legs_up = np.cumsum(in_the_air & LEFT_LEGS_ARRAY, axis=1)
+    right_legs_up = np.cumsum(in_the_air & RIGHT_LEGS_ARRAY, axis=1)
+    too_many_legs_up = in_the_air & (
+        (legs_up >= 4) | (left_legs_up == 3) | (right_legs_up == 3)
+    )
+
+    # Stretch the legs which are too short towards the target
+    stretched_beta = np.degrees(np.arccos(np.clip(dx / d, -1, 1)))
+    beta = np.where(triangle, beta, np.where(dz < 0, -stretched_beta, stretched_beta))
+    gamma = np.where(triangle, gamma, 0.0)
+
+    # The twist of the leg wrt to the body x axis
+    twist = _angles_between(coxia, x_axis)
+    ccw = np.sum(coxia * np.cross(x_axis, n), axis=-1) > 0
+    twist = np.where(ccw, -twist, twist)
+    alpha = (twist - COXIA_AXES_ARRAY) % 360
+    alpha = np.where(alpha > 180, alpha - 360, alpha)
+
+    angles = np.stack([alpha, beta, gamma], axis=-1)
+    status = np.select(
+        [
+            coxia_on_ground,
+            femur_too_long,
+            tibia_too_long,
+            too_many_legs_up,
+            blocked,
+            np.abs(beta) > BETA_MAX_ANGLE,
+            np.abs(gamma) > GAMMA_MAX_ANGLE,
+            np.abs(alpha) > ALPHA_MAX_ANGLE,
+            in_the_air,
+        ],
+        [
+            IKStatus.COXIA_ON_GROUND,
+            IKStatus.FEMUR_TOO_LONG,
+            IKStatus.TIBIA_TOO_LONG,
+            IKStatus.TOO_MANY_LEGS_UP,
+            IKStatus.BLOCKED,
+            IKStatus.BETA_OUT_OF_RANGE,
+            IKStatus.GAMMA_OUT_OF_RANGE,
+            IKStatus.ALPHA_OUT_OF_RANGE,
+            IKStatus.IN_THE_AIR,
+        ],
+        IKStatus.OK,
+    ).astype(np.int8)
+    return angles, status
+
+
+def _angles_between(a, b):
+    # Same as _angle_between for arrays of vectors (..., 3)
+    cos_theta = np.sum(a * b, axis=-1) / np.sqrt(
+        np.sum(a * a, axis=-1) * np.sum(b * b, axis=-1)
+    )
+    theta = np.degrees(np.arccos(np.clip(cos_theta, -1, 1)))
+    return np.where(np.isnan(theta), 0.0, theta)
@@ -1,7 +1,6 @@
 # Please look at the discussion of the Inverse Kinematics algorithm
 # As detailed in the README of this directory
 
-from copy import deepcopy
 import numpy as np
 from settings import ASSERTION_ENABLED, ALPHA_MAX_ANGLE
 from hexapod.ik_solver.helpers import (
@@ -35,12 +34,13 @@ from hexapod.ik_solver.shared import (
     compute_twist_wrt_to_world,
 )
 from hexapod.const import HEXAPOD_POSE
+from hexapod.templates.pose_template import copy_poses
 
 
 # Please checkout the definition of the
 # inverse_kinematics_update function
 # as described in hexapod.ik_solver.ik_solver2
-poses = deepcopy(HEXAPOD_POSE)
+poses = copy_poses(HEXAPOD_POSE)
 
 
 def inverse_kinematics_update(hexapod, ik_parameters):
@@ -54,7 +54,7 @@ def inverse_kinematics_update(hexapod, ik_parameters):
         ik_parameters["rot_z"],
     )
 
-    hexapod.update_stance(ik_parameters["hip_stance"], ik_parameters["leg_stance"])
+    hexapod.reset_stance(ik_parameters["hip_stance"], ik_parameters["leg_stance"])
     hexapod.detach_body_rotate_and_translate(rotx, roty, rotz, tx, ty, tz)
 
     if body_contact_shoved_on_ground(hexapod):
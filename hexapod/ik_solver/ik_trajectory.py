@@ -0,0 +1,130 @@
+# The inverse kinematics of a trajectory, one frame at a time
+#
+# frames = ik_trajectory(dimensions, all_ik_parameters)
+# for angles, status in frames:
+#     ...
+# print(frames.fps)
+#
+# A convenience wrapper of ik_kernel.compute_ik: each frame is what
+# compute_ik(dimensions, ik_parameters) returns, solved when it is asked for.
+# There is no warm start from the frame before, there is nothing to start from:
+# - the legs are solved in closed form given the body and their targets
+# - the targets of the legs (the ground contacts) are the foot tips of the stance,
+#   they only change with the stance
+# - the only search, the first stable leg trio of the stance, must be the first
+#   in order (the height of the body depends on it), checking the trio of the
+#   frame before first would not spare checking the trios before it
+# Only what does not change between frames is not computed again:
+# - the stance, which are the foot tips and the height of the body,
+#   while hip_stance and leg_stance are the same
+#   (the stance only depends on them, even if a frame fails)
+# - the rotation of the body while rot_x, rot_y and rot_z are the same
+# This only saves a small part of the time of a frame.
+#
+# frames.cancel() (from the consumer or another thread) stops the iteration,
+# the ik parameters left are not solved.
+import time
+import numpy as np
+from hexapod.points import frame_rotxyz
+from hexapod.ik_solver.helpers import IKStatus
+from hexapod.ik_solver.ik_kernel import (
+    LEG_COUNT,
+    find_stance,
+    solve_stance,
+    stance_alert,
+)
+
+
+def ik_trajectory(dimensions, params_iter):
+    """
+    Return an iterator of the (angles, status) frames, as returned by compute_ik,
+    of each ik parameters dictionary of params_iter
+    """
+    return IKTrajectory(dimensions, params_iter)
+
+
+class IKTrajectory:
+    __slots__ = (
+        "dimensions",
+        "frame_count",
+        "stance_count",
+        "elapsed",
+        "_params",
+        "_cancelled",
+        "_stance_key",
+        "_stance",
+        "_stance_status",
+        "_rotation_key",
+        "_rotation",
+    )
+
+    def __init__(self, dimensions, params_iter):
+        self.dimensions = dimensions
+        self.frame_count = 0
+        # How many times the stance was found
+        self.stance_count = 0
+        # The seconds spent solving the frames
+        self.elapsed = 0.0
+        self._params = iter(params_iter)
+        self._cancelled = False
+        self._stance_key = None
+        self._stance = None
+        self._stance_status = None
+        self._rotation_key = None
+        self._rotation = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._cancelled:
+            raise StopIteration
+
+        ik_parameters = next(self._params)
+        start = time.perf_counter()
+        frame = self._solve(ik_parameters)
+        self.elapsed += time.perf_counter() - start
+        self.frame_count += 1
+        return frame
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def fps(self):
+        # The frames solved per second (the time of the consumer is not counted)
+        if self.elapsed == 0:
+            return 0.0
+        return self.frame_count / self.elapsed
+
+    def _solve(self, ik_parameters):
+        stance_key = ik_parameters["hip_stance"], ik_parameters["leg_stance"]
+        if stance_key != self._stance_key:
+            self.stance_count += 1
+            self._stance_key = stance_key
+            self._stance = find_stance(self.dimensions, *stance_key)
+            self._stance_status = stance_alert(*stance_key, self._stance)
+
+        if self._stance_status != IKStatus.OK:
+            status = np.full(LEG_COUNT, self._stance_status, dtype=np.int8)
+            return np.zeros((LEG_COUNT, 3)), status
+
+        rotation_key = (
+            ik_parameters["rot_x"],
+            ik_parameters["rot_y"],
+            ik_parameters["rot_z"],
+        )
+        if rotation_key != self._rotation_key:
+            self._rotation = frame_rotxyz(*rotation_key)[:3, :3].tolist()
+            self._rotation_key = rotation_key
+
+        return solve_stance(
+            self.dimensions, self._stance, self._rotation, ik_parameters
+        )
+
+    def __repr__(self):
+        return f"IKTrajectory({self.frame_count} frames, {self.fps:.0f} fps)"
@@ -0,0 +1,169 @@
+# An index of which inverse kinematics parameters are possible
+# for one set of dimensions, built offline once per robot
+#
+# $ python -m hexapod.ik_solver.reachability path/to/index ['{"front": 100, ...}']
+#
+# The ik parameters (see ik_kernel.IK_PARAMETER_NAMES) are swept on a grid
+# from BASE_IK_PARAMS to the limits of the sliders (const.IK_SLIDER_RANGES),
+# the step of each parameter is a multiple (its stride) of the resolution
+# of its slider. This writes
+# - path/to/index.codes.npy, one byte per grid point, the IKStatus of
+#   the alert inverse_kinematics_update raises (IKStatus.OK if none)
+# - path/to/index.feasible.npy, one bit per grid point, set if IKStatus.OK
+# - path/to/index.json, the dimensions and the values of each grid axis
+#
+# The arrays are memory mapped when loaded, a lookup only reads one page.
+# The grid is coarse, a lookup is about the nearest grid point
+# and not the exact parameters (ik_kernel.compute_ik gives that exactly)
+import json
+import sys
+import numpy as np
+from hexapod.const import BASE_DIMENSIONS, BASE_IK_PARAMS, IK_SLIDER_RANGES
+from hexapod.ik_solver.helpers import IKStatus
+from hexapod.ik_solver.ik_kernel import IK_PARAMETER_NAMES, inverse_kinematics_batch
+
+# How many slider steps between two grid values of each ik parameter
+# 7 x 13 x 5 x 5 x 5 x 7 x 7 x 7 grid points, about 4 MB
+DEFAULT_GRID_STRIDES = {
+    "hip_stance": 10,
+    "leg_stance": 10,
+    "percent_x": 10,
+    "percent_y": 10,
+    "percent_z": 10,
+    "rot_x": 8,
+    "rot_y": 8,
+    "rot_z": 8,
+}
+
+CHUNK_SIZE = 65536
+
+
+def make_grid_axes(strides=None):
+    """
+    Return the list of the values of each ik parameter on the grid
+    (in the order of IK_PARAMETER_NAMES) given the strides of each parameter
+    """
+    strides = dict(DEFAULT_GRID_STRIDES, **(strides or {}))
+    axes = []
+    for name in IK_PARAMETER_NAMES:
+        min_value, max_value, resolution = IK_SLIDER_RANGES[name]
+        step = strides[name] * resolution
+        base = BASE_IK_PARAMS[name]
+        below = np.arange(base, min_value - 1e-9, -step)[::-1]
+        above = np.arange(base + step, max_value + 1e-9, step)
+        axes.append(np.round(np.concatenate([below, above]), 9))
+    return axes
+
+
+def build_reachability_index(dimensions, path, strides=None, chunk_size=CHUNK_SIZE):
+    """
+    Sweep the grid of ik parameters given the dimensions of the hexapod
+    and write the index to path.codes.npy, path.feasible.npy and path.json
+    Returns the loaded ReachabilityIndex
+    """
+    axes = make_grid_axes(strides)
+    shape = tuple(len(axis) for axis in axes)
+    size = int(np.prod(shape))
+    # Each chunk fills whole bytes of the bitmap
+    chunk_size = max(8, chunk_size - chunk_size % 8)
+
+    codes = np.lib.format.open_memmap(
+        f"{path}.codes.npy", mode="w+", dtype=np.int8, shape=shape
+    )
+    feasible = np.lib.format.open_memmap(
+        f"{path}.feasible.npy", mode="w+", dtype=np.uint8, shape=((size + 7) // 8,)
+    )
+    flat_codes = codes.reshape(-1)
+
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        grid_ids = np.unravel_index(np.arange(start, stop), shape)
+        params = np.stack([axis[ids] for axis, ids in zip(axes, grid_ids)], axis=1)
+        _, valid, chunk_codes = inverse_kinematics_batch(dimensions, params)
+        flat_codes[start:stop] = chunk_codes
+        feasible[start // 8 : (stop + 7) // 8] = np.packbits(valid)
+
+    codes.flush()
+    feasible.flush()
+    del codes, feasible
+
+    with open(f"{path}.json", "w") as f:
+        json.dump({"dimensions": dimensions, "axes": [a.tolist() for a in axes]}, f)
+
+    return ReachabilityIndex.load(path)
+
+
+class ReachabilityIndex:
+    __slots__ = ("dimensions", "axes", "codes", "feasible", "_grids")
+
+    def __init__(self, dimensions, axes, codes, feasible):
+        self.dimensions = dimensions
+        self.axes = axes
+        self.codes = codes
+        self.feasible = feasible
+        # The grid values of each axis are evenly spaced
+        # the first value, the step and the number of values of each axis
+        self._grids = [
+            (
+                float(axis[0]),
+                float(axis[1] - axis[0]) if len(axis) > 1 else 1.0,
+                len(axis),
+            )
+            for axis in axes
+        ]
+
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+
+        axes = [np.array(axis) for axis in meta["axes"]]
+        codes = np.load(f"{path}.codes.npy", mmap_mode="r")
+        feasible = np.load(f"{path}.feasible.npy", mmap_mode="r")
+        return cls(meta["dimensions"], axes, codes, feasible)
+
+    def grid_ids(self, ik_parameters):
+        # The ids of the nearest grid point on each axis
+        grid_ids = []
+        for name, (first, step, count) in zip(IK_PARAMETER_NAMES, self._grids):
+            i = round((ik_parameters[name] - first) / step)
+            grid_ids.append(min(max(i, 0), count - 1))
+        return tuple(grid_ids)
+
+    def status(self, ik_parameters):
+        # The IKStatus of the alert at the nearest grid point
+        return IKStatus(int(self.codes[self.grid_ids(ik_parameters)]))
+
+    def is_feasible(self, ik_parameters):
+        # Same as status(ik_parameters) == IKStatus.OK but read from the bitmap
+        i = 0
+        for grid_id, (_, _, count) in zip(self.grid_ids(ik_parameters), self._grids):
+            i = i * count + grid_id
+        return bool((int(self.feasible[i >> 3]) >> (7 - (i & 7))) & 1)
+
+    def feasible_range(self, name, ik_parameters):
+        """
+        Return the (min, max) grid values of the ik parameter name
+        which are possible, the other parameters at their nearest grid point,
+        or None if none are.
+        """
+        axis_id = IK_PARAMETER_NAMES.index(name)
+        grid_ids = list(self.grid_ids(ik_parameters))
+        grid_ids[axis_id] = slice(None)
+        feasible = self.codes[tuple(grid_ids)] == IKStatus.OK
+        if not np.any(feasible):
+            return None
+
+        values = self.axes[axis_id][feasible]
+        return float(values[0]), float(values[-1])
+
+    def __repr__(self):
+        shape = "x".join(str(n) for n in self.codes.shape)
+        return f"ReachabilityIndex({self.dimensions}, grid: {shape})"
+
+
+if __name__ == "__main__":
+    dimensions = json.loads(sys.argv[2]) if len(sys.argv) > 2 else BASE_DIMENSIONS
+    index = build_reachability_index(dimensions, sys.argv[1])
+    possible = np.count_nonzero(np.asarray(index.codes) == IKStatus.OK)
+    print(f"{index}, {possible} of {index.codes.size} grid points are possible")
@@ -1,8 +1,24 @@
-from copy import deepcopy
+from math import acos, degrees, sqrt
 import numpy as np
-from hexapod.models import VirtualHexapod, Hexagon
+from hexapod.models import (
+    VirtualHexapod,
+    Hexagon,
+    COG_ROW,
+    VERTEX_ROWS,
+    might_raise_poses_range_error,
+)
+from hexapod.pool import HEXAPOD_POOL
+from hexapod.kinematics import (
+    compute_local_points,
+    find_ground_contact_joints,
+    find_twist_angles,
+    poses_to_angles,
+)
+from hexapod.ground_contact_solver.shared import LEG_TRIOS
+from hexapod.ik_solver.ik_kernel import find_stance
 from hexapod.points import (
     angle_between,
+    frame_to_align_vector_a_to_b,
     is_counter_clockwise,
     Vector,
     rotz,
@@ -12,28 +28,35 @@ from hexapod.points import (
 from settings import ASSERTION_ENABLED, PRINT_IK
 
 
-def recompute_hexapod(dimensions, ik_parameters, poses):
+def recompute_hexapod(dimensions, ik_parameters, poses, new_hexapod=None):
+    # new_hexapod (if given) is reused instead of building a new hexapod
+    # it is reconfigured to the dimensions and returned with the given poses
 
     # make the hexapod with all angles = 0
     # update the hexapod so that we know which given points are in contact with the ground
-    old_hexapod = VirtualHexapod(dimensions)
-    old_hexapod.update_stance(ik_parameters["hip_stance"], ik_parameters["leg_stance"])
-    old_contacts = deepcopy(old_hexapod.ground_contacts)
+    with HEXAPOD_POOL.borrow(dimensions) as old_hexapod:
+        old_hexapod.reset_stance(
+            ik_parameters["hip_stance"], ik_parameters["leg_stance"]
+        )
+        old_contact_ids = old_hexapod.ground_contact_ids
+        old_points = [leg.ground_contact().snapshot() for leg in old_hexapod.legs]
 
     # make a new hexapod with all angles = 0
     # and update given the poses/ angles we've computed
-    new_hexapod = VirtualHexapod(dimensions)
+    if new_hexapod is None:
+        new_hexapod = VirtualHexapod(dimensions)
+    else:
+        new_hexapod.reconfigure(dimensions)
     new_hexapod.update(poses)
-    new_contacts = deepcopy(new_hexapod.ground_contacts)
 
     # get two points that are on the ground before and after
     # updating to the given poses
-    id1, id2 = find_two_same_leg_ids(old_contacts, new_contacts)
+    id1, id2 = find_two_same_leg_ids(old_contact_ids, new_hexapod.ground_contact_ids)
 
-    old_p1 = deepcopy(old_hexapod.legs[id1].ground_contact())
-    old_p2 = deepcopy(old_hexapod.legs[id2].ground_contact())
-    new_p1 = deepcopy(new_hexapod.legs[id1].ground_contact())
-    new_p2 = deepcopy(new_hexapod.legs[id2].ground_contact())
+    old_p1 = old_points[id1]
+    old_p2 = old_points[id2]
+    new_p1 = new_hexapod.legs[id1].ground_contact().snapshot()
+    new_p2 = new_hexapod.legs[id2].ground_contact().snapshot()
 
     # we must translate and rotate the hexapod with the pose
     # so that the hexapod is stepping on the old predefined ground contact points
@@ -52,40 +75,200 @@ def recompute_hexapod(dimensions, ik_parameters, poses):
     return new_hexapod
 
 
-def make_contact_dict(ground_contact_list):
-    # map index in ground_contact_list
-    contact_dict = {}
-    for contact in ground_contact_list:
-        left_or_right, front_mid_back, _ = contact.name.split("-")
-        leg_placement = left_or_right + "-" + front_mid_back
-        leg_id = Hexagon.VERTEX_NAMES.index(leg_placement)
-        contact_dict[leg_id] = leg_placement
+# How far the points must be from the thresholds recompute_hexapod
+# decides with (which point of a leg is the lowest, which legs are on the ground)
+# so that a rounding error cannot change its decisions
+DECISION_MARGIN = 1e-6
+
+
+def recompute_hexapod_in_place(dimensions, ik_parameters, poses, hexapod):
+    """
+    Same as recompute_hexapod(dimensions, ik_parameters, poses, hexapod)
+    given the poses and hexapod returned by inverse_kinematics_update
+    but without updating and moving hexapods one Vector at a time.
+
+    The ik solver has already found where the body is,
+    so the points of the legs in the given poses are computed wrt to the body
+    then all the points are tilted, twisted and shifted at once
+    like update(poses) and recompute_hexapod would do.
+    Falls back to recompute_hexapod when a rounding error
+    might change one of its decisions.
+    """
+    might_raise_poses_range_error(poses)
+    found = find_recomputed_points(dimensions, ik_parameters, poses, hexapod)
+    if found is None:
+        return recompute_hexapod(dimensions, ik_parameters, poses, hexapod)
+
+    points, joint_ids, legs_on_ground, frame = found
+    hexapod.points[:] = points
+    hexapod.settle(poses, joint_ids, legs_on_ground, frame)
+    return hexapod
+
+
+def find_recomputed_points(dimensions, ik_parameters, poses, hexapod):
+    # Returns the points of the recomputed hexapod, the ground contact
+    # (joint id) of each leg, the ids of the legs on the ground
+    # and the frame that tilted the body, or None to fall back
+    stance = find_stance(
+        dimensions, ik_parameters["hip_stance"], ik_parameters["leg_stance"]
+    )
+    if stance is None:
+        return None
+
+    # The old ground contacts must be the foot tips, on the ground
+    old_points = np.array(stance[0])
+    if np.any(np.abs(old_points[:, 2]) > DECISION_MARGIN):
+        return None
+
+    # The points wrt to the body (the cog is the origin)
+    # as update(poses) would have them before tilting the body
+    body_frame = hexapod.body_rotation_frame[:3, :3]
+    points = np.matmul(hexapod.points - hexapod.points[COG_ROW], body_frame)
+    legs = points[:COG_ROW].reshape(VirtualHexapod.LEG_COUNT, 4, 3)
+    angles = poses_to_angles(poses)
+    legs[:] = compute_local_points(dimensions, angles[np.newaxis])[0]
+
+    # The body contact and the coxia point are always on the body plane
+    # and the coxia point is prefered, there is no tie to break between them
+    joint_ids = find_ground_contact_joints(legs)
+    lowest = np.sort(legs[:, 1:, 2], axis=1)
+    if np.any(lowest[:, 1] - lowest[:, 0] < DECISION_MARGIN):
+        return None
+
+    contacts = legs[np.arange(VirtualHexapod.LEG_COUNT), joint_ids].tolist()
+    plane = find_ground_plane(contacts)
+    if plane is None:
+        return None
+
+    # Tilt and shift, the ground is the plane z = 0
+    n_axis, height = plane
+    frame = frame_to_align_vector_a_to_b(Vector(*n_axis), Vector(0, 0, 1))
+    points = np.matmul(points, frame[:3, :3].T)
+    points[:, 2] += height
+    legs = points[:COG_ROW].reshape(VirtualHexapod.LEG_COUNT, 4, 3)
+
+    # Same as shared.find_legs_on_ground with a tolerance of 1
+    distances = np.abs(legs[:, 1:, 2])
+    if np.any(np.abs(distances - 1) < DECISION_MARGIN):
+        return None
+    on_ground = np.any(distances <= 1, axis=1)
+    legs_on_ground = np.flatnonzero(on_ground)
 
-    return contact_dict
+    # Same as the twist of update(poses) given a hexapod in its neutral pose
+    # The legs on the ground are not exactly at z = 0
+    # so this twist changes the twist of recompute_hexapod below
+    if np.count_nonzero(angles[:, 0]) >= 3:
+        _, theta = find_twist_angles(
+            dimensions,
+            legs[np.newaxis],
+            np.zeros(1, dtype=int),
+            on_ground[np.newaxis],
+            joint_ids[np.newaxis],
+        )
+        if theta.size > 0:
+            twist_frame = rotz(np.degrees(theta[0]))
+            points = np.matmul(points, twist_frame[:3, :3].T)
+            legs = points[:COG_ROW].reshape(VirtualHexapod.LEG_COUNT, 4, 3)
 
+    # Twist and shift so that the first two legs on the ground
+    # step on their old ground contacts
+    id1, id2 = legs_on_ground[:2]
+    new_vector = legs[id2, joint_ids[id2]] - legs[id1, joint_ids[id1]]
+    old_vector = old_points[id2] - old_points[id1]
+    twist_frame = rotz(find_twist_between_arrays(new_vector, old_vector))
+    points = np.matmul(points, twist_frame[:3, :3].T)
+    points[:, :2] += old_points[id2, :2] - points[VERTEX_ROWS[id2] + 3, :2]
 
-def find_two_same_leg_ids(old_contacts, new_contacts):
+    return points, joint_ids.tolist(), legs_on_ground.tolist(), frame
+
+
+def find_ground_plane(contacts, tol=0.001):
+    # Same as ground_contact_solver.find_ground_plane_properties
+    # given the (x, y, z) ground contact of each leg, one number at a time
+    # Returns the normal (x, y, z) and the height or None if unstable
+    for trio in LEG_TRIOS:
+        (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = [contacts[i] for i in trio]
+        ux, uy, uz = x2 - x1, y2 - y1, z2 - z1
+        vx, vy, vz = x3 - x1, y3 - y1, z3 - z1
+        nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+        n2 = nx * nx + ny * ny + nz * nz
+        if n2 == 0:
+            return None
+
+        # Same as shared.is_stable, w is the vector from p1 to the cog
+        wx, wy, wz = -x1, -y1, -z1
+        beta = (
+            (uy * wz - uz * wy) * nx
+            + (uz * wx - ux * wz) * ny
+            + (ux * wy - uy * wx) * nz
+        ) / n2
+        gamma = (
+            (wy * vz - wz * vy) * nx
+            + (wz * vx - wx * vz) * ny
+            + (wx * vy - wy * vx) * nz
+        ) / n2
+        alpha = 1 - gamma - beta
+        min_val, max_val = -tol, 1 + tol
+        if not (
+            min_val <= alpha <= max_val
+            and min_val <= beta <= max_val
+            and min_val <= gamma <= max_val
+        ):
+            continue
+
+        n_length = sqrt(n2)
+        nx, ny, nz = nx / n_length, ny / n_length, nz / n_length
+        height = -(nx * x1 + ny * y1 + nz * z1)
+
+        # Same as no_other_legs_lower
+        if all(
+            -(nx * x + ny * y + nz * z) <= height + 1
+            for i, (x, y, z) in enumerate(contacts)
+            if i not in trio
+        ):
+            return (nx, ny, nz), height
+
+    return None
+
+
+def find_twist_between_arrays(a, b):
+    # Same as find_twist_to_recompute_hexapod given two (x, y, z) arrays
+    # the cosine is clipped, a rounding error would make acos raise an error
+    (ax, ay, az), (bx, by, bz) = a.tolist(), b.tolist()
+    cos_theta = (ax * bx + ay * by + az * bz) / sqrt(
+        (ax * ax + ay * ay + az * az) * (bx * bx + by * by + bz * bz)
+    )
+    twist = degrees(acos(min(max(cos_theta, -1.0), 1.0)))
+    is_ccw = bx * ay - by * ax > 0
+    return -twist if is_ccw else twist
+
+
+def make_contact_dict(contact_ids):
+    # map the leg id of each (leg id, joint id) to the name of the leg
+    return {leg_id: Hexagon.VERTEX_NAMES[leg_id] for leg_id, _ in contact_ids}
+
+
+def find_two_same_leg_ids(old_contact_ids, new_contact_ids):
     same_ids = []
-    old_contact_dict = make_contact_dict(old_contacts)
-    new_contact_dict = make_contact_dict(new_contacts)
+    new_leg_ids = {leg_id for leg_id, _ in new_contact_ids}
 
     if PRINT_IK:
         print("In recomputing hexapod:")
-        print("...old contacts:", old_contact_dict)
-        print("...new_contacts: ", old_contact_dict)
+        print("...old contacts:", make_contact_dict(old_contact_ids))
+        print("...new_contacts: ", make_contact_dict(new_contact_ids))
 
-    for leg_id in old_contact_dict:
-        if leg_id not in new_contact_dict:
+    for leg_id, _ in old_contact_ids:
+        if leg_id not in new_leg_ids:
             continue
 
         same_ids.append(leg_id)
         if len(same_ids) == 2:
             return same_ids[0], same_ids[1]
 
-    raise Exception(
-        f"Need at least two same points on ground.\n\
-        old: {old_contact_dict}\n new: {new_contact_dict}"
-    )
+    old_contact_dict = make_contact_dict(old_contact_ids)
+    new_contact_dict = make_contact_dict(new_contact_ids)
+    raise Exception(f"Need at least two same points on ground.\n\
+        old: {old_contact_dict}\n new: {new_contact_dict}")
 
 
 def find_twist_to_recompute_hexapod(a, b):
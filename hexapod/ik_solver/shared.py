@@ -3,9 +3,11 @@ from hexapod.points import is_counter_clockwise, angle_between, rotz
 
 
 def update_hexapod_points(hexapod, leg_id, points):
+    # The points take the place (and the storage) of the leg points
     leg = hexapod.legs[leg_id]
     for point, leg_point in zip(points, leg.all_points):
         point.name = leg_point.name
+        point.bind(leg_point)
     leg.all_points = points
 
 
@@ -0,0 +1,196 @@
+# This module computes the forward kinematics of many poses at once
+# It mirrors what VirtualHexapod.update() does for a freshly built hexapod
+# (Linkage.change_pose, then ground_contact_solver.compute_orientation_properties,
+# then the tilt, shift and twist of the whole body)
+# but instead of Vector objects, every point of every pose lives in one numpy array
+#
+# angles - shape (N, 6, 3), the coxia (alpha), femur (beta) and tibia (gamma)
+#          angles in degrees of each of the six legs of N poses
+# points - shape (N, 6, 4, 3), the body contact, coxia, femur and tibia points
+#          of each of the six legs of N poses, wrt to the world frame
+import numpy as np
+from settings import ALPHA_MAX_ANGLE, BETA_MAX_ANGLE, GAMMA_MAX_ANGLE
+from hexapod.models import Hexagon, PoseStatus, VirtualHexapod
+from hexapod.ground_contact_solver.shared import LEG_TRIOS, find_planes
+from hexapod.points import frame_to_align_vector_a_to_b_batch
+
+LEG_TRIOS_ARRAY = np.array(LEG_TRIOS)
+OTHER_LEGS_ARRAY = np.array(
+    [
+        [i for i in range(VirtualHexapod.LEG_COUNT) if i not in trio]
+        for trio in LEG_TRIOS
+    ]
+)
+COXIA_AXES_ARRAY = np.radians(Hexagon.COXIA_AXES)
+Z_AXIS = np.array([0.0, 0.0, 1.0])
+MAX_ANGLES = np.array([ALPHA_MAX_ANGLE, BETA_MAX_ANGLE, GAMMA_MAX_ANGLE])
+
+
+def poses_to_angles(poses):
+    """
+    Convert a poses dictionary (see hexapod.templates.pose_template)
+    into an array of shape (6, 3) which can be used by batch_forward
+    """
+    angles = np.zeros((VirtualHexapod.LEG_COUNT, 3))
+    for pose in poses.values():
+        angles[pose["id"]] = pose["coxia"], pose["femur"], pose["tibia"]
+    return angles
+
+
+def batch_forward(dimensions, angles):
+    """
+    Given the dimensions of the hexapod and an array of
+    shape (N, 6, 3) of angles, return an array of shape (N, 6, 4, 3)
+    which are the points of each leg wrt to the world frame.
+
+    The points of poses which are unstable (the center of gravity
+    is not inside the support polygon) are set to NaN.
+    The angles are NOT checked if they are within the allowed range.
+    """
+    angles = np.asarray(angles, dtype=float)
+    points = compute_local_points(dimensions, angles)
+
+    joint_ids = find_ground_contact_joints(points)
+    contacts = np.take_along_axis(
+        points, joint_ids[..., np.newaxis, np.newaxis], axis=2
+    )[:, :, 0]
+    n, height = find_ground_planes(contacts)
+
+    frames = frame_to_align_vector_a_to_b_batch(n, Z_AXIS)[:, :3, :3]
+    points = np.einsum("nij,nlpj->nlpi", frames, points)
+    points[..., 2] += height[:, np.newaxis, np.newaxis]
+
+    on_ground = find_legs_on_ground(points)
+    might_twist = np.count_nonzero(angles[..., 0], axis=1) >= 3
+    twist_rows = np.flatnonzero(might_twist)
+    if twist_rows.size > 0:
+        twist_points(dimensions, points, twist_rows, on_ground, joint_ids)
+
+    # Nothing met the condition, this pose is unstable
+    points[np.isnan(height)] = np.nan
+    return points
+
+
+def batch_forward_with_status(dimensions, angles):
+    """
+    Same as batch_forward but the angles are checked, returns the points
+    and an array of shape (N,) of the PoseStatus of each pose,
+    the points of poses which are not PoseStatus.OK are set to NaN.
+    """
+    angles = np.asarray(angles, dtype=float)
+    points = batch_forward(dimensions, angles)
+
+    out_of_range = np.any(np.abs(angles) > MAX_ANGLES, axis=(1, 2))
+    unstable = np.isnan(points[:, 0, 0, 0])
+    points[out_of_range] = np.nan
+
+    status = np.full(len(angles), PoseStatus.OK, dtype=np.int8)
+    status[unstable] = PoseStatus.UNSTABLE
+    status[out_of_range] = PoseStatus.ANGLE_OUT_OF_RANGE
+    return points, status
+
+
+def compute_local_points(dimensions, angles):
+    # Points of each leg wrt to the center of gravity
+    # of the hexapod before it is tilted and shifted
+    a, b, c = dimensions["coxia"], dimensions["femur"], dimensions["tibia"]
+    alpha, beta, gamma = np.radians(np.moveaxis(angles, -1, 0))
+
+    # x and z of the points wrt to the leg frame
+    # (see hexapod.linkage for the definitions of the angles)
+    x1 = np.full(beta.shape, float(a))
+    z1 = np.zeros(beta.shape)
+    x2 = x1 + b * np.cos(beta)
+    z2 = b * np.sin(beta)
+    x3 = x2 + c * np.sin(beta + gamma)
+    z3 = z2 - c * np.cos(beta + gamma)
+
+    origins = _body_contacts(dimensions)
+    twist = COXIA_AXES_ARRAY + alpha
+    cos_twist, sin_twist = np.cos(twist), np.sin(twist)
+
+    points = np.empty(angles.shape[:-1] + (4, 3))
+    points[..., 0, :2] = origins
+    points[..., 0, 2] = 0.0
+    for j, (x, z) in enumerate([(x1, z1), (x2, z2), (x3, z3)], start=1):
+        points[..., j, 0] = origins[:, 0] + x * cos_twist
+        points[..., j, 1] = origins[:, 1] + x * sin_twist
+        points[..., j, 2] = z
+
+    return points
+
+
+def find_ground_contact_joints(points):
+    # Same as Linkage.compute_ground_contact_id
+    # the lowest point of each leg, prefering the points nearest the foot tip
+    reversed_z = points[..., ::-1, 2]
+    return 3 - np.argmin(reversed_z, axis=-1)
+
+
+def find_ground_planes(contacts, tol=0.001):
+    """
+    Same as ground_contact_solver.find_ground_plane_properties,
+    Returns the normal vectors (N, 3) and heights (N,)
+    of the ground planes, NaN if the pose is unstable
+    """
+    p0 = contacts[:, LEG_TRIOS_ARRAY[:, 0]]
+    p1 = contacts[:, LEG_TRIOS_ARRAY[:, 1]]
+    p2 = contacts[:, LEG_TRIOS_ARRAY[:, 2]]
+    stable, n, height = find_planes(p0, p1, p2, tol)
+
+    # The contacts of the other legs cannot be lower than the ground
+    with np.errstate(invalid="ignore"):
+        others = contacts[:, OTHER_LEGS_ARRAY]
+        other_heights = -np.einsum("ntki,nti->ntk", others, n)
+        no_other_lower = np.all(other_heights <= height[..., np.newaxis] + 1, axis=-1)
+
+    valid = stable & no_other_lower
+    found = np.any(valid, axis=1)
+    first = np.argmax(valid, axis=1)
+    rows = np.arange(contacts.shape[0])
+
+    n = np.where(found[:, np.newaxis], n[rows, first], np.nan)
+    height = np.where(found, height[rows, first], np.nan)
+    return n, height
+
+
+def find_legs_on_ground(points, tol=1):
+    # Same as ground_contact_solver.shared.find_legs_on_ground
+    # After tilting and shifting, the ground is the plane z = 0
+    # so the height of a point wrt to the ground plane is just its z
+    # (the point with -n . p == height before the tilt has z == 0 after)
+    with np.errstate(invalid="ignore"):
+        return np.any(np.abs(points[..., 1:, 2]) <= tol, axis=-1)
+
+
+def twist_points(dimensions, points, rows, on_ground, joint_ids):
+    rows, theta = find_twist_angles(dimensions, points, rows, on_ground, joint_ids)
+    c, s = np.cos(theta), np.sin(theta)
+    x = points[rows, ..., 0].copy()
+    y = points[rows, ..., 1]
+    points[rows, ..., 0] = c[:, None, None] * x - s[:, None, None] * y
+    points[rows, ..., 1] = s[:, None, None] * x + c[:, None, None] * y
+
+
+def find_twist_angles(dimensions, points, rows, on_ground, joint_ids):
+    # Same as models.find_twist_frame
+    # Returns the rows which are twisted and their twist angles in radians
+    # The ground contacts of a freshly built hexapod are the foot tips
+    # Find the first leg whose foot tip is on the ground before and after
+    same = on_ground[rows] & (joint_ids[rows] == 3)
+    has_same = np.any(same, axis=1)
+    rows, leg_ids = rows[has_same], np.argmax(same[has_same], axis=1)
+
+    origins = _body_contacts(dimensions)
+    reach = dimensions["coxia"] + dimensions["femur"]
+    old_x = origins[leg_ids, 0] + reach * np.cos(COXIA_AXES_ARRAY[leg_ids])
+    old_y = origins[leg_ids, 1] + reach * np.sin(COXIA_AXES_ARRAY[leg_ids])
+    new = points[rows, leg_ids, 3]
+
+    theta = np.arctan2(old_y, old_x) - np.arctan2(new[:, 1], new[:, 0])
+    return rows, theta
+
+
+def _body_contacts(dimensions):
+    f, m, s = dimensions["front"], dimensions["middle"], dimensions["side"]
+    return np.array([(m, 0), (f, s), (-f, s), (-m, 0), (-f, -s), (f, -s)], dtype=float)
@@ -56,13 +56,55 @@
 #               |gamma\\            \
 #               |      *----------------
 #
-from copy import deepcopy
+from math import radians, sin, cos
 import numpy as np
-from hexapod.points import (
-    Vector,
-    frame_yrotate_xtranslate,
-    frame_zrotate_xytranslate,
-)
+from settings import LEG_POINTS_CACHE_SIZE
+from hexapod.cache import LRUCache
+from hexapod.points import Vector
+
+# The UI only sends a small set of (quantized) angles
+# so the same leg configurations are requested again and again.
+# Maps (a, b, c, alpha, beta, gamma, coxia_axis) to the (read only) points
+# of the leg wrt to its body contact point, shared by all linkages
+LEG_POINTS_CACHE = LRUCache(LEG_POINTS_CACHE_SIZE)
+
+
+def compute_local_points(a, b, c, alpha, beta, gamma, coxia_axis, out=None):
+    """
+    Return the (4, 3) array of the body contact, coxia, femur and tibia points
+    of a leg wrt to its body contact point (the axes are parallel to the hexapod's)
+
+    This is the product of the frames
+    - frame_01 (rotate -beta about y, translate a in x)
+    - frame_12 (rotate 90 - gamma about y, translate b in x)
+    - frame_23 (translate c in x)
+    - rotate coxia_axis + alpha about z
+    computed in closed form
+    """
+    beta, gamma = radians(beta), radians(gamma)
+    twist = radians(coxia_axis + alpha)
+    c_twist, s_twist = cos(twist), sin(twist)
+
+    # x and z of the points wrt to the leg frame
+    x2 = a + b * cos(beta)
+    z2 = b * sin(beta)
+    x3 = x2 + c * sin(beta + gamma)
+    z3 = z2 - c * cos(beta + gamma)
+
+    # fmt: off
+    values = (
+        0, 0, 0,
+        a * c_twist, a * s_twist, 0,
+        x2 * c_twist, x2 * s_twist, z2,
+        x3 * c_twist, x3 * s_twist, z3,
+    )
+    # fmt: on
+
+    if out is None:
+        return np.array(values, dtype=float).reshape(4, 3)
+
+    out.flat[:] = values
+    return out
 
 
 class Linkage:
@@ -80,7 +122,10 @@ class Linkage:
         "name",
         "id",
         "all_points",
-        "ground_contact_point",
+        "ground_contact_id",
+        "point_array",
+        "first_row",
+        "origin_array",
     )
 
     def __init__(
@@ -95,16 +140,49 @@ class Linkage:
         new_origin=Vector(0, 0, 0),
         name=None,
         id_number=None,
+        point_array=None,
+        first_row=0,
     ):
         self.a = a
         self.b = b
         self.c = c
-        self.new_origin = new_origin
+        self.new_origin = Vector(*new_origin.vec, name=new_origin.name)
+        self.origin_array = np.array(new_origin.vec, dtype=float)
         self.coxia_axis = coxia_axis
         self.id = id_number
         self.name = name
+
+        # The four points of this leg are stored in the rows
+        # first_row to first_row + 3 of point_array
+        # which can be shared with other legs (see VirtualHexapod.points)
+        if point_array is None:
+            point_array = np.zeros((4, 3))
+        self.point_array = point_array
+        self.first_row = first_row
+
+        names = [new_origin.name + "-body-contact"]
+        names += [name + "-" + point_name for point_name in Linkage.POINT_NAMES]
+        self.all_points = [
+            Vector.view(point_array, first_row + i, point_name)
+            for i, point_name in enumerate(names)
+        ]
+
         self.change_pose(alpha, beta, gamma)
 
+    def reconfigure(self, a, b, c, new_origin):
+        # Change the lengths of the links and where the leg is attached
+        # call change_pose() afterwards to update the points
+        self.a = a
+        self.b = b
+        self.c = c
+        self.new_origin = Vector(*new_origin.vec, name=new_origin.name)
+        self.origin_array[:] = new_origin.vec
+
+    @property
+    def points_array(self):
+        # A (4, 3) view of the points of this leg
+        return self.point_array[self.first_row : self.first_row + 4]
+
     def coxia_angle(self):
         return self.alpha
 
@@ -121,7 +199,7 @@ class Linkage:
         return self.all_points[3]
 
     def ground_contact(self):
-        return self.ground_contact_point
+        return self.all_points[self.ground_contact_id]
 
     def get_point(self, i):
         return self.all_points[i]
@@ -131,46 +209,35 @@ class Linkage:
         self.beta = beta
         self.gamma = gamma
 
-        # frame_ab is the pose of frame_b wrt frame_a
-        frame_01 = frame_yrotate_xtranslate(theta=-self.beta, x=self.a)
-        frame_12 = frame_yrotate_xtranslate(theta=90 - self.gamma, x=self.b)
-        frame_23 = frame_yrotate_xtranslate(theta=0, x=self.c)
-
-        frame_02 = np.matmul(frame_01, frame_12)
-        frame_03 = np.matmul(frame_02, frame_23)
-        new_frame = frame_zrotate_xytranslate(
-            self.coxia_axis + self.alpha, self.new_origin.x, self.new_origin.y
-        )
-
         # find points wrt to body contact point
-        p0 = Vector(0, 0, 0)
-        p1 = p0.get_point_wrt(frame_01)
-        p2 = p0.get_point_wrt(frame_02)
-        p3 = p0.get_point_wrt(frame_03)
+        key = (self.a, self.b, self.c, alpha, beta, gamma, self.coxia_axis)
+        local_points = LEG_POINTS_CACHE.get(key)
+        if local_points is None:
+            local_points = compute_local_points(*key)
+            local_points.flags.writeable = False
+            LEG_POINTS_CACHE.put(key, local_points)
 
         # find points wrt to center of gravity
-        p0 = deepcopy(self.new_origin)
-        p0.name += "-body-contact"
-        p1 = p1.get_point_wrt(new_frame, name=self.name + "-coxia")
-        p2 = p2.get_point_wrt(new_frame, name=self.name + "-femur")
-        p3 = p3.get_point_wrt(new_frame, name=self.name + "-tibia")
+        np.add(local_points, self.origin_array, out=self.points_array)
 
-        self.all_points = [p0, p1, p2, p3]
-        self.ground_contact_point = self.compute_ground_contact()
+        self.ground_contact_id = self.compute_ground_contact_id()
 
     def update_leg_wrt(self, frame, height):
-        for point in self.all_points:
-            point.update_point_wrt(frame, height)
+        points = self.points_array
+        points[:] = np.matmul(points, frame[:3, :3].T) + frame[:3, 3]
+        points[:, 2] += height
 
-    def compute_ground_contact(self):
+    def compute_ground_contact_id(self):
+        # The index in all_points of the ground contact (the lowest point)
         # ❗IMPORTANT: Verify if this assumption is correct
         # ❗VERIFIED: This assumption is indeed wrong
-        ground_contact = self.all_points[3]
-        for point in reversed(self.all_points):
-            if point.z < ground_contact.z:
-                ground_contact = point
+        z = self.points_array[:, 2].tolist()
+        joint_id = 3
+        for i in (3, 2, 1, 0):
+            if z[i] < z[joint_id]:
+                joint_id = i
 
-        return ground_contact
+        return joint_id
 
     def __str__(self):
         leg_string = f"{self!r}\n"
@@ -1,16 +1,26 @@
 # This module contains the model of a hexapod
 # It's used to manipulate the pose of the hexapod
-from copy import deepcopy
 from pprint import pprint
 from math import atan2, degrees, isclose
+from enum import IntEnum
 import json
 import numpy as np
-from settings import PRINT_MODEL_ON_UPDATE, ALPHA_MAX_ANGLE, BETA_MAX_ANGLE, GAMMA_MAX_ANGLE
+from settings import (
+    PRINT_MODEL_ON_UPDATE,
+    ALPHA_MAX_ANGLE,
+    BETA_MAX_ANGLE,
+    GAMMA_MAX_ANGLE,
+    STANCE_CACHE_SIZE,
+    TRACK_GROUND_CONTACTS,
+)
+from hexapod.cache import LRUCache
 from hexapod.linkage import Linkage
+from hexapod.results import Result
 import hexapod.ground_contact_solver.ground_contact_solver as gc
 import hexapod.ground_contact_solver.ground_contact_solver2 as gc2
+from hexapod.ground_contact_solver.tracker import ContactTracker
 
-from hexapod.templates.pose_template import HEXAPOD_POSE
+from hexapod.templates.pose_template import HEXAPOD_POSE, copy_poses
 from hexapod.points import (
     Vector,
     frame_to_align_vector_a_to_b,
@@ -58,6 +68,35 @@ from hexapod.points import (
 #          /         \
 #         x4         x5
 #
+#
+# All the points of the hexapod are stored in one (26, 3) array
+# - rows 4i to 4i + 3 are the body contact, coxia, femur and tibia points of leg i
+#   (the body contact of leg i is also the vertex i of the hexagon)
+# - row 24 is the center of gravity
+# - row 25 is the head
+POINT_COUNT = 26
+COG_ROW = 24
+HEAD_ROW = 25
+VERTEX_ROWS = (0, 4, 8, 12, 16, 20)
+BODY_ROWS = VERTEX_ROWS + (COG_ROW, HEAD_ROW)
+
+# The stance only changes with the hip stance and leg stance sliders
+# while the inverse kinematics page is updated on every slider.
+# Maps (f, s, m, a, b, c, hip_stance, leg_stance) to the (read only) points,
+# ground contact (joint id) of each leg, ids of the legs on the ground
+# and (read only) frame of the local axes of a hexapod in this stance
+STANCE_CACHE = LRUCache(STANCE_CACHE_SIZE)
+
+POSE_UNSTABLE_ALERT_MSG = "❗Pose Unstable. COG not inside support polygon."
+
+
+class PoseStatus(IntEnum):
+    # Why VirtualHexapod.try_update() could not put the hexapod in its poses
+    OK = 0
+    ANGLE_OUT_OF_RANGE = 1
+    UNSTABLE = 2
+
+
 class Hexagon:
     VERTEX_NAMES = (
         "right-middle",
@@ -68,26 +107,45 @@ class Hexagon:
         "right-back",
     )
     COXIA_AXES = (0, 45, 135, 180, 225, 315)
-    __slots__ = ("f", "m", "s", "cog", "head", "vertices", "all_points")
+    __slots__ = ("f", "m", "s", "point_array", "cog", "head", "vertices", "all_points")
 
-    def __init__(self, f, m, s):
-        self.f = f
-        self.m = m
-        self.s = s
+    def __init__(self, f, m, s, point_array=None):
+        if point_array is None:
+            point_array = np.zeros((POINT_COUNT, 3))
+
+        self.point_array = point_array
+        self.reset(f, m, s)
 
-        self.cog = Vector(0, 0, 0, name="center-of-gravity")
-        self.head = Vector(0, s, 0, name="head")
+        self.cog = Vector.view(point_array, COG_ROW, name="center-of-gravity")
+        self.head = Vector.view(point_array, HEAD_ROW, name="head")
         self.vertices = [
-            Vector(m, 0, 0, name=Hexagon.VERTEX_NAMES[0]),
-            Vector(f, s, 0, name=Hexagon.VERTEX_NAMES[1]),
-            Vector(-f, s, 0, name=Hexagon.VERTEX_NAMES[2]),
-            Vector(-m, 0, 0, name=Hexagon.VERTEX_NAMES[3]),
-            Vector(-f, -s, 0, name=Hexagon.VERTEX_NAMES[4]),
-            Vector(f, -s, 0, name=Hexagon.VERTEX_NAMES[5]),
+            Vector.view(point_array, row, name=name)
+            for row, name in zip(VERTEX_ROWS, Hexagon.VERTEX_NAMES)
         ]
 
         self.all_points = self.vertices + [self.cog, self.head]
 
+    def reset(self, f, m, s):
+        # Move the points back to their neutral position
+        # given the (possibly new) dimensions of the hexagon
+        self.f = f
+        self.m = m
+        self.s = s
+        self.point_array[BODY_ROWS, :] = [
+            (m, 0, 0),
+            (f, s, 0),
+            (-f, s, 0),
+            (-m, 0, 0),
+            (-f, -s, 0),
+            (f, -s, 0),
+            (0, 0, 0),
+            (0, s, 0),
+        ]
+
+    def reset_cog_and_head(self):
+        self.cog.x, self.cog.y, self.cog.z = 0, 0, 0
+        self.head.x, self.head.y, self.head.z = 0, self.s, 0
+
 
 # ..........................................
 # The hexapod model
@@ -95,6 +153,7 @@ class Hexagon:
 class VirtualHexapod:
     LEG_COUNT = 6
     __slots__ = (
+        "points",
         "body",
         "legs",
         "dimensions",
@@ -105,28 +164,93 @@ class VirtualHexapod:
         "side",
         "mid",
         "body_rotation_frame",
-        "ground_contacts",
+        "ground_contact_ids",
         "x_axis",
         "y_axis",
         "z_axis",
+        "contact_tracker",
+        "neutral_points",
+        "posed_points",
+        "posed_angles",
+        "legs_posed",
+        "legs_kept",
     )
 
     def __init__(self, dimensions):
+        # The ground contacts of the last update since the hexapod
+        # was built or reset, only used when the tie break is random
+        # and no other tracker is given to update()
+        # (see ground_contact_solver.tracker)
+        self.contact_tracker = ContactTracker()
+        # How many legs update() posed again, or kept as they were posed
+        # the last time because their angles did not change
+        self.legs_posed = 0
+        self.legs_kept = 0
         self._store_attributes(dimensions)
+        self._init_body()
         self._init_legs()
         self._init_local_frame()
 
-    def update(self, poses, assume_ground_targets=True):
-        might_raise_poses_range_error(poses)
+    def reset(self):
+        # Put the hexapod back to the state right after it was built
+        # (all angles are zero), without building a new one.
+        # The legs as they were posed by the last update are kept
+        # so that the next update only poses the legs which changed,
+        # which does not change the result of the next update.
+        # The ground contacts of the last update are forgotten, they would
+        # change which one of many stable positions is picked
+        self.contact_tracker.forget()
+        self.body_rotation_frame = None
+        self.points[:] = self.neutral_points
+        for leg in self.legs:
+            leg.alpha, leg.beta, leg.gamma = 0, 0, 0
+            leg.ground_contact_id = leg.compute_ground_contact_id()
+
+        self.ground_contact_ids = find_contact_ids(self.legs)
+        self._reset_local_frame()
+
+    def reconfigure(self, dimensions):
+        # Same as reset() but also change the dimensions of the hexapod
+        # afterwards, it is the same as VirtualHexapod(dimensions)
+        self._store_attributes(dimensions)
+        self.body.reset(self.front, self.mid, self.side)
+        for leg, vertex in zip(self.legs, self.body.vertices):
+            leg.reconfigure(self.coxia, self.femur, self.tibia, vertex)
+            leg.change_pose(0, 0, 0)
+
+        self._store_neutral_points()
+        self.reset()
+
+    @property
+    def ground_contacts(self):
+        # The points (named views of self.points) of ground_contact_ids,
+        # the (leg id, joint id) of the ground contact of each leg on the ground
+        return [self.legs[i].all_points[j] for i, j in self.ground_contact_ids]
+
+    def update(self, poses, assume_ground_targets=True, contact_tracker=None):
+        self.try_update(poses, assume_ground_targets, contact_tracker).unwrap()
+
+    def try_update(self, poses, assume_ground_targets=True, contact_tracker=None):
+        # Same as update() but returns a Result (its value is None)
+        # instead of raising when the poses are not possible.
+        # contact_tracker replaces the tracker of the hexapod
+        # when the hexapod does not outlive the updates it tracks
+        # (eg hexapods borrowed from hexapod.pool)
+        range_error = find_poses_range_error(poses)
+        if range_error is not None:
+            return Result(
+                PoseStatus.ANGLE_OUT_OF_RANGE, None, poses_range_error_msg, range_error
+            )
 
         self.body_rotation_frame = None
         might_twist = find_if_might_twist(self, poses)
-        old_contacts = deepcopy(self.ground_contacts)
+        old_contact_ids = self.ground_contact_ids
+        old_contact_points = self.points[contact_rows(old_contact_ids)]
 
         # Update leg poses
-        for pose in poses.values():
-            i = pose["id"]
-            self.legs[i].change_pose(pose["coxia"], pose["femur"], pose["tibia"])
+        # (this also moves the hexagon vertices back to their neutral position)
+        self.body.reset_cog_and_head()
+        self._pose_legs(poses)
 
         # Find new orientation of the body (new normal)
         # distance of cog from ground and which legs are on the ground
@@ -135,10 +259,15 @@ class VirtualHexapod:
             # are correct then we don't have to test all possible cases
             legs, n_axis, height = gc.compute_orientation_properties(self.legs)
         else:
-            legs, n_axis, height = gc2.compute_orientation_properties(self.legs)
+            tracker = None
+            if TRACK_GROUND_CONTACTS:
+                tracker = contact_tracker or self.contact_tracker
+            legs, n_axis, height = gc2.compute_orientation_properties(
+                self.legs, tracker=tracker
+            )
 
         if n_axis is None:
-            raise Exception("❗Pose Unstable. COG not inside support polygon.")
+            return Result(PoseStatus.UNSTABLE, None, pose_unstable_msg)
 
         # Tilt and shift the hexapod based on new normal
         frame = frame_to_align_vector_a_to_b(n_axis, Vector(0, 0, 1))
@@ -146,46 +275,98 @@ class VirtualHexapod:
         self._update_local_frame(frame)
 
         # Twist around the new normal if you have to
-        self.ground_contacts = [leg.ground_contact() for leg in legs]
+        self.ground_contact_ids = find_contact_ids(legs)
 
         if might_twist:
-            twist_frame = find_twist_frame(old_contacts, self.ground_contacts)
+            twist_frame = find_twist_frame(
+                old_contact_ids,
+                old_contact_points,
+                self.ground_contact_ids,
+                self.points,
+            )
             self.rotate_and_shift(twist_frame)
 
         might_print_hexapod(self, poses)
+        return Result(PoseStatus.OK)
+
+    def update_info(self, contact_tracker=None):
+        # How much of the work of the updates so far was skipped:
+        # the legs which were not posed again and the ground contacts found
+        # without the full search, counted by the tracker given to update()
+        # (the kinematics page gives the tracker of hexapod.pool)
+        # or else by the tracker of the hexapod
+        tracker = contact_tracker or self.contact_tracker
+        total = self.legs_posed + self.legs_kept
+        return {
+            "legs_posed": self.legs_posed,
+            "legs_kept": self.legs_kept,
+            "kept_rate": self.legs_kept / total if total else 0.0,
+            "ground_contacts": tracker.info(),
+        }
+
+    def settle(self, poses, joint_ids, legs_on_ground, frame):
+        # The points of the hexapod are already where update(poses) puts them
+        # set everything else update(poses) would have set:
+        # the angles and ground contact (joint_ids) of each leg,
+        # the ground contacts of the legs_on_ground (leg ids)
+        # and the local frame tilted by frame (the twist is not applied to it)
+        self.body_rotation_frame = None
+        for leg, joint_id in zip(self.legs, joint_ids):
+            pose = poses[leg.id]
+            leg.alpha, leg.beta, leg.gamma = pose["coxia"], pose["femur"], pose["tibia"]
+            leg.ground_contact_id = joint_id
+
+        self.ground_contact_ids = tuple((i, joint_ids[i]) for i in legs_on_ground)
+        self._reset_local_frame()
+        self._update_local_frame(frame)
 
     def detach_body_rotate_and_translate(self, rx, ry, rz, tx, ty, tz):
         # Detach the body of the hexapod from the legs
         # then rotate and translate body as if a separate entity
+        # (The body contact points of the legs are the hexagon vertices
+        # so they move with the body)
         frame = frame_rotxyz(rx, ry, rz)
         self.body_rotation_frame = frame
 
-        for point in self.body.all_points:
-            point.update_point_wrt(frame)
-            point.move_xyz(tx, ty, tz)
+        body_points = self.points[BODY_ROWS, :]
+        body_points = np.matmul(body_points, frame[:3, :3].T) + frame[:3, 3]
+        self.points[BODY_ROWS, :] = body_points + (tx, ty, tz)
 
         self._update_local_frame(frame)
 
     def move_xyz(self, tx, ty, tz):
-        for point in self.body.all_points:
-            point.move_xyz(tx, ty, tz)
-
-        for leg in self.legs:
-            for point in leg.all_points:
-                point.move_xyz(tx, ty, tz)
+        self.points += (tx, ty, tz)
 
     def update_stance(self, hip_stance, leg_stance):
-        pose = deepcopy(HEXAPOD_POSE)
-        pose[1]["coxia"] = -hip_stance  # right_front
-        pose[2]["coxia"] = hip_stance  # left_front
-        pose[4]["coxia"] = -hip_stance  # left_back
-        pose[5]["coxia"] = hip_stance  # right_back
-
-        for leg in pose.values():
-            leg["femur"] = leg_stance
-            leg["tibia"] = -leg_stance
-
-        self.update(pose)
+        self.update(make_stance_poses(hip_stance, leg_stance))
+
+    def reset_stance(self, hip_stance, leg_stance):
+        # Same as reset() then update_stance(hip_stance, leg_stance)
+        # but the resulting state is cached given the dimensions and the stance
+        key = (
+            self.front,
+            self.side,
+            self.mid,
+            self.coxia,
+            self.femur,
+            self.tibia,
+            hip_stance,
+            leg_stance,
+        )
+        stance = STANCE_CACHE.get(key)
+        if stance is None:
+            self.reset()
+            self.update_stance(hip_stance, leg_stance)
+            STANCE_CACHE.put(key, self._make_stance_entry())
+            return
+
+        # What reset() does besides moving the points,
+        # settle() also forgets the body rotation frame
+        self.contact_tracker.forget()
+        points, joint_ids, legs_on_ground, frame = stance
+        self.points[:] = points
+        poses = make_stance_poses(hip_stance, leg_stance)
+        self.settle(poses, joint_ids, legs_on_ground, frame)
 
     def sum_of_dimensions(self):
         f, m, s = self.front, self.mid, self.side
@@ -201,7 +382,10 @@ class VirtualHexapod:
         self.front = dimensions["front"]
         self.mid = dimensions["middle"]
         self.side = dimensions["side"]
-        self.body = Hexagon(self.front, self.mid, self.side)
+
+    def _init_body(self):
+        self.points = np.zeros((POINT_COUNT, 3))
+        self.body = Hexagon(self.front, self.mid, self.side, self.points)
 
     def _init_legs(self):
         self.legs = []
@@ -214,23 +398,82 @@ class VirtualHexapod:
                 new_origin=self.body.vertices[i],
                 name=Hexagon.VERTEX_NAMES[i],
                 id_number=i,
+                point_array=self.points,
+                first_row=VERTEX_ROWS[i],
             )
             self.legs.append(linkage)
 
-        self.ground_contacts = [leg.ground_contact() for leg in self.legs]
+        self.ground_contact_ids = find_contact_ids(self.legs)
+        self._store_neutral_points()
+
+    def _store_neutral_points(self):
+        # The points when all angles are zero, which reset() goes back to
+        # (the legs must be in this pose when this is called)
+        self.neutral_points = self.points.copy()
+        self.neutral_points.flags.writeable = False
+        # The legs are posed (wrt to the body in its neutral position)
+        # and their rows of posed_points are kept until their angles change
+        self.posed_points = self.points.copy()
+        self.posed_angles = [(0, 0, 0)] * VirtualHexapod.LEG_COUNT
+
+    def _pose_legs(self, poses):
+        # Same as leg.change_pose() of each leg given its pose
+        # but the legs whose angles are the same as the last time they were posed
+        # are copied from posed_points instead
+        points = self.points
+        posed_points = self.posed_points
+        for pose in poses.values():
+            i = pose["id"]
+            leg = self.legs[i]
+            angles = pose["coxia"], pose["femur"], pose["tibia"]
+            rows = slice(leg.first_row, leg.first_row + 4)
+
+            if angles == self.posed_angles[i]:
+                self.legs_kept += 1
+                leg.alpha, leg.beta, leg.gamma = angles
+                points[rows] = posed_points[rows]
+                leg.ground_contact_id = leg.compute_ground_contact_id()
+                continue
+
+            self.legs_posed += 1
+            leg.change_pose(*angles)
+            posed_points[rows] = points[rows]
+            self.posed_angles[i] = angles
 
     def rotate_and_shift(self, frame, height=0):
-        for vertex in self.body.all_points:
-            vertex.update_point_wrt(frame, height)
+        # One rigid transform of all the points of the hexapod
+        points = self.points
+        points[:] = np.matmul(points, frame[:3, :3].T) + frame[:3, 3]
+        points[:, 2] += height
 
-        for leg in self.legs:
-            leg.update_leg_wrt(frame, height)
+    def _make_stance_entry(self):
+        # Everything settle() needs to put a hexapod back in this state
+        points = self.points.copy()
+        points.flags.writeable = False
+
+        joint_ids = tuple(leg.ground_contact_id for leg in self.legs)
+        legs_on_ground = tuple(leg_id for leg_id, _ in self.ground_contact_ids)
+
+        # The local axes of a hexapod in its neutral pose are the world axes
+        # so the columns of the frame are the axes
+        frame = np.eye(4)
+        frame[:3, :3] = np.transpose(
+            [self.x_axis.vec, self.y_axis.vec, self.z_axis.vec]
+        )
+        frame.flags.writeable = False
+
+        return points, joint_ids, legs_on_ground, frame
 
     def _init_local_frame(self):
         self.x_axis = Vector(1, 0, 0, name="hexapod x axis")
         self.y_axis = Vector(0, 1, 0, name="hexapod y axis")
         self.z_axis = Vector(0, 0, 1, name="hexapod z axis")
 
+    def _reset_local_frame(self):
+        self.x_axis.x, self.x_axis.y, self.x_axis.z = 1, 0, 0
+        self.y_axis.x, self.y_axis.y, self.y_axis.z = 0, 1, 0
+        self.z_axis.x, self.z_axis.y, self.z_axis.z = 0, 0, 1
+
     def _update_local_frame(self, frame):
         # Update the x, y, z axis centered at cog of hexapod
         self.x_axis.update_point_wrt(frame)
@@ -242,31 +485,56 @@ class VirtualHexapod:
 # Helper functions
 # ..........................................
 
+def make_stance_poses(hip_stance, leg_stance):
+    pose = copy_poses(HEXAPOD_POSE)
+    pose[1]["coxia"] = -hip_stance  # right_front
+    pose[2]["coxia"] = hip_stance  # left_front
+    pose[4]["coxia"] = -hip_stance  # left_back
+    pose[5]["coxia"] = hip_stance  # right_back
+
+    for leg in pose.values():
+        leg["femur"] = leg_stance
+        leg["tibia"] = -leg_stance
+
+    return pose
+
+
 def might_raise_poses_range_error(poses):
+    range_error = find_poses_range_error(poses)
+    if range_error is not None:
+        raise Exception(poses_range_error_msg(*range_error))
+
+
+def find_poses_range_error(poses):
+    # Returns (leg_name, joint_name, angle, max_angle) of the first angle
+    # which is not within its allowed range, None if all of them are
     angle_limits = {
         "coxia": ALPHA_MAX_ANGLE,
         "femur": BETA_MAX_ANGLE,
         "tibia": GAMMA_MAX_ANGLE,
     }
 
-    def _within_range(angle, max_angle):
-        return -max_angle <= angle <= max_angle
-
-    def _raise_range_error(leg_name, joint_name, angle, max_angle):
-        identifier = f"{leg_name} leg's {joint_name} angle is {angle}"
-        msg = f"{identifier}. Must be within [-{max_angle}, {max_angle}]"
-        raise Exception(msg)
-
     for pose in poses.values():
         for joint_name in angle_limits:
 
             angle = pose[joint_name]
             max_angle = angle_limits[joint_name]
 
-            if _within_range(angle, max_angle):
+            if -max_angle <= angle <= max_angle:
                 continue
 
-            _raise_range_error(pose["name"], joint_name, angle, max_angle)
+            return pose["name"], joint_name, angle, max_angle
+
+    return None
+
+
+def poses_range_error_msg(leg_name, joint_name, angle, max_angle):
+    identifier = f"{leg_name} leg's {joint_name} angle is {angle}"
+    return f"{identifier}. Must be within [-{max_angle}, {max_angle}]"
+
+
+def pose_unstable_msg():
+    return POSE_UNSTABLE_ALERT_MSG
 
 
 def get_hip_angle(leg_id, poses):
@@ -280,21 +548,25 @@ def get_hip_angle(leg_id, poses):
     return 0.0
 
 
+def find_contact_ids(legs):
+    # The (leg id, joint id) of the ground contact of each leg
+    return tuple((leg.id, leg.ground_contact_id) for leg in legs)
+
+
+def contact_rows(contact_ids):
+    # The rows of VirtualHexapod.points of the contacts
+    return [4 * leg_id + joint_id for leg_id, joint_id in contact_ids]
+
+
 def find_if_might_twist(hexapod, poses):
     # The hexapod will only definitely NOT twist
     # if only two of the legs that's currently on the ground
     # has twisted its hips/coxia
     # i.e. only 2 legs with ground contact points have changed their alpha angles
     # i.e. we don't care if the legs which are not on the ground twisted its hips
-    def _find_leg_id(leg_point):
-        right_or_left, front_mid_or_back, _ = leg_point.name.split("-")
-        leg_placement = right_or_left + "-" + front_mid_or_back
-        return Hexagon.VERTEX_NAMES.index(leg_placement)
-
     did_change_count = 0
 
-    for leg_point in hexapod.ground_contacts:
-        leg_id = _find_leg_id(leg_point)
+    for leg_id, _ in hexapod.ground_contact_ids:
         old_hip_angle = hexapod.legs[leg_id].coxia_angle()
         new_hip_angle = get_hip_angle(leg_id, poses)
         if not isclose(old_hip_angle, new_hip_angle):
@@ -305,43 +577,36 @@ def find_if_might_twist(hexapod, poses):
     return False
 
 
-def find_twist_frame(old_ground_contacts, new_ground_contacts):
+def find_twist_frame(old_contact_ids, old_points, new_contact_ids, new_points):
     # This is the frame used to twist the model about the z axis
-
-    def _make_contact_dict(contact_list):
-        return {leg_point.name: leg_point for leg_point in contact_list}
+    # old_points are the points of old_contact_ids (one row each)
+    # new_points are all the points of the hexapod (VirtualHexapod.points)
 
     def _twist(v1, v2):
         # https://www.euclideanspace.com/maths/algebra/vectors/angleBetween/
-        theta = atan2(v2.y, v2.x) - atan2(v1.y, v1.x)
+        theta = atan2(v2[1], v2[0]) - atan2(v1[1], v1[0])
         return rotz(degrees(theta))
 
-    # Make dictionary mapping contact point name and leg_contact_point
-    old_contacts = _make_contact_dict(old_ground_contacts)
-    new_contacts = _make_contact_dict(new_ground_contacts)
-
     # Find at least one point that's the same
-    same_point_name = None
-    for key in old_contacts:
-        if key in new_contacts:
-            same_point_name = key
+    # (the same joint of the same leg)
+    same = None
+    for i, contact_id in enumerate(old_contact_ids):
+        if contact_id in new_contact_ids:
+            same = i
             break
 
     # We don't know how to rotate if we don't
     # know at least one point that's on the ground
     # before and after the movement,
     # so we assume that the hexapod didn't move
-    if same_point_name is None:
+    if same is None:
         return np.eye(4)
 
-    old = old_contacts[same_point_name]
-    new = new_contacts[same_point_name]
+    old = old_points[same].tolist()
+    new = new_points[contact_rows([old_contact_ids[same]])[0]].tolist()
 
     # Get the projection of these points in the ground
-    old_vector = Vector(old.x, old.y, 0)
-    new_vector = Vector(new.x, new.y, 0)
-
-    twist_frame = _twist(new_vector, old_vector)
+    twist_frame = _twist(new, old)
 
     # ❗IMPORTANT: We are assuming that because the point
     # is on the ground before and after
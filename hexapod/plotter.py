@@ -4,6 +4,15 @@
 # it takes in a hexapod model, and the figure to update
 # you can also update the camera view with it by passing a camera dictionary
 # ********************
+import base64
+import numpy as np
+from settings import PAYLOAD_ENCODING, PAYLOAD_PRECISION
+from hexapod.models import contact_rows
+
+# The traces of the figure, only the first POSE_TRACE_COUNT of them
+# (all but the global coordinate frame) move when the pose changes
+TRACE_COUNT = 17
+POSE_TRACE_COUNT = 14
 
 
 class HexapodPlotter:
@@ -15,6 +24,52 @@ class HexapodPlotter:
         HexapodPlotter._draw_hexapod(fig, hexapod)
         HexapodPlotter._draw_scene(fig, hexapod)
 
+    @staticmethod
+    def extend_data(hexapod):
+        """
+        The coordinates of the traces which move with the pose
+        as the extendData of a dcc.Graph which replaces them:
+        [updates, trace indices, max points of each trace]
+        (the new points are appended then only the last max points are kept)
+        """
+        fig = {
+            "data": [{} for _ in range(TRACE_COUNT)],
+            "layout": {"scene": {"xaxis": {}, "yaxis": {}, "zaxis": {}}},
+        }
+        HexapodPlotter.update(fig, hexapod)
+
+        traces = fig["data"][:POSE_TRACE_COUNT]
+        updates = {axis: [trace[axis] for trace in traces] for axis in "xyz"}
+        max_points = {axis: [len(trace[axis]) for trace in traces] for axis in "xyz"}
+        return [updates, list(range(POSE_TRACE_COUNT)), max_points]
+
+    @staticmethod
+    def make_payload(hexapod):
+        """
+        What assets/hexapod_figure.js needs to draw the hexapod in the browser:
+        - points: the (26, 3) points of the hexapod (see VirtualHexapod.points)
+          flattened, row after row (see encode_array)
+        - contacts: the rows of points of the ground contacts
+        - axes: the end points of the drawn x, y and z axes of the hexapod
+          (from the center of gravity), one after the other (see encode_array)
+        - scale: the length of the drawn axes
+        - range: the range of the x and y axes of the scene
+        """
+        cog = hexapod.body.cog.vec
+        scale = hexapod.front / 2
+        axes = [
+            c + scale * a
+            for axis in (hexapod.x_axis, hexapod.y_axis, hexapod.z_axis)
+            for c, a in zip(cog, axis.vec)
+        ]
+        return {
+            "points": encode_array(hexapod.points.ravel()),
+            "contacts": contact_rows(hexapod.ground_contact_ids),
+            "axes": encode_array(axes),
+            "scale": scale,
+            "range": hexapod.sum_of_dimensions(),
+        }
+
     @staticmethod
     def change_camera_view(fig, camera):
         # camera = { 'up': {'x': 0, 'y': 0, 'z': 0},
@@ -102,3 +157,37 @@ class HexapodPlotter:
         fig["data"][16]["x"] = [0, 0]
         fig["data"][16]["y"] = [0, 0]
         fig["data"][16]["z"] = [0, axis_scale]
+
+
+def encode_array(values, encoding=None, precision=None):
+    """
+    The array of floats values as it is sent to the browser
+    given the encoding (PAYLOAD_ENCODING by default)
+    - "json": a list of floats
+    - "float32": {"dtype": "float32", "data": the base64 of the float32 values}
+    - "fixed": {"dtype": "int16" or "int32", "scale": precision, "data": the base64
+      of the values as integers, in multiples of precision (in mm,
+      PAYLOAD_PRECISION by default)}
+    The bytes are little endian, assets/hexapod_figure.js decodes them
+    """
+    encoding = encoding or PAYLOAD_ENCODING
+    values = np.asarray(values, dtype=float)
+
+    if encoding == "json":
+        return values.tolist()
+
+    if encoding == "float32":
+        return {"dtype": "float32", "data": encode_bytes(values.astype("<f4"))}
+
+    if encoding == "fixed":
+        precision = precision or PAYLOAD_PRECISION
+        integers = np.rint(values / precision)
+        dtype = "int16" if np.all(np.abs(integers) <= 32767) else "int32"
+        data = encode_bytes(integers.astype("<i2" if dtype == "int16" else "<i4"))
+        return {"dtype": dtype, "scale": precision, "data": data}
+
+    raise ValueError(f'encoding must be "json", "float32" or "fixed", not {encoding}')
+
+
+def encode_bytes(array):
+    return base64.b64encode(array.tobytes()).decode("ascii")
@@ -2,6 +2,7 @@
 # and functions for manipulating vectors
 # and finding properties and relationships of vectors
 # computing reference frames
+from copy import deepcopy
 from math import sqrt, radians, sin, cos, degrees, acos, isnan
 import numpy as np
 
@@ -9,42 +10,102 @@ from settings import DEBUG_MODE
 
 
 class Vector:
-    __slots__ = ("x", "y", "z", "name")
+    """
+    A point in 3d space.
+
+    The coordinates are either stored by the vector itself or,
+    for a view made by Vector.view(array, row), in one row of
+    a (n, 3) array shared by many vectors (see VirtualHexapod.points).
+    """
+
+    __slots__ = ("_xyz", "_array", "_row", "name")
 
     def __init__(self, x, y, z, name=None):
-        self.x = x
-        self.y = y
-        self.z = z
+        self._xyz = [x, y, z]
+        self._array = None
+        self._row = None
         self.name = name
 
+    @classmethod
+    def view(cls, array, row, name=None):
+        vector = cls.__new__(cls)
+        vector._xyz = array[row]
+        vector._array = array
+        vector._row = row
+        vector.name = name
+        return vector
+
+    def bind(self, other):
+        """
+        Copy the coordinates of this vector to where the other vector
+        stores its coordinates, and from now on share the storage
+        """
+        other._xyz[:] = self._xyz
+        self._xyz = other._xyz
+        self._array = other._array
+        self._row = other._row
+
+    @property
+    def x(self):
+        return self._xyz[0]
+
+    @x.setter
+    def x(self, value):
+        self._xyz[0] = value
+
+    @property
+    def y(self):
+        return self._xyz[1]
+
+    @y.setter
+    def y(self, value):
+        self._xyz[1] = value
+
+    @property
+    def z(self):
+        return self._xyz[2]
+
+    @z.setter
+    def z(self, value):
+        self._xyz[2] = value
+
     def get_point_wrt(self, reference_frame, name=None):
         """
         Given frame_ab which is the pose of frame_b wrt frame_a
         and that this point is defined wrt to frame_b
         Return point defined wrt to frame a
         """
-        p = np.array([self.x, self.y, self.z, 1])
+        x, y, z = self._xyz
+        p = np.array([x, y, z, 1])
         p = np.matmul(reference_frame, p)
         return Vector(p[0], p[1], p[2], name)
 
     def update_point_wrt(self, reference_frame, z=0):
-        p = np.array([self.x, self.y, self.z, 1])
+        x, y, z_ = self._xyz
+        p = np.array([x, y, z_, 1])
         p = np.matmul(reference_frame, p)
-        self.x = p[0]
-        self.y = p[1]
-        self.z = p[2] + z
+        self._xyz[0] = p[0]
+        self._xyz[1] = p[1]
+        self._xyz[2] = p[2] + z
+
+    def snapshot(self):
+        # A standalone copy of this vector, it is not changed
+        # when the points array it was read from is updated
+        x, y, z = self._xyz
+        return Vector(x, y, z, self.name)
 
     def move_xyz(self, x, y, z):
-        self.x += x
-        self.y += y
-        self.z += z
+        self._xyz[0] += x
+        self._xyz[1] += y
+        self._xyz[2] += z
 
     def move_up(self, z):
-        self.z += z
+        self._xyz[2] += z
 
     @property
     def vec(self):
-        return self.x, self.y, self.z
+        x, y, z = self._xyz
+        return x, y, z
 
     def __repr__(self):
         s = f"Vector(x={self.x:>+8.2f}, y={self.y:>+8.2f}, z={self.z:>+8.2f}, name='{self.name}')"
@@ -53,6 +114,14 @@ class Vector:
     def __str__(self):
         return repr(self)
 
+    def __deepcopy__(self, memo):
+        # A copied view is a view of the copied array
+        if self._array is None:
+            return self.snapshot()
+
+        array = deepcopy(self._array, memo)
+        return Vector.view(array, self._row, self.name)
+
     def __eq__(self, other, percent_tol=0.0075):
         if not isinstance(other, Vector):
             return False
@@ -125,68 +194,82 @@ def is_counter_clockwise(a, b, n):
     return dot(a, cross(b, n)) > 0
 
 
+# *********************************************
+# Reference frames
+# Every frame is built in closed form, directly from the sines and cosines.
+# Pass a (4, 4) array as out to fill it instead of allocating a new one.
+# The *_batch variants take arrays of N angles (or vectors)
+# and return arrays of N frames of shape (N, 4, 4)
+# *********************************************
+
+
 # https://math.stackexchange.com/questions/180418/calculate-rotation-matrix-to-align-vector-a-to-vector-b-in-3d
-def frame_to_align_vector_a_to_b(a, b):
+def frame_to_align_vector_a_to_b(a, b, out=None):
     v = cross(a, b)
     s = length(v)
 
     # When angle between a and b is zero or 180 degrees
     # cross product is 0, R = I
     if s == 0.0:
-        return np.eye(4)
-    c = dot(a, b)
-    i = np.eye(3)  # Identity matrix 3x3
+        return _make_frame(IDENTITY_VALUES, out)
 
-    # skew symmetric cross product
-    vx = skew(v)
+    c = dot(a, b)
     d = (1 - c) / (s * s)
-    r = i + vx + np.matmul(vx, vx) * d
 
-    # r00 r01 r02 0
-    # r10 r11 r12 0
-    # r20 r21 r22 0
-    #  0   0   0  1
-    r = np.hstack((r, [[0], [0], [0]]))
-    r = np.vstack((r, [0, 0, 0, 1]))
-    return r
+    # r = i + vx + vx^2 * d, vx is the skew symmetric cross product of v
+    # and vx^2 = v * transpose(v) - (s^2) * i
+    x, y, z = v.x, v.y, v.z
+    # fmt: off
+    return _make_frame((
+        1 - d * (y * y + z * z), -z + d * x * y, y + d * x * z, 0,
+        z + d * x * y, 1 - d * (x * x + z * z), -x + d * y * z, 0,
+        -y + d * x * z, x + d * y * z, 1 - d * (x * x + y * y), 0,
+        0, 0, 0, 1,
+    ), out)
+    # fmt: on
 
 
 # rotate about y, translate in x
-def frame_yrotate_xtranslate(theta, x):
+def frame_yrotate_xtranslate(theta, x, out=None):
     c, s = _return_sin_and_cos(theta)
-
-    return np.array([[c, 0, s, x], [0, 1, 0, 0], [-s, 0, c, 0], [0, 0, 0, 1]])
+    return _make_frame((c, 0, s, x, 0, 1, 0, 0, -s, 0, c, 0, 0, 0, 0, 1), out)
 
 
 # rotate about z, translate in x and y
-def frame_zrotate_xytranslate(theta, x, y):
+def frame_zrotate_xytranslate(theta, x, y, out=None):
     c, s = _return_sin_and_cos(theta)
-
-    return np.array([[c, -s, 0, x], [s, c, 0, y], [0, 0, 1, 0], [0, 0, 0, 1]])
-
-
-def frame_rotxyz(a, b, c):
-    rx = rotx(a)
-    ry = roty(b)
-    rz = rotz(c)
-    rxy = np.matmul(rx, ry)
-    rxyz = np.matmul(rxy, rz)
-    return rxyz
-
-
-def rotx(theta):
+    return _make_frame((c, -s, 0, x, s, c, 0, y, 0, 0, 1, 0, 0, 0, 0, 1), out)
+
+
+# rotate about x, then about y, then about z
+# same as rotx(a) * roty(b) * rotz(c)
+def frame_rotxyz(a, b, c, out=None):
+    ca, sa = _return_sin_and_cos(a)
+    cb, sb = _return_sin_and_cos(b)
+    cc, sc = _return_sin_and_cos(c)
+    # fmt: off
+    return _make_frame((
+        cb * cc, -cb * sc, sb, 0,
+        sa * sb * cc + ca * sc, ca * cc - sa * sb * sc, -sa * cb, 0,
+        sa * sc - ca * sb * cc, ca * sb * sc + sa * cc, ca * cb, 0,
+        0, 0, 0, 1,
+    ), out)
+    # fmt: on
+
+
+def rotx(theta, out=None):
     c, s = _return_sin_and_cos(theta)
-    return np.array([[1, 0, 0, 0], [0, c, -s, 0], [0, s, c, 0], [0, 0, 0, 1]])
+    return _make_frame((1, 0, 0, 0, 0, c, -s, 0, 0, s, c, 0, 0, 0, 0, 1), out)
 
 
-def roty(theta):
+def roty(theta, out=None):
     c, s = _return_sin_and_cos(theta)
-    return np.array([[c, 0, s, 0], [0, 1, 0, 0], [-s, 0, c, 0], [0, 0, 0, 1]])
+    return _make_frame((c, 0, s, 0, 0, 1, 0, 0, -s, 0, c, 0, 0, 0, 0, 1), out)
 
 
-def rotz(theta):
+def rotz(theta, out=None):
     c, s = _return_sin_and_cos(theta)
-    return np.array([[c, -s, 0, 0], [s, c, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    return _make_frame((c, -s, 0, 0, s, c, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1), out)
 
 
 def _return_sin_and_cos(theta):
@@ -196,6 +279,102 @@ def _return_sin_and_cos(theta):
     return c, s
 
 
+IDENTITY_VALUES = (1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+
+
+def _make_frame(values, out):
+    # values are the 16 elements of the frame, row by row
+    if out is None:
+        return np.array(values, dtype=float).reshape(4, 4)
+
+    out.flat[:] = values
+    return out
+
+
+def frame_to_align_vector_a_to_b_batch(a, b, out=None):
+    a = np.asarray(a, dtype=float)
+    b = np.broadcast_to(np.asarray(b, dtype=float), a.shape)
+    v = np.cross(a, b)
+    s2 = np.einsum("...i,...i", v, v)
+    c = np.einsum("...i,...i", a, b)
+
+    # When angle between a and b is zero or 180 degrees
+    # cross product is 0, R = I
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.where(s2 == 0.0, 0.0, (1 - c) / s2)
+
+    x, y, z = v[..., 0], v[..., 1], v[..., 2]
+    out = _empty_frames(a.shape[:-1], out)
+    out[..., 0, 0] = 1 - d * (y * y + z * z)
+    out[..., 0, 1] = -z + d * x * y
+    out[..., 0, 2] = y + d * x * z
+    out[..., 1, 0] = z + d * x * y
+    out[..., 1, 1] = 1 - d * (x * x + z * z)
+    out[..., 1, 2] = -x + d * y * z
+    out[..., 2, 0] = -y + d * x * z
+    out[..., 2, 1] = x + d * y * z
+    out[..., 2, 2] = 1 - d * (x * x + y * y)
+    return out
+
+
+def frame_yrotate_xtranslate_batch(theta, x, out=None):
+    c, s = _return_sin_and_cos_batch(theta)
+    out = _empty_frames(c.shape, out)
+    out[..., 0, 0] = c
+    out[..., 0, 2] = s
+    out[..., 0, 3] = x
+    out[..., 1, 1] = 1
+    out[..., 2, 0] = -s
+    out[..., 2, 2] = c
+    return out
+
+
+def frame_zrotate_xytranslate_batch(theta, x, y, out=None):
+    c, s = _return_sin_and_cos_batch(theta)
+    out = _empty_frames(c.shape, out)
+    out[..., 0, 0] = c
+    out[..., 0, 1] = -s
+    out[..., 0, 3] = x
+    out[..., 1, 0] = s
+    out[..., 1, 1] = c
+    out[..., 1, 3] = y
+    out[..., 2, 2] = 1
+    return out
+
+
+def frame_rotxyz_batch(a, b, c, out=None):
+    ca, sa = _return_sin_and_cos_batch(a)
+    cb, sb = _return_sin_and_cos_batch(b)
+    cc, sc = _return_sin_and_cos_batch(c)
+    out = _empty_frames(np.broadcast(ca, cb, cc).shape, out)
+    out[..., 0, 0] = cb * cc
+    out[..., 0, 1] = -cb * sc
+    out[..., 0, 2] = sb
+    out[..., 1, 0] = sa * sb * cc + ca * sc
+    out[..., 1, 1] = ca * cc - sa * sb * sc
+    out[..., 1, 2] = -sa * cb
+    out[..., 2, 0] = sa * sc - ca * sb * cc
+    out[..., 2, 1] = ca * sb * sc + sa * cc
+    out[..., 2, 2] = ca * cb
+    return out
+
+
+def _return_sin_and_cos_batch(theta):
+    d = np.radians(theta)
+    return np.cos(d), np.sin(d)
+
+
+def _empty_frames(shape, out):
+    # Frames where everything but the 3x3 rotation,
+    # and the translation is already set
+    if out is None:
+        out = np.zeros(shape + (4, 4))
+    else:
+        out[...] = 0.0
+    out[..., 3, 3] = 1.0
+    return out
+
+
 # get vector pointing from point a to point b
 def vector_from_to(a, b):
     return Vector(b.x - a.x, b.y - a.y, b.z - a.z)
@@ -0,0 +1,134 @@
+# A small per-process pool of VirtualHexapod instances
+# so that each request does not have to build a new hexapod
+# (a hexagon and six linkages) only to throw it away afterwards
+#
+# with HEXAPOD_POOL.borrow(dimensions) as hexapod:
+#     hexapod.update(poses)
+#     ...
+#
+# The borrowed hexapod is in its neutral pose, as if it was just built.
+# It must not be used after the with block.
+#
+# The ground contacts of its last update are forgotten as well,
+# the pool keeps a tracker of them for each dimensions instead
+# (pass HEXAPOD_POOL.contact_tracker(dimensions) to update(),
+# see ground_contact_solver.tracker)
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from settings import HEXAPOD_POOL_SIZE
+from hexapod.cache import LRUCache
+from hexapod.models import VirtualHexapod
+from hexapod.ground_contact_solver.tracker import ContactTracker
+
+DIMENSION_NAMES = ("front", "side", "middle", "coxia", "femur", "tibia")
+
+
+def make_pool_key(dimensions):
+    return tuple(dimensions[name] for name in DIMENSION_NAMES)
+
+
+class HexapodPool:
+    __slots__ = (
+        "maxsize",
+        "idle",
+        "idle_count",
+        "built",
+        "reused",
+        "contact_trackers",
+        "lock",
+    )
+
+    def __init__(self, maxsize=HEXAPOD_POOL_SIZE):
+        self.maxsize = maxsize
+        # Maps dimensions to a list of idle hexapods with those dimensions,
+        # the least recently used dimensions first
+        self.idle = OrderedDict()
+        self.idle_count = 0
+        self.built = 0
+        self.reused = 0
+        # Maps dimensions to the tracker of the ground contacts
+        # of the hexapods of those dimensions
+        self.contact_trackers = LRUCache(maxsize)
+        self.lock = Lock()
+
+    @contextmanager
+    def borrow(self, dimensions):
+        hexapod = self.acquire(dimensions)
+        try:
+            yield hexapod
+        finally:
+            self.release(hexapod)
+
+    def acquire(self, dimensions):
+        key = make_pool_key(dimensions)
+        hexapod, same_dimensions = self._pop_idle(key)
+
+        if hexapod is None:
+            return VirtualHexapod(dimensions)
+
+        if same_dimensions:
+            hexapod.reset()
+        else:
+            hexapod.reconfigure(dimensions)
+        return hexapod
+
+    def contact_tracker(self, dimensions):
+        key = make_pool_key(dimensions)
+        with self.lock:
+            tracker = self.contact_trackers.get(key)
+            if tracker is None:
+                tracker = ContactTracker()
+                self.contact_trackers.put(key, tracker)
+            return tracker
+
+    def release(self, hexapod):
+        key = make_pool_key(hexapod.dimensions)
+        with self.lock:
+            if self.idle_count >= self.maxsize:
+                return
+            self.idle.setdefault(key, []).append(hexapod)
+            self.idle.move_to_end(key)
+            self.idle_count += 1
+
+    def clear(self):
+        with self.lock:
+            self.idle.clear()
+            self.idle_count = 0
+            self.contact_trackers.clear()
+            self.built = 0
+            self.reused = 0
+
+    def info(self):
+        return {
+            "built": self.built,
+            "reused": self.reused,
+            "idle": self.idle_count,
+            "maxsize": self.maxsize,
+        }
+
+    def __repr__(self):
+        return f"HexapodPool({self.info()})"
+
+    def _pop_idle(self, key):
+        # Prefer a hexapod with the same dimensions,
+        # otherwise take one with the least recently used dimensions
+        with self.lock:
+            if not self.idle:
+                self.built += 1
+                return None, False
+
+            same_dimensions = key in self.idle
+            if not same_dimensions:
+                key = next(iter(self.idle))
+
+            hexapods = self.idle[key]
+            hexapod = hexapods.pop()
+            if not hexapods:
+                del self.idle[key]
+            self.idle_count -= 1
+            self.reused += 1
+            return hexapod, same_dimensions
+
+
+HEXAPOD_POOL = HexapodPool()
@@ -0,0 +1,41 @@
+# What happened when solving a pose, for callers who do not want exceptions
+#
+# result = hexapod.try_update(poses)
+# if not result.ok:
+#     print(result.status, result.message)
+#
+# The status is an IntEnum (OK is always 0) so a yes or no is only a comparison,
+# the message is formatted only when it is asked for.
+# result.unwrap() returns the value or raises the same Exception (and message)
+# as the function which raises instead of returning a result
+
+
+class Result:
+    __slots__ = ("status", "value", "_format_message", "_details")
+
+    def __init__(self, status, value=None, format_message=None, details=()):
+        self.status = status
+        self.value = value
+        self._format_message = format_message
+        self._details = details
+
+    @property
+    def ok(self):
+        return self.status == 0
+
+    @property
+    def message(self):
+        if self.ok:
+            return None
+        return self._format_message(*self._details)
+
+    def unwrap(self):
+        if not self.ok:
+            raise Exception(self.message)
+        return self.value
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"Result({self.status!r})"
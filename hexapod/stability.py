@@ -0,0 +1,132 @@
+# This module computes the support polygon and the static stability margin
+# of one or many poses at once, given their points as computed
+# by hexapod.kinematics.batch_forward (or the points of a VirtualHexapod)
+#
+# The support polygon is the convex hull of the ground contacts of the legs
+# on the ground. Its vertices are given as leg ids in counter clockwise order
+# (seen from above), an array of shape (..., 6) padded with -1.
+#
+# The stability margin is the signed distance of the projection of the
+# center of gravity on the ground to the nearest edge of the support polygon,
+# positive inside, negative outside (the distance to the edge it is the most
+# outside of), NaN if less than three legs are on the ground.
+#
+# The points are wrt to the world frame, after the hexapod is tilted and shifted
+# so the ground is the plane z = 0 and the projection on the ground is the x and y.
+import numpy as np
+
+
+def compute_stability(points):
+    """
+    Given an array of shape (..., 6, 4, 3) of the body contact, coxia, femur
+    and tibia points of each leg, return the support polygons (..., 6)
+    and the stability margins (...) of each pose
+    """
+    points = np.asarray(points, dtype=float)
+    contacts, on_ground = find_ground_contacts(points)
+
+    # The body contacts are around the center of gravity
+    cog = points[..., 0, :].mean(axis=-2)
+
+    polygons = find_support_polygons(contacts, on_ground)
+    margins = find_stability_margins(contacts, polygons, cog)
+    return polygons, margins
+
+
+def hexapod_stability(hexapod):
+    # Same as compute_stability given a VirtualHexapod
+    leg_points = hexapod.points[: 4 * hexapod.LEG_COUNT].reshape(-1, 4, 3)
+    return compute_stability(leg_points)
+
+
+def find_ground_contacts(points, tol=1):
+    """
+    Return the ground contact point of each leg (..., 6, 3) and
+    if the leg is on the ground (..., 6), given the points (..., 6, 4, 3).
+    Same as ground_contact_solver.shared.find_legs_on_ground, a leg is on the ground
+    if one of its points is on the ground, its ground contact is the first one
+    of these points from the foot tip.
+    """
+    with np.errstate(invalid="ignore"):
+        touching = np.abs(points[..., 1:, 2]) <= tol
+    on_ground = np.any(touching, axis=-1)
+    joint_ids = 3 - np.argmax(touching[..., ::-1], axis=-1)
+    contacts = np.take_along_axis(
+        points, joint_ids[..., np.newaxis, np.newaxis], axis=-2
+    )[..., 0, :]
+    return contacts, on_ground
+
+
+def find_support_polygons(contacts, on_ground, tol=1e-6):
+    """
+    Given the ground contact points (..., 6, 3) of each leg
+    and which legs are on the ground (..., 6), return the leg ids
+    of the vertices of the support polygons (..., 6)
+    """
+    xy = np.asarray(contacts, dtype=float)[..., :2]
+    on_ground = np.asarray(on_ground, dtype=bool)
+    leg_count = xy.shape[-2]
+
+    # d[..., i, j] is the vector from the contact of leg i to the contact of leg j
+    d = xy[..., np.newaxis, :, :] - xy[..., :, np.newaxis, :]
+    # cross[..., i, j, k] is positive if k is left of the edge from i to j
+    dx, dy = d[..., 0], d[..., 1]
+    cross = (
+        dx[..., :, :, np.newaxis] * dy[..., :, np.newaxis, :]
+        - dy[..., :, :, np.newaxis] * dx[..., :, np.newaxis, :]
+    )
+
+    # The edge from i to j is an edge of the convex hull (counter clockwise)
+    # if no contact on the ground is right of it
+    with np.errstate(invalid="ignore"):
+        right = (cross < -tol) & on_ground[..., np.newaxis, np.newaxis, :]
+    edges = ~np.any(right, axis=-1)
+    edges &= on_ground[..., :, np.newaxis] & on_ground[..., np.newaxis, :]
+    edges &= ~np.eye(leg_count, dtype=bool)
+    is_vertex = np.any(edges, axis=-1)
+
+    # Order the vertices by their angle around their center
+    count = np.count_nonzero(is_vertex, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        center = np.sum(np.where(is_vertex[..., np.newaxis], xy, 0), axis=-2)
+        center /= count[..., np.newaxis]
+        u = xy - center[..., np.newaxis, :]
+        angles = np.where(is_vertex, np.arctan2(u[..., 1], u[..., 0]), np.inf)
+
+    order = np.argsort(angles, axis=-1)
+    padding = np.arange(leg_count) >= count[..., np.newaxis]
+    return np.where(padding, -1, order)
+
+
+def find_stability_margins(contacts, polygons, cog):
+    """
+    Given the ground contact points (..., 6, 3) of each leg,
+    the support polygons (..., 6) as returned by find_support_polygons
+    and the centers of gravity (..., 3), return the stability margins (...)
+    """
+    xy = np.asarray(contacts, dtype=float)[..., :2]
+    p = np.asarray(cog, dtype=float)[..., np.newaxis, :2]
+    polygons = np.asarray(polygons)
+    count = np.count_nonzero(polygons >= 0, axis=-1)
+
+    # The edge from each vertex to the next one (the last one to the first)
+    positions = np.arange(polygons.shape[-1])
+    next_positions = positions + 1
+    next_positions = np.where(
+        next_positions < count[..., np.newaxis], next_positions, 0
+    )
+    ids = np.maximum(polygons, 0)
+    next_ids = np.take_along_axis(ids, next_positions, axis=-1)
+
+    v = np.take_along_axis(xy, ids[..., np.newaxis], axis=-2)
+    e = np.take_along_axis(xy, next_ids[..., np.newaxis], axis=-2) - v
+    w = p - v
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        length = np.hypot(e[..., 0], e[..., 1])
+        distance = (e[..., 0] * w[..., 1] - e[..., 1] * w[..., 0]) / length
+
+    # Only the edges of the polygon (of vertices which are not the same point)
+    is_edge = (positions < count[..., np.newaxis]) & (length > 0)
+    margins = np.min(np.where(is_edge, distance, np.inf), axis=-1)
+    return np.where(count >= 3, margins, np.nan)
@@ -17,3 +17,9 @@ HEXAPOD_POSE = {
     4: {"coxia": 0, "femur": 0, "tibia": 0, "name": "left-back", "id": 4},
     5: {"coxia": 0, "femur": 0, "tibia": 0, "name": "right-back", "id": 5},
 }
+
+
+def copy_poses(poses):
+    # The poses dictionary is only two levels deep
+    # and the leaves are numbers and strings, no need for a deepcopy
+    return {i: dict(pose) for i, pose in poses.items()}
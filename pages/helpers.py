@@ -2,6 +2,7 @@ from copy import deepcopy
 import json
 import dash_core_components as dcc
 from hexapod.const import (
+    BASE_FIGURE,
     BASE_PLOTTER,
     BASE_POSE,
     BASE_IK_PARAMS,
@@ -30,6 +31,13 @@ def make_pose(alpha, beta, gamma, poses=NEW_POSES):
     return poses
 
 
+def make_figure(hexapod, relayout_data):
+    # A new figure of the hexapod, seen from the camera of relayout_data
+    figure = deepcopy(BASE_FIGURE)
+    BASE_PLOTTER.update(figure, hexapod)
+    return change_camera_view(figure, relayout_data)
+
+
 def change_camera_view(figure, relayout_data):
     if relayout_data and "scene.camera" in relayout_data:
         camera = relayout_data["scene.camera"]
@@ -1,11 +1,16 @@
 import json
 from dash.dependencies import Output
 from app import app
-from settings import RECOMPUTE_HEXAPOD
-from hexapod.models import VirtualHexapod
-from hexapod.const import BASE_PLOTTER
+from settings import (
+    RECOMPUTE_HEXAPOD,
+    RECOMPUTE_HEXAPOD_IN_PLACE,
+    SINGLE_HOP_CALLBACKS,
+)
 from hexapod.ik_solver.ik_solver2 import inverse_kinematics_update
-from hexapod.ik_solver.recompute_hexapod import recompute_hexapod
+from hexapod.ik_solver.recompute_hexapod import (
+    recompute_hexapod,
+    recompute_hexapod_in_place,
+)
 from widgets.ik_ui import IK_WIDGETS_SECTION, IK_CALLBACK_INPUTS
 from pages import helpers, shared
 
@@ -30,31 +35,34 @@ layout = shared.make_standard_page_layout(GRAPH_ID, sidebar)
 # ......................
 
 outputs, inputs, states = shared.make_standard_page_callback_params(
-    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID
+    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID, IK_CALLBACK_INPUTS
 )
 
 
 @app.callback(outputs, inputs, states)
-def update_inverse_page(dimensions_json, ik_parameters_json, relayout_data, figure):
+def update_inverse_page(*values):
+
+    dimensions, ik_parameters, relayout_data = shared.read_page_inputs(
+        values, make_ik_parameters, "ik"
+    )
+
+    return shared.make_page_outputs(
+        GRAPH_ID, dimensions, ik_parameters, relayout_data, update_hexapod
+    )
 
-    dimensions = helpers.load_params(dimensions_json, "dims")
-    ik_parameters = helpers.load_params(ik_parameters_json, "ik")
-    hexapod = VirtualHexapod(dimensions)
 
-    try:
-        poses, hexapod = inverse_kinematics_update(hexapod, ik_parameters)
-    except Exception as alert:
-        return figure, helpers.make_alert_message(alert)
+def update_hexapod(hexapod, dimensions, ik_parameters):
+    poses, hexapod = inverse_kinematics_update(hexapod, ik_parameters)
 
     if RECOMPUTE_HEXAPOD:
-        try:
-            hexapod = recompute_hexapod(dimensions, ik_parameters, poses)
-        except Exception as alert:
-            return figure, helpers.make_alert_message(alert)
+        recompute = (
+            recompute_hexapod_in_place
+            if RECOMPUTE_HEXAPOD_IN_PLACE
+            else recompute_hexapod
+        )
+        hexapod = recompute(dimensions, ik_parameters, poses, hexapod)
 
-    BASE_PLOTTER.update(figure, hexapod)
-    helpers.change_camera_view(figure, relayout_data)
-    return figure, helpers.make_poses_message(poses)
+    return hexapod, helpers.make_poses_message(poses)
 
 
 # ......................
@@ -65,20 +73,24 @@ output_parameter = Output(PARAMETERS_SECTION_ID, "children")
 input_parameters = IK_CALLBACK_INPUTS
 
 
-@app.callback(output_parameter, input_parameters)
-def update_ik_parameters(
+def make_ik_parameters(
     hip_stance, leg_stance, percent_x, percent_y, percent_z, rot_x, rot_y, rot_z
 ):
 
-    return json.dumps(
-        {
-            "hip_stance": hip_stance or 0,
-            "leg_stance": leg_stance or 0,
-            "percent_x": percent_x or 0,
-            "percent_y": percent_y or 0,
-            "percent_z": percent_z or 0,
-            "rot_x": rot_x or 0,
-            "rot_y": rot_y or 0,
-            "rot_z": rot_z or 0,
-        }
-    )
+    return {
+        "hip_stance": hip_stance or 0,
+        "leg_stance": leg_stance or 0,
+        "percent_x": percent_x or 0,
+        "percent_y": percent_y or 0,
+        "percent_z": percent_z or 0,
+        "rot_x": rot_x or 0,
+        "rot_y": rot_y or 0,
+        "rot_z": rot_z or 0,
+    }
+
+
+if not SINGLE_HOP_CALLBACKS:
+
+    @app.callback(output_parameter, input_parameters)
+    def update_ik_parameters(*values):
+        return json.dumps(make_ik_parameters(*values))
@@ -1,11 +1,14 @@
 import json
 from dash.dependencies import Output
 from app import app
-from settings import WHICH_POSE_CONTROL_UI
-from hexapod.models import VirtualHexapod
-from hexapod.const import BASE_PLOTTER
+from settings import (
+    RANDOM_GROUND_CONTACT_TIE_BREAK,
+    SINGLE_HOP_CALLBACKS,
+    WHICH_POSE_CONTROL_UI,
+)
 from widgets.pose_control.components import KINEMATICS_CALLBACK_INPUTS
-from pages import helpers, shared
+from hexapod.pool import HEXAPOD_POOL
+from pages import shared
 
 if WHICH_POSE_CONTROL_UI == 1:
     from widgets.pose_control.generic_daq_slider_ui import KINEMATICS_WIDGETS_SECTION
@@ -34,25 +37,35 @@ layout = shared.make_standard_page_layout(GRAPH_ID, sidebar)
 # ......................
 
 outputs, inputs, states = shared.make_standard_page_callback_params(
-    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID
+    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID, KINEMATICS_CALLBACK_INPUTS
 )
 
 
 @app.callback(outputs, inputs, states)
-def update_kinematics_page(dimensions_json, poses_json, relayout_data, figure):
+def update_kinematics_page(*values):
+
+    dimensions, poses, relayout_data = shared.read_page_inputs(
+        values, make_poses, "pose"
+    )
 
-    dimensions = helpers.load_params(dimensions_json, "dims")
-    poses = helpers.load_params(poses_json, "pose")
-    hexapod = VirtualHexapod(dimensions)
+    # With the random tie break, the same poses can put
+    # different legs on the ground, the result is not cached
+    return shared.make_page_outputs(
+        GRAPH_ID,
+        dimensions,
+        poses,
+        relayout_data,
+        update_hexapod,
+        pure=not RANDOM_GROUND_CONTACT_TIE_BREAK,
+    )
 
-    try:
-        hexapod.update(poses, assume_ground_targets=False)
-    except Exception as alert:
-        return figure, helpers.make_alert_message(alert)
 
-    BASE_PLOTTER.update(figure, hexapod)
-    helpers.change_camera_view(figure, relayout_data)
-    return figure, ""
+def update_hexapod(hexapod, dimensions, poses):
+    # The hexapod is borrowed from the pool (see shared.draw_page)
+    # the ground contacts of the last update are tracked by the pool
+    tracker = HEXAPOD_POOL.contact_tracker(dimensions)
+    hexapod.update(poses, assume_ground_targets=False, contact_tracker=tracker)
+    return hexapod, ""
 
 
 # ......................
@@ -66,8 +79,7 @@ input_parameters = KINEMATICS_CALLBACK_INPUTS
 # fmt: off
 
 
-@app.callback(output_parameter, input_parameters)
-def update_poses(
+def make_poses(
     rmc, rmf, rmt,
     rfc, rff, rft,
     lfc, lff, lft,
@@ -76,13 +88,20 @@ def update_poses(
     rbc, rbf, rbt,
 ):
 
-    return json.dumps({
+    return {
         0: {"coxia": rmc or 0, "femur": rmf or 0, "tibia": rmt or 0, "name": "right-middle", "id": 0},
         1: {"coxia": rfc or 0, "femur": rff or 0, "tibia": rft or 0, "name": "right-front", "id": 1},
         2: {"coxia": lfc or 0, "femur": lff or 0, "tibia": lft or 0, "name": "left-front", "id": 2},
         3: {"coxia": lmc or 0, "femur": lmf or 0, "tibia": lmt or 0, "name": "left-middle", "id": 3},
         4: {"coxia": lbc or 0, "femur": lbf or 0, "tibia": lbt or 0, "name": "left-back", "id": 4},
         5: {"coxia": rbc or 0, "femur": rbf or 0, "tibia": rbt or 0, "name": "right-back", "id": 5},
-    })
+    }
 
 # fmt: on
+
+
+if not SINGLE_HOP_CALLBACKS:
+
+    @app.callback(output_parameter, input_parameters)
+    def update_poses(*values):
+        return json.dumps(make_poses(*values))
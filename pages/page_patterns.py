@@ -1,8 +1,9 @@
 import json
 from dash.dependencies import Output
 from app import app
-from hexapod.models import VirtualHexapod
-from hexapod.const import BASE_PLOTTER
+from settings import SINGLE_HOP_CALLBACKS
+from hexapod.const import BASE_POSE
+from hexapod.templates.pose_template import copy_poses
 from widgets.leg_patterns_ui import PATTERNS_WIDGETS_SECTION, PATTERNS_CALLBACK_INPUTS
 from pages import helpers, shared
 
@@ -27,25 +28,25 @@ layout = shared.make_standard_page_layout(GRAPH_ID, sidebar)
 # ......................
 
 outputs, inputs, states = shared.make_standard_page_callback_params(
-    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID
+    GRAPH_ID, PARAMETERS_SECTION_ID, MESSAGE_SECTION_ID, PATTERNS_CALLBACK_INPUTS
 )
 
 
 @app.callback(outputs, inputs, states)
-def update_patterns_page(dimensions_json, poses_json, relayout_data, figure):
+def update_patterns_page(*values):
 
-    dimensions = helpers.load_params(dimensions_json, "dims")
-    poses = helpers.load_params(poses_json, "pose")
-    hexapod = VirtualHexapod(dimensions)
+    dimensions, poses, relayout_data = shared.read_page_inputs(
+        values, make_poses, "pose"
+    )
 
-    try:
-        hexapod.update(poses)
-    except Exception as alert:
-        return figure, helpers.make_alert_message(alert)
+    return shared.make_page_outputs(
+        GRAPH_ID, dimensions, poses, relayout_data, update_hexapod
+    )
 
-    BASE_PLOTTER.update(figure, hexapod)
-    helpers.change_camera_view(figure, relayout_data)
-    return figure, ""
+
+def update_hexapod(hexapod, dimensions, poses):
+    hexapod.update(poses)
+    return hexapod, ""
 
 
 # ......................
@@ -56,6 +57,12 @@ output_parameter = Output(PARAMETERS_SECTION_ID, "children")
 input_parameters = PATTERNS_CALLBACK_INPUTS
 
 
-@app.callback(output_parameter, input_parameters)
-def update_poses_alpha_beta_gamma(alpha, beta, gamma):
-    return json.dumps(helpers.make_pose(alpha, beta, gamma))
+def make_poses(alpha, beta, gamma):
+    return helpers.make_pose(alpha, beta, gamma, copy_poses(BASE_POSE))
+
+
+if not SINGLE_HOP_CALLBACKS:
+
+    @app.callback(output_parameter, input_parameters)
+    def update_poses_alpha_beta_gamma(alpha, beta, gamma):
+        return json.dumps(make_poses(alpha, beta, gamma))
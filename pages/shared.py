@@ -1,15 +1,29 @@
 import json
+import dash
 import dash_core_components as dcc
-from dash.dependencies import Output, Input, State
+from plotly.utils import PlotlyJSONEncoder
+from dash.dependencies import ClientsideFunction, Output, Input, State
 import dash_html_components as html
 from app import app
 from settings import (
+    PAGE_CACHE_SIZE,
+    PAGE_CACHE_TTL,
+    PARTIAL_FIGURE_UPDATES,
+    PAYLOAD_ENCODING,
+    PAYLOAD_PRECISION,
+    RENDER_FIGURE_IN_BROWSER,
+    SHARED_PAGE_CACHE_PATH,
+    SHARED_PAGE_CACHE_SIZE,
+    SINGLE_HOP_CALLBACKS,
     UI_SIDEBAR_WIDTH,
     UI_GRAPH_WIDTH,
     UI_GRAPH_HEIGHT,
 )
 from widgets.dimensions_ui import DIMENSION_CALLBACK_INPUTS, DIMENSIONS_WIDGETS_SECTION
-from hexapod.const import BASE_FIGURE
+from hexapod.cache import LRUCache, SQLiteCache, make_params_key
+from hexapod.const import BASE_FIGURE, BASE_PLOTTER
+from hexapod.pool import HEXAPOD_POOL
+from pages import helpers
 
 
 # ......................
@@ -23,10 +37,14 @@ DIMENSIONS_HIDDEN_SECTION = html.Div(
 DIMS_JSON_CALLBACK_INPUT = Input(DIMENSIONS_HIDDEN_SECTION_ID, "children")
 DIMS_JSON_CALLBACK_OUTPUT = Output(DIMENSIONS_HIDDEN_SECTION_ID, "children")
 
+# When the server draws the figure but only sends the coordinates of the traces
+# which moved, the dimensions the figure in the browser was drawn with
+# are kept in a store next to the graph (see figure_is_stale)
+STORE_FIGURE_DIMENSIONS = not RENDER_FIGURE_IN_BROWSER and PARTIAL_FIGURE_UPDATES
 
-@app.callback(DIMS_JSON_CALLBACK_OUTPUT, DIMENSION_CALLBACK_INPUTS)
-def update_dimensions(front, side, middle, coxia, femur, tibia):
-    dimensions = {
+
+def make_dimensions(front, side, middle, coxia, femur, tibia):
+    return {
         "front": front or 0,
         "side": side or 0,
         "middle": middle or 0,
@@ -34,7 +52,13 @@ def update_dimensions(front, side, middle, coxia, femur, tibia):
         "femur": femur or 0,
         "tibia": tibia or 0,
     }
-    return json.dumps(dimensions)
+
+
+if not SINGLE_HOP_CALLBACKS:
+
+    @app.callback(DIMS_JSON_CALLBACK_OUTPUT, DIMENSION_CALLBACK_INPUTS)
+    def update_dimensions(front, side, middle, coxia, femur, tibia):
+        return json.dumps(make_dimensions(front, side, middle, coxia, femur, tibia))
 
 
 # ......................
@@ -51,10 +75,24 @@ def make_standard_page_layout(graph_id, sidebar_sections):
         style={"width": UI_GRAPH_WIDTH, "height": UI_GRAPH_HEIGHT},
     )
 
-    layout = html.Div([sidebar, graph], style={"display": "flex"})
+    sections = [sidebar, graph]
+    if RENDER_FIGURE_IN_BROWSER:
+        sections.append(dcc.Store(id=make_payload_store_id(graph_id)))
+    if STORE_FIGURE_DIMENSIONS:
+        sections.append(dcc.Store(id=make_figure_dimensions_store_id(graph_id)))
+
+    layout = html.Div(sections, style={"display": "flex"})
     return layout
 
 
+def make_payload_store_id(graph_id):
+    return f"{graph_id}-payload"
+
+
+def make_figure_dimensions_store_id(graph_id):
+    return f"{graph_id}-dimensions"
+
+
 # ......................
 # Make standard sidebar
 # ......................
@@ -82,11 +120,192 @@ def make_standard_page_sidebar(
 # .....................
 
 
-def make_standard_page_callback_params(graph_id, params_section_id, message_section_id):
+def make_standard_page_callback_params(
+    graph_id, params_section_id, message_section_id, params_widget_inputs
+):
 
     message_callback_output = Output(message_section_id, "children")
-    params_json_callback_input = Input(params_section_id, "children")
-    outputs = [Output(graph_id, "figure"), message_callback_output]
-    inputs = [DIMS_JSON_CALLBACK_INPUT, params_json_callback_input]
-    states = [State(graph_id, "relayoutData"), State(graph_id, "figure")]
+    if SINGLE_HOP_CALLBACKS:
+        # The values of the widgets themselves (see read_page_inputs)
+        inputs = DIMENSION_CALLBACK_INPUTS + params_widget_inputs
+    else:
+        # The json of the dimensions and parameters, which other callbacks
+        # put in the hidden sections of the page when the widgets change
+        params_json_callback_input = Input(params_section_id, "children")
+        inputs = [DIMS_JSON_CALLBACK_INPUT, params_json_callback_input]
+    states = [State(graph_id, "relayoutData")]
+
+    if RENDER_FIGURE_IN_BROWSER:
+        # The server only sends the points of the hexapod (see make_page_outputs)
+        # to a store, the browser draws them on the figure
+        # with the function of assets/hexapod_figure.js
+        payload_store_id = make_payload_store_id(graph_id)
+        app.clientside_callback(
+            ClientsideFunction(namespace="hexapod", function_name="drawHexapod"),
+            Output(graph_id, "figure"),
+            [Input(payload_store_id, "data")],
+            [State(graph_id, "relayoutData"), State(graph_id, "figure")],
+        )
+        figure_outputs = [Output(payload_store_id, "data")]
+    else:
+        # The figure is not sent to the server, the server sends either
+        # a new figure or only the coordinates of the traces (see draw_page)
+        figure_outputs = [Output(graph_id, "figure"), Output(graph_id, "extendData")]
+
+    if STORE_FIGURE_DIMENSIONS:
+        store_id = make_figure_dimensions_store_id(graph_id)
+        figure_outputs.append(Output(store_id, "data"))
+        states.append(State(store_id, "data"))
+
+    outputs = figure_outputs + [message_callback_output]
     return outputs, inputs, states
+
+
+# ......................
+# Read the inputs of page update callbacks
+# .....................
+
+
+def read_page_inputs(values, make_params, params_type):
+    """
+    Returns the dimensions, parameters and relayout data given the values
+    of the inputs and states of make_standard_page_callback_params,
+    make_params builds the parameters given the values of the widgets of the page
+    """
+    if STORE_FIGURE_DIMENSIONS:
+        # The dimensions of the figure, read by make_page_outputs
+        values = values[:-1]
+
+    *input_values, relayout_data = values
+    if SINGLE_HOP_CALLBACKS:
+        dimension_count = len(DIMENSION_CALLBACK_INPUTS)
+        dimensions = make_dimensions(*input_values[:dimension_count])
+        params = make_params(*input_values[dimension_count:])
+    else:
+        dimensions_json, params_json = input_values
+        dimensions = helpers.load_params(dimensions_json, "dims")
+        params = helpers.load_params(params_json, params_type)
+
+    return dimensions, params, relayout_data
+
+
+# ......................
+# Make the outputs of page update callbacks
+# .....................
+
+# The drawn hexapod and the message of each page update
+# given the page, the dimensions and the parameters (see make_page_outputs)
+PAGE_CACHE = LRUCache(PAGE_CACHE_SIZE, ttl=PAGE_CACHE_TTL)
+
+# The same, shared by the processes of the server (None if it is not),
+# which is checked when PAGE_CACHE misses. The messages (dash components)
+# are stored as dash sends them, and come back as their json
+SHARED_PAGE_CACHE = (
+    SQLiteCache(
+        SHARED_PAGE_CACHE_PATH,
+        SHARED_PAGE_CACHE_SIZE,
+        ttl=PAGE_CACHE_TTL,
+        json_encoder=PlotlyJSONEncoder,
+    )
+    if SHARED_PAGE_CACHE_PATH
+    else None
+)
+
+# How the hexapod is drawn, part of the keys of the cached page updates
+# so that the shared cache written with other settings is not read
+PAGE_DRAWING = (
+    ("browser", PAYLOAD_ENCODING, PAYLOAD_PRECISION)
+    if RENDER_FIGURE_IN_BROWSER
+    else ("server",)
+)
+
+
+def make_page_outputs(
+    page_id, dimensions, params, relayout_data, update_hexapod, pure=True
+):
+    """
+    Returns the outputs of make_standard_page_callback_params
+    of the page whose graph is page_id,
+    update_hexapod(hexapod, dimensions, params) updates the hexapod of the dimensions
+    (borrowed from the pool) given the parameters of the page and returns
+    the updated hexapod and the message of the page, or raises an alert.
+    pure is False when what update_hexapod does not only depend on
+    the dimensions and parameters (eg it picks a stable position at random).
+    When it is pure, the drawn hexapod and the message are remembered
+    in PAGE_CACHE (and SHARED_PAGE_CACHE) except for whole figures
+    drawn by the server, which include the camera
+    """
+    full_figure = not RENDER_FIGURE_IN_BROWSER and (
+        not PARTIAL_FIGURE_UPDATES or figure_is_stale(page_id, dimensions)
+    )
+
+    key = (
+        make_params_key(page_id, PAGE_DRAWING, dimensions, params)
+        if pure and not full_figure
+        else None
+    )
+    result = None if key is None else get_cached_page(key)
+    if result is None:
+        result = draw_page(
+            dimensions, params, relayout_data, update_hexapod, full_figure
+        )
+        if key is not None:
+            put_cached_page(key, result)
+
+    drawing, message = result
+    if drawing is None:
+        drawing = dash.no_update
+
+    if RENDER_FIGURE_IN_BROWSER:
+        return [drawing, message]
+    if not STORE_FIGURE_DIMENSIONS:
+        return [drawing, dash.no_update, message]
+    if full_figure:
+        # The figure stays stale if the hexapod could not be drawn
+        figure_dimensions = dash.no_update if drawing is dash.no_update else dimensions
+        return [drawing, dash.no_update, figure_dimensions, message]
+    return [dash.no_update, drawing, dash.no_update, message]
+
+
+def get_cached_page(key):
+    result = PAGE_CACHE.get(key)
+    if result is None and SHARED_PAGE_CACHE is not None:
+        result = SHARED_PAGE_CACHE.get(key)
+        if result is not None:
+            PAGE_CACHE.put(key, result)
+    return result
+
+
+def put_cached_page(key, result):
+    PAGE_CACHE.put(key, result)
+    if SHARED_PAGE_CACHE is not None:
+        SHARED_PAGE_CACHE.put(key, result)
+
+
+def draw_page(dimensions, params, relayout_data, update_hexapod, full_figure):
+    # The drawn hexapod and the message of the page, the drawing is
+    # - the payload of the figure drawn in the browser (see make_payload_store_id)
+    # - or a new figure (the page was loaded or the dimensions changed,
+    #   which also change the axes ranges, see figure_is_stale)
+    # - or only the new coordinates of the traces which moved
+    # - or None when the hexapod could not be updated, only the message changes
+    with HEXAPOD_POOL.borrow(dimensions) as hexapod:
+        try:
+            hexapod, message = update_hexapod(hexapod, dimensions, params)
+        except Exception as alert:
+            return None, helpers.make_alert_message(alert)
+
+        if RENDER_FIGURE_IN_BROWSER:
+            return BASE_PLOTTER.make_payload(hexapod), message
+        if full_figure:
+            return helpers.make_figure(hexapod, relayout_data), message
+        return BASE_PLOTTER.extend_data(hexapod), message
+
+
+def figure_is_stale(graph_id, dimensions):
+    # The figure in the browser has to be drawn again (with its axes ranges
+    # and global frame) unless it was drawn with these dimensions.
+    # It was not drawn at all when the page is loaded, and is not drawn again
+    # when the update after the dimensions changed failed
+    prop_id = f"{make_figure_dimensions_store_id(graph_id)}.data"
+    return dash.callback_context.states.get(prop_id) != dimensions
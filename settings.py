@@ -31,6 +31,28 @@ HIP_STANCE_MAX_ANGLE = 45
 # Makes widgets only start updating when you release the mouse button
 UPDATE_MODE = "drag"
 
+# Send only the coordinates of the traces of the graph which moved
+# (the extendData of the graph) when only the pose or ik parameters changed,
+# instead of a whole new figure
+PARTIAL_FIGURE_UPDATES = True
+
+# Send only the points of the hexapod and draw the figure in the browser
+# (assets/hexapod_figure.js) instead of drawing it on the server
+RENDER_FIGURE_IN_BROWSER = True
+
+# How the coordinates are sent to the browser when it draws the figure
+# "json" - a list of floats
+# "float32" - the base64 of float32 values
+# "fixed" - the base64 of integers, the coordinates in multiples of
+#   PAYLOAD_PRECISION (in mm), 16 bits each if they fit
+PAYLOAD_ENCODING = "float32"
+PAYLOAD_PRECISION = 0.1
+
+# The callback which updates a page takes the values of the widgets themselves
+# instead of waiting for the callbacks which put them (as json) in hidden sections,
+# one request per change instead of two one after the other
+SINGLE_HOP_CALLBACKS = True
+
 DEBUG_MODE = False
 ASSERTION_ENABLED = False
 
@@ -39,6 +61,53 @@ ASSERTION_ENABLED = False
 # So better update a fresh hexapod with the resulting poses
 RECOMPUTE_HEXAPOD = True
 
+# Recompute the hexapod given the body the inverse kinematics solver has placed,
+# with the points of all the legs in one array, instead of updating a fresh
+# hexapod one Vector at a time. The result is the same.
+RECOMPUTE_HEXAPOD_IN_PLACE = True
+
+# The ground contact solver used by the kinematics page
+# picks one of possibly many stable positions of the hexapod at random.
+# Set to False to always pick the same one given the same pose,
+# the results are then cached (given leg points rounded to the resolution in mm)
+RANDOM_GROUND_CONTACT_TIE_BREAK = True
+GROUND_CONTACT_CACHE_SIZE = 4096
+GROUND_CONTACT_CACHE_RESOLUTION = 0.001
+
+# When the tie break is random, the ground contact solver of the kinematics page
+# first checks the legs (and joints) which were on the ground the last time
+# the hexapod was updated (since it was built or reset), then the legs next to them.
+# When many positions are stable, the one of the last update is kept.
+# Set to False to always search all legs.
+TRACK_GROUND_CONTACTS = True
+
+# How many leg configurations (link lengths and joint angles)
+# to remember the computed points of
+LEG_POINTS_CACHE_SIZE = 8192
+
+# How many hexapod stances (dimensions, hip stance and leg stance)
+# to remember for the inverse kinematics page
+STANCE_CACHE_SIZE = 256
+
+# How many idle hexapods each process keeps to be reused by later requests
+HEXAPOD_POOL_SIZE = 8
+
+# How many page updates (the drawn hexapod and the message, given the dimensions
+# and the parameters of the page) each process remembers, and for how long
+# in seconds (None to remember them until they are the least recently used).
+# The widgets are quantized so the same updates come up again and again.
+# The kinematics page is only cached without RANDOM_GROUND_CONTACT_TIE_BREAK.
+# Set the size to 0 to compute every update
+PAGE_CACHE_SIZE = 2048
+PAGE_CACHE_TTL = 3600
+
+# Also share the page updates between the processes of the server
+# (the workers of gunicorn) in an SQLite database at this path,
+# which is kept when they restart. It remembers this many page updates
+# (for PAGE_CACHE_TTL seconds). None to only cache them in each process
+SHARED_PAGE_CACHE_PATH = None
+SHARED_PAGE_CACHE_SIZE = 100000
+
 PRINT_IK_LOCAL_LEG = False
 PRINT_IK = False
 PRINT_MODEL_ON_UPDATE = False
@@ -0,0 +1,107 @@
+import json
+import pickle
+import sqlite3
+import time
+from threading import Thread
+from hexapod.cache import LRUCache, SQLiteCache, make_params_key
+from tests.kinematics_cases import case1, case2
+
+
+def test_cache_forgets_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache and "a" in cache and len(cache) == 2
+    assert cache.get("b") is None and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_forgets_old_entries():
+    cache = LRUCache(2, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("a") == 1
+
+    time.sleep(0.1)
+    assert "a" not in cache and len(cache) == 1
+    assert cache.get("a") is None and cache.get("c") is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_is_shared_between_threads():
+    cache = LRUCache(64, ttl=60)
+    wrong = []
+
+    def fill(offset):
+        for i in range(1000):
+            key = (offset + i) % 100
+            if key not in cache:
+                cache.put(key, key)
+            if cache.get(key) not in (None, key) or len(cache) > 64:
+                wrong.append(key)
+
+    threads = [Thread(target=fill, args=(offset,)) for offset in range(0, 80, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not wrong and cache.hits + cache.misses == 8000
+
+
+def test_sqlite_cache_is_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first, second = SQLiteCache(path, maxsize=2), SQLiteCache(path, maxsize=2)
+    first.put("a", ({"points": [1.5, 2.5]}, "ok"))
+    assert second.get("a") == [{"points": [1.5, 2.5]}, "ok"]
+    assert second.get("b") is None and (second.hits, second.misses) == (1, 1)
+
+    first.put("b", 2)
+    first.put("c", 3)
+    first.prune()
+    assert "a" not in second and len(second) == 2
+
+    expired = SQLiteCache(path, ttl=0)
+    assert expired.get("b") is None and "b" not in expired
+    expired.prune()
+    assert len(SQLiteCache(path)) == 0
+
+
+def test_sqlite_cache_only_reads_json(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path)
+    cache.put("a", 1)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "UPDATE entries SET value = ? WHERE key = 'a'", (pickle.dumps(print),)
+        )
+
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses, cache.errors) == (0, 1, 1)
+
+
+def test_sqlite_cache_without_database(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    cache = SQLiteCache(str(path))
+
+    cache.put("a", 1)
+    assert cache.get("a") is None and "a" not in cache and len(cache) == 0
+    cache.clear()
+    cache.prune()
+    assert cache.info()["size"] == 0 and cache.errors > 0
+
+
+def test_params_key():
+    poses = case1.given_poses
+    reloaded = json.loads(json.dumps(dict(reversed(list(poses.items())))))
+    assert make_params_key("page", case1.given_dimensions, poses) == make_params_key(
+        "page", case1.given_dimensions, reloaded
+    )
+    assert make_params_key("page", case1.given_dimensions, poses) != make_params_key(
+        "page", case2.given_dimensions, poses
+    )
@@ -0,0 +1,89 @@
+import random
+from hexapod.models import VirtualHexapod
+from hexapod.ground_contact_solver import ground_contact_solver2 as gc2
+from hexapod.ground_contact_solver.tracker import ContactTracker
+from tests.kinematics_cases import case1, case2
+
+
+def make_legs(case):
+    hexapod = VirtualHexapod(case.given_dimensions)
+    for pose in case.given_poses.values():
+        leg = hexapod.legs[pose["id"]]
+        leg.change_pose(pose["coxia"], pose["femur"], pose["tibia"])
+    return hexapod.legs
+
+
+def assert_same_result(result_a, result_b):
+    legs_a, n_a, height_a = result_a
+    legs_b, n_b, height_b = result_b
+    assert [leg.id for leg in legs_a] == [leg.id for leg in legs_b]
+    assert n_a == n_b
+    assert height_a == height_b
+
+
+def test_seeded_tie_break():
+    for case in [case1, case2]:
+        legs = make_legs(case)
+        result_a = gc2.compute_orientation_properties(legs, random.Random(7))
+        result_b = gc2.compute_orientation_properties(legs, random.Random(7))
+        assert_same_result(result_a, result_b)
+
+
+def test_deterministic_tie_break_is_cached():
+    gc2.CACHE.clear()
+    for case in [case1, case2]:
+        result_a = gc2.compute_orientation_properties(make_legs(case), rng=None)
+        result_b = gc2.compute_orientation_properties(make_legs(case), rng=None)
+        assert_same_result(result_a, result_b)
+
+    assert gc2.CACHE.hits == 2
+    assert gc2.CACHE.misses == 2
+
+
+def test_contact_tracker():
+    for case in [case1, case2]:
+
+        def solve(legs, tracker=None):
+            rng = random.Random(case.description)
+            return gc2.compute_orientation_properties(legs, rng=rng, tracker=tracker)
+
+        legs = make_legs(case)
+        tracker = ContactTracker()
+        expected = solve(legs)
+
+        # Nothing to start from, same as the full search
+        assert_same_result(solve(legs, tracker), expected)
+        assert (tracker.hits, tracker.misses) == (0, 1)
+
+        # The same legs, the trio it remembers is checked first
+        assert_same_result(solve(legs, tracker), expected)
+        assert (tracker.hits, tracker.misses) == (1, 1)
+
+
+def test_deterministic_solver_ignores_tracker():
+    # All feet are on the ground, many trios are stable
+    legs = VirtualHexapod(case1.given_dimensions).legs
+    gc2.CACHE.clear()
+    expected = gc2.compute_orientation_properties(legs, rng=None)
+
+    for leg_trio in gc2.ADJACENT_LEG_TRIOS:
+        # Whichever call fills the cache first
+        gc2.CACHE.clear()
+        tracker = ContactTracker()
+        tracker.remember(leg_trio, (3, 3, 3))
+        found = gc2.compute_orientation_properties(legs, rng=None, tracker=tracker)
+        assert_same_result(found, expected)
+        assert (tracker.hits, tracker.near_hits, tracker.misses) == (0, 0, 0)
+
+
+def test_tracker_is_forgotten_by_reset():
+    hexapod = VirtualHexapod(case1.given_dimensions)
+    hexapod.update(case1.given_poses, assume_ground_targets=False)
+    assert hexapod.contact_tracker.leg_trio is not None
+
+    hexapod.reset()
+    assert hexapod.contact_tracker.leg_trio is None
+
+    hexapod.update(case1.given_poses, assume_ground_targets=False)
+    hexapod.reconfigure(case2.given_dimensions)
+    assert hexapod.contact_tracker.leg_trio is None
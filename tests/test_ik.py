@@ -1,9 +1,31 @@
 from copy import deepcopy
+import numpy as np
+import pytest
+from settings import ALPHA_MAX_ANGLE
 from hexapod.const import BASE_DIMENSIONS
-from hexapod.models import VirtualHexapod
+from hexapod.models import (
+    VirtualHexapod,
+    STANCE_CACHE,
+    make_stance_poses,
+    pose_unstable_msg,
+)
 from hexapod.points import Vector
 from hexapod.ik_solver import ik_solver, ik_solver2
 from hexapod.ik_solver.shared import update_hexapod_points
+from hexapod.ik_solver.recompute_hexapod import (
+    recompute_hexapod,
+    recompute_hexapod_in_place,
+)
+from hexapod.ik_solver.ik_kernel import (
+    IK_PARAMETER_NAMES,
+    compute_ik,
+    first_alerts,
+    ik_parameters_to_array,
+    inverse_kinematics_batch,
+)
+from hexapod.ik_solver.helpers import IKStatus, ik_status_alert_msg
+from hexapod.ik_solver.reachability import build_reachability_index
+from hexapod.ik_solver.ik_trajectory import ik_trajectory
 
 from tests.ik_cases import case1, case2, case3
 from tests.helpers import assert_poses_equal, assert_two_hexapods_equal
@@ -48,6 +70,229 @@ def test_points_ik2_dont_assume_ground_targets():
         assert_ik_points(case, False)
 
 
+def test_ik_kernel():
+    for case in CASES:
+        angles, status = compute_ik(case.given_dimensions, case.given_ik_parameters)
+        assert np.all(status <= IKStatus.IN_THE_AIR), case.description
+
+        for i, pose in case.correct_poses.items():
+            correct = pose["coxia"], pose["femur"], pose["tibia"]
+            assert np.allclose(angles[i], correct), case.description
+
+
+def test_ik_kernel_status():
+    ik_parameters = dict(case1.given_ik_parameters, percent_z=-2)
+    _, status = compute_ik(case1.given_dimensions, ik_parameters)
+    assert np.all(status == IKStatus.BODY_ON_GROUND)
+
+    ik_parameters = dict(case1.given_ik_parameters, hip_stance=100)
+    _, status = compute_ik(case1.given_dimensions, ik_parameters)
+    assert np.all(status == IKStatus.STANCE_OUT_OF_RANGE)
+
+
+def test_ik_batch():
+    rng = np.random.default_rng(0)
+    limits = [45, 90, 0.5, 0.5, 0.5, 15, 15, 15]
+    for case in CASES:
+        params = rng.uniform(-1, 1, (50, 8)) * limits
+        params[0] = ik_parameters_to_array([case.given_ik_parameters])[0]
+        angles, valid, codes = inverse_kinematics_batch(case.given_dimensions, params)
+        assert valid[0], case.description
+
+        for row, row_angles, row_valid, code in zip(params, angles, valid, codes):
+            ik_parameters = dict(zip(IK_PARAMETER_NAMES, row))
+            expected_angles, status = compute_ik(case.given_dimensions, ik_parameters)
+            assert code == first_alerts(status), case.description
+            assert row_valid == (code == IKStatus.OK), case.description
+            if row_valid:
+                assert np.allclose(row_angles, expected_angles), case.description
+
+
+def test_try_inverse_kinematics_update():
+    rng = np.random.default_rng(2)
+    limits = [60, 120, 1, 1, 1, 30, 30, 30]
+    for case in CASES:
+        params = rng.uniform(-1, 1, (50, 8)) * limits
+        # A hip stance beyond the range of motion
+        params[0, 0] = ALPHA_MAX_ANGLE + 1
+        _, _, codes = inverse_kinematics_batch(case.given_dimensions, params)
+
+        for row, code in zip(params, codes):
+            ik_parameters = dict(zip(IK_PARAMETER_NAMES, row.tolist()))
+            hexapod = VirtualHexapod(case.given_dimensions)
+            result = ik_solver2.try_inverse_kinematics_update(hexapod, ik_parameters)
+            assert result.status == code, case.description
+
+            try:
+                poses, _ = ik_solver2.inverse_kinematics_update(
+                    VirtualHexapod(case.given_dimensions), ik_parameters
+                )
+            except Exception as alert:
+                assert not result.ok, case.description
+                assert result.message == str(alert), case.description
+                continue
+
+            assert result.ok and result.message is None, case.description
+            assert_poses_equal(result.value[0], poses, case.description)
+
+
+def test_ik_alerts_are_the_alerts_of_the_leg_by_leg_solver():
+    for hip_stance, leg_stance in [(ALPHA_MAX_ANGLE + 1, 0), (0, 200), (-100, -200)]:
+        ik_parameters = dict(
+            zip(IK_PARAMETER_NAMES, [hip_stance, leg_stance] + [0] * 6)
+        )
+        result = ik_solver2.try_inverse_kinematics_update(
+            VirtualHexapod(BASE_DIMENSIONS), ik_parameters
+        )
+        assert result.status == IKStatus.STANCE_OUT_OF_RANGE
+        with pytest.raises(Exception) as alert:
+            ik_solver.inverse_kinematics_update(
+                VirtualHexapod(BASE_DIMENSIONS), ik_parameters
+            )
+        assert result.message == str(alert.value)
+
+    unstable = ik_status_alert_msg(IKStatus.UNSTABLE, "right-middle", (0, 0, 0), [])
+    assert unstable == pose_unstable_msg()
+
+
+def test_recompute_hexapod_in_place():
+    rng = np.random.default_rng(1)
+    limits = [45, 90, 0.5, 0.5, 0.5, 15, 15, 15]
+    for case in CASES:
+        params = rng.uniform(-1, 1, (20, 8)) * limits
+        _, valid, _ = inverse_kinematics_batch(case.given_dimensions, params)
+        all_ik_parameters = [case.given_ik_parameters] + [
+            dict(zip(IK_PARAMETER_NAMES, row)) for row in params[valid]
+        ]
+
+        for ik_parameters in all_ik_parameters:
+            hexapod = VirtualHexapod(case.given_dimensions)
+            poses, hexapod = ik_solver2.inverse_kinematics_update(
+                hexapod, ik_parameters
+            )
+            args = case.given_dimensions, ik_parameters, poses
+            try:
+                expected = recompute_hexapod(*args)
+            except Exception:
+                with pytest.raises(Exception):
+                    recompute_hexapod_in_place(*args, hexapod)
+                continue
+
+            result = recompute_hexapod_in_place(*args, hexapod)
+
+            assert_two_hexapods_equal(result, expected, case.description)
+            names = [point.name for point in result.ground_contacts]
+            assert names == [point.name for point in expected.ground_contacts]
+            for axis, expected_axis in zip(
+                (result.x_axis, result.y_axis, result.z_axis),
+                (expected.x_axis, expected.y_axis, expected.z_axis),
+            ):
+                assert np.allclose(axis.vec, expected_axis.vec), case.description
+
+
+def test_reachability_index(tmp_path):
+    strides = dict(hip_stance=30, leg_stance=30, rot_x=16, rot_y=16, rot_z=16)
+    strides.update(percent_x=20, percent_y=20, percent_z=20)
+    index = build_reachability_index(
+        case1.given_dimensions, tmp_path / "index", strides, chunk_size=1000
+    )
+    assert index.codes.shape == (3, 5, 3, 3, 3, 3, 3, 3)
+
+    feasible = np.unpackbits(index.feasible)[: index.codes.size]
+    assert np.array_equal(feasible, index.codes.reshape(-1) == IKStatus.OK)
+
+    rng = np.random.default_rng(2)
+    some_grid_ids = list(zip(*[rng.integers(0, n, 50) for n in index.codes.shape]))
+    some_grid_ids += np.argwhere(index.codes == IKStatus.OK)[::10].tolist()
+    for grid_ids in some_grid_ids:
+        values = [axis[i] for axis, i in zip(index.axes, grid_ids)]
+        ik_parameters = dict(zip(IK_PARAMETER_NAMES, values))
+        try:
+            _, status = compute_ik(case1.given_dimensions, ik_parameters)
+        except ValueError:
+            # A cosine out of [-1, 1] because of rounding errors
+            # (inverse_kinematics_batch clips it)
+            continue
+
+        assert index.status(ik_parameters) == first_alerts(status)
+        assert index.is_feasible(ik_parameters) == (first_alerts(status) == IKStatus.OK)
+
+    base = dict(zip(IK_PARAMETER_NAMES, [0] * 8))
+    assert index.is_feasible(base)
+    low, high = index.feasible_range("percent_z", base)
+    assert low <= 0 <= high
+
+
+def assert_same_stance(hexapod, expected, description):
+    assert np.array_equal(hexapod.points, expected.points), description
+    names = [point.name for point in hexapod.ground_contacts]
+    assert names == [point.name for point in expected.ground_contacts], description
+    for leg, expected_leg in zip(hexapod.legs, expected.legs):
+        assert leg.ground_contact().name == expected_leg.ground_contact().name
+        assert leg.coxia_angle() == expected_leg.coxia_angle(), description
+    assert hexapod.z_axis.vec == expected.z_axis.vec, description
+    assert hexapod.body_rotation_frame is None, description
+    assert hexapod.contact_tracker.leg_trio is None, description
+
+
+def make_trajectory(rng, count):
+    # Small steps of the body, the stance changes every 10 frames
+    limits = np.array([45, 90, 0.5, 0.5, 0.5, 15, 15, 15])
+    steps = rng.uniform(-0.05, 0.05, (count, 8)) * limits
+    steps[np.arange(count) % 10 != 0, :2] = 0
+    params = np.clip(np.cumsum(steps, axis=0), -limits, limits)
+    return [dict(zip(IK_PARAMETER_NAMES, row)) for row in params.tolist()]
+
+
+def test_ik_trajectory():
+    rng = np.random.default_rng(3)
+    for case in CASES:
+        trajectory = make_trajectory(rng, 100)
+        frames = ik_trajectory(case.given_dimensions, trajectory)
+
+        for ik_parameters, (angles, status) in zip(trajectory, frames):
+            expected_angles, expected_status = compute_ik(
+                case.given_dimensions, ik_parameters
+            )
+            assert np.array_equal(status, expected_status), case.description
+            assert np.array_equal(angles, expected_angles), case.description
+
+        assert frames.frame_count == len(trajectory)
+        # The stance changes every 10 frames
+        assert frames.stance_count == 10
+
+
+def test_ik_trajectory_cancel():
+    trajectory = make_trajectory(np.random.default_rng(4), 20)
+    frames = ik_trajectory(BASE_DIMENSIONS, iter(trajectory))
+    for i, _ in enumerate(frames):
+        if i == 4:
+            frames.cancel()
+
+    assert frames.frame_count == 5
+    assert list(frames) == []
+
+
+def test_stance_is_cached():
+    STANCE_CACHE.clear()
+    for case in CASES:
+        hip_stance = case.given_ik_parameters["hip_stance"]
+        leg_stance = case.given_ik_parameters["leg_stance"]
+        expected = VirtualHexapod(case.given_dimensions)
+        expected.update_stance(hip_stance, leg_stance)
+
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hits = STANCE_CACHE.hits
+        for _ in range(2):
+            ik_solver2.inverse_kinematics_update(hexapod, case.given_ik_parameters)
+            # The tracker of the hexapod remembers the ground contacts
+            hexapod.update(make_stance_poses(0, 0), assume_ground_targets=False)
+            hexapod.reset_stance(hip_stance, leg_stance)
+            assert_same_stance(hexapod, expected, case.description)
+
+        assert STANCE_CACHE.hits == hits + 3, case.description
+
+
 def test_shared_set_points():
     points = [
         Vector(1, 2, 3, "a"),
@@ -58,5 +303,6 @@ def test_shared_set_points():
 
     vh = VirtualHexapod(BASE_DIMENSIONS)
     update_hexapod_points(vh, 1, points)
-    for leg_point, point in zip(vh.legs[1].all_points, points):
+    for i, (leg_point, point) in enumerate(zip(vh.legs[1].all_points, points)):
         assert leg_point is point
+        assert leg_point.vec == tuple(vh.points[4 + i])
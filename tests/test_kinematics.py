@@ -1,4 +1,13 @@
-from hexapod.models import VirtualHexapod
+from copy import deepcopy
+import numpy as np
+from hexapod.models import PoseStatus, VirtualHexapod
+from hexapod.linkage import LEG_POINTS_CACHE
+from hexapod.pool import HEXAPOD_POOL
+from hexapod.kinematics import (
+    batch_forward,
+    batch_forward_with_status,
+    poses_to_angles,
+)
 from tests.kinematics_cases import case1, case2
 from tests.helpers import assert_hexapod_points_equal
 
@@ -17,3 +26,143 @@ def test_sample_kinematics():
     for case in CASES:
         assert_kinematics(case, True)
         assert_kinematics(case, False)
+
+
+def test_batch_forward():
+    angles = np.array([poses_to_angles(case.given_poses) for case in CASES])
+
+    for i, case in enumerate(CASES):
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hexapod.update(case.given_poses)
+        points = batch_forward(case.given_dimensions, angles)[i]
+
+        for leg, leg_points in zip(hexapod.legs, points):
+            expected = [point.vec for point in leg.all_points]
+            assert np.allclose(expected, leg_points), case.description
+
+
+def test_batch_forward_with_status():
+    rng = np.random.default_rng(0)
+    for case in CASES:
+        angles = rng.uniform(-1, 1, (50, 6, 3)) * [100, 120, 120]
+        angles[0] = poses_to_angles(case.given_poses)
+        points, status = batch_forward_with_status(case.given_dimensions, angles)
+        assert status[0] == PoseStatus.OK, case.description
+
+        for row_angles, row_points, row_status in zip(angles, points, status):
+            poses = deepcopy(case.given_poses)
+            for pose in poses.values():
+                pose["coxia"], pose["femur"], pose["tibia"] = row_angles[pose["id"]]
+
+            hexapod = VirtualHexapod(case.given_dimensions)
+            result = hexapod.try_update(poses)
+            assert result.status == row_status, case.description
+            assert np.isnan(row_points).all() == (not result.ok), case.description
+
+
+def test_ground_contact_ids():
+    joint_names = ["body-contact", "coxia", "femur", "tibia"]
+    for case in CASES:
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hexapod.update(case.given_poses)
+
+        for (leg_id, joint_id), point in zip(
+            hexapod.ground_contact_ids, hexapod.ground_contacts
+        ):
+            leg = hexapod.legs[leg_id]
+            assert point.name == f"{leg.name}-{joint_names[joint_id]}"
+            assert leg.ground_contact() is leg.all_points[joint_id]
+            assert np.array_equal(point.vec, hexapod.points[4 * leg_id + joint_id])
+
+
+def test_points_are_views_of_hexapod_points():
+    case = case1
+    hexapod = deepcopy(VirtualHexapod(case.given_dimensions))
+    hexapod.update(case.given_poses)
+
+    for i, leg in enumerate(hexapod.legs):
+        assert np.array_equal(leg.points_array, hexapod.points[4 * i : 4 * i + 4])
+        assert leg.body_contact().vec == hexapod.body.vertices[i].vec
+
+    hexapod.move_xyz(1, 2, 3)
+    assert hexapod.body.cog.vec == tuple(hexapod.points[24])
+    assert hexapod.legs[5].foot_tip().vec == tuple(hexapod.points[23])
+
+
+def test_leg_points_are_cached_across_hexapods():
+    case = case1
+    LEG_POINTS_CACHE.clear()
+    first = VirtualHexapod(case.given_dimensions)
+    first.update(case.given_poses)
+    misses = LEG_POINTS_CACHE.misses
+
+    second = VirtualHexapod(case.given_dimensions)
+    second.update(case.given_poses)
+
+    assert LEG_POINTS_CACHE.misses == misses
+    assert LEG_POINTS_CACHE.hits >= VirtualHexapod.LEG_COUNT
+    assert np.array_equal(first.points, second.points)
+
+
+def test_reset_and_reconfigure():
+    hexapod = VirtualHexapod(case1.given_dimensions)
+    for case in CASES:
+        hexapod.update(case.given_poses)
+        hexapod.reconfigure(case.given_dimensions)
+        assert np.array_equal(
+            hexapod.points, VirtualHexapod(case.given_dimensions).points
+        )
+
+        hexapod.update(case.given_poses)
+        assert_hexapod_points_equal(
+            hexapod, case.correct_body_points, case.correct_leg_points, case.description
+        )
+
+        hexapod.reset()
+        assert np.array_equal(
+            hexapod.points, VirtualHexapod(case.given_dimensions).points
+        )
+
+
+def test_update_only_poses_changed_legs():
+    rng = np.random.default_rng(5)
+    for case in CASES:
+        hexapod = VirtualHexapod(case.given_dimensions)
+        poses = deepcopy(case.given_poses)
+        hexapod.update(poses)
+        for step in range(30):
+            # Change one joint at a time, as the kinematics page does
+            pose = poses[int(rng.integers(6))]
+            joint_name = ["coxia", "femur", "tibia"][step % 3]
+            pose[joint_name] = float(rng.uniform(-30, 30))
+
+            hexapod.reset()
+            posed, kept = hexapod.legs_posed, hexapod.legs_kept
+            hexapod.update(poses)
+            assert hexapod.legs_posed == posed + 1, case.description
+            assert hexapod.legs_kept == kept + 5, case.description
+
+            expected = VirtualHexapod(case.given_dimensions)
+            expected.update(poses)
+            assert np.array_equal(hexapod.points, expected.points), case.description
+            assert hexapod.ground_contact_ids == expected.ground_contact_ids
+
+
+def test_update_info_of_kinematics_page_updates():
+    # As the kinematics page does, drag one joint of a hexapod from the pool
+    dimensions = case1.given_dimensions
+    HEXAPOD_POOL.clear()
+    poses = deepcopy(case1.given_poses)
+    for step in range(20):
+        poses[1]["femur"] += 1
+        with HEXAPOD_POOL.borrow(dimensions) as hexapod:
+            tracker = HEXAPOD_POOL.contact_tracker(dimensions)
+            hexapod.update(poses, assume_ground_targets=False, contact_tracker=tracker)
+            info = hexapod.update_info(tracker)
+
+    # Only the leg of the joint is posed again after the first update
+    assert (info["legs_posed"], info["legs_kept"]) == (6 + 19, 5 * 19)
+    # and the ground plane of the update before is checked first
+    contacts = info["ground_contacts"]
+    assert contacts["misses"] == 1
+    assert contacts["hits"] + contacts["near_hits"] == 19
@@ -0,0 +1,66 @@
+import base64
+from copy import deepcopy
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.plotter import HexapodPlotter, encode_array
+from hexapod.const import BASE_FIGURE
+from tests.kinematics_cases import case1, case2
+
+CASES = [case1, case2]
+
+
+def extend_traces(figure, updates, trace_ids, max_points):
+    # What Plotly.extendTraces does with the extendData of a dcc.Graph
+    for axis, values in updates.items():
+        for trace_id, new_values, max_count in zip(trace_ids, values, max_points[axis]):
+            trace = figure["data"][trace_id]
+            trace[axis] = (list(trace[axis]) + new_values)[-max_count:]
+
+
+def test_plotter_extend_data():
+    for case in CASES:
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hexapod.update(case.given_poses)
+        expected = deepcopy(BASE_FIGURE)
+        HexapodPlotter.update(expected, hexapod)
+
+        # The figure of the same dimensions in another pose
+        figure = deepcopy(BASE_FIGURE)
+        HexapodPlotter.update(figure, VirtualHexapod(case.given_dimensions))
+        extend_traces(figure, *HexapodPlotter.extend_data(hexapod))
+        assert figure["data"] == expected["data"], case.description
+
+
+def test_plotter_payload():
+    for case in CASES:
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hexapod.update(case.given_poses)
+        payload = HexapodPlotter.make_payload(hexapod)
+
+        points = decode_array(payload["points"]).reshape(-1, 3)
+        assert np.allclose(points, hexapod.points, atol=1e-3), case.description
+        contacts = [point.vec for point in hexapod.ground_contacts]
+        assert np.allclose(points[payload["contacts"]], contacts, atol=1e-3)
+        assert len(decode_array(payload["axes"])) == 9, case.description
+
+
+def decode_array(encoded):
+    # What assets/hexapod_figure.js does with the arrays of the payload
+    if isinstance(encoded, list):
+        return np.array(encoded)
+    dtype = np.dtype(encoded["dtype"]).newbyteorder("<")
+    values = np.frombuffer(base64.b64decode(encoded["data"]), dtype)
+    return values * encoded.get("scale", 1)
+
+
+def test_encode_array():
+    values = np.random.default_rng(6).uniform(-1000, 1000, 78)
+    assert encode_array(values, "json") == values.tolist()
+
+    decoded = decode_array(encode_array(values, "float32"))
+    assert np.allclose(decoded, values, rtol=1e-6)
+
+    for precision, dtype in [(0.01, "int32"), (0.1, "int16")]:
+        encoded = encode_array(values, "fixed", precision)
+        assert encoded["dtype"] == dtype
+        assert np.all(np.abs(decode_array(encoded) - values) <= precision / 2 + 1e-9)
@@ -0,0 +1,62 @@
+import numpy as np
+from hexapod.points import (
+    Vector,
+    rotx,
+    roty,
+    rotz,
+    frame_rotxyz,
+    frame_rotxyz_batch,
+    frame_yrotate_xtranslate,
+    frame_yrotate_xtranslate_batch,
+    frame_zrotate_xytranslate,
+    frame_zrotate_xytranslate_batch,
+    frame_to_align_vector_a_to_b,
+    frame_to_align_vector_a_to_b_batch,
+    get_unit_vector,
+)
+
+ANGLES = [(-170.0, 33.5, 12.0), (0.0, 0.0, 0.0), (90.0, -45.0, 179.0)]
+
+
+def test_closed_form_frames():
+    for a, b, c in ANGLES:
+        expected = np.matmul(np.matmul(rotx(a), roty(b)), rotz(c))
+        assert np.allclose(frame_rotxyz(a, b, c), expected)
+
+        out = np.empty((4, 4))
+        assert frame_rotxyz(a, b, c, out=out) is out
+        assert np.allclose(out, expected)
+
+
+def test_batch_frames():
+    a, b, c = np.array(ANGLES).T
+    rotxyz = frame_rotxyz_batch(a, b, c)
+    yrotate = frame_yrotate_xtranslate_batch(a, b)
+    zrotate = frame_zrotate_xytranslate_batch(a, b, c)
+
+    for i, (ai, bi, ci) in enumerate(ANGLES):
+        assert np.allclose(rotxyz[i], frame_rotxyz(ai, bi, ci))
+        assert np.allclose(yrotate[i], frame_yrotate_xtranslate(ai, bi))
+        assert np.allclose(zrotate[i], frame_zrotate_xytranslate(ai, bi, ci))
+
+
+def test_frame_to_align_vector_a_to_b():
+    z_axis = Vector(0, 0, 1)
+    vectors = [get_unit_vector(Vector(0.1, -0.2, 1)), Vector(0, 0, 1)]
+    frames = frame_to_align_vector_a_to_b_batch([v.vec for v in vectors], z_axis.vec)
+
+    for v, frame in zip(vectors, frames):
+        expected = frame_to_align_vector_a_to_b(v, z_axis)
+        assert np.allclose(frame, expected)
+        assert np.allclose(np.matmul(expected[:3, :3], v.vec), z_axis.vec)
+
+
+def test_snapshot_is_not_a_view():
+    array = np.array([[1.0, 2.0, 3.0]])
+    point = Vector.view(array, 0, "p")
+    snapshot = point.snapshot()
+    array += 1
+
+    assert snapshot.vec == (1.0, 2.0, 3.0)
+    assert snapshot.name == "p"
+    assert point.vec == (2.0, 3.0, 4.0)
@@ -0,0 +1,84 @@
+import random
+from copy import deepcopy
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.pool import HEXAPOD_POOL, HexapodPool
+from hexapod.ground_contact_solver.tracker import ContactTracker
+from tests.kinematics_cases import case1, case2
+
+
+def test_pool_reuses_hexapods():
+    pool = HexapodPool(maxsize=1)
+    with pool.borrow(case1.given_dimensions) as hexapod:
+        hexapod.update(case1.given_poses)
+
+    with pool.borrow(case2.given_dimensions) as other:
+        assert other is hexapod
+        assert np.array_equal(
+            other.points, VirtualHexapod(case2.given_dimensions).points
+        )
+
+        with pool.borrow(case2.given_dimensions) as another:
+            assert another is not other
+
+    assert pool.info() == {"built": 2, "reused": 1, "idle": 1, "maxsize": 1}
+
+
+def test_borrowed_hexapod_is_a_new_hexapod():
+    # Whatever the updates of the hexapod before it was returned to the pool
+    rng = np.random.default_rng(7)
+    pool = HexapodPool(maxsize=1)
+    for assume_ground_targets in [True, False]:
+        for step in range(100):
+            poses = deepcopy(case1.given_poses)
+            for pose in poses.values():
+                pose["coxia"], pose["femur"], pose["tibia"] = rng.uniform(-40, 40, 3)
+
+            # The same shuffled leg trios when the tie break is random
+            random.seed(step)
+            expected = VirtualHexapod(case1.given_dimensions)
+            expected_result = expected.try_update(poses, assume_ground_targets)
+
+            with pool.borrow(case1.given_dimensions) as hexapod:
+                random.seed(step)
+                result = hexapod.try_update(poses, assume_ground_targets)
+                assert result.status == expected_result.status
+                assert np.array_equal(hexapod.points, expected.points)
+                assert hexapod.ground_contact_ids == expected.ground_contact_ids
+
+
+def drag_one_joint(poses, step_count):
+    # The poses of each step, the femur of one leg moves by a degree at each step
+    for step in range(step_count):
+        poses = deepcopy(poses)
+        poses[1]["femur"] += 1
+        yield poses
+
+
+def test_pool_tracks_ground_contacts_of_borrowed_hexapods():
+    dimensions = case1.given_dimensions
+    HEXAPOD_POOL.clear()
+    tracker = HEXAPOD_POOL.contact_tracker(dimensions)
+    assert HEXAPOD_POOL.contact_tracker(dimensions) is tracker
+
+    for poses in drag_one_joint(case1.given_poses, 20):
+        with HEXAPOD_POOL.borrow(dimensions) as hexapod:
+            tracker = HEXAPOD_POOL.contact_tracker(dimensions)
+            last_trios = tracker.leg_trio, tracker.joint_trio
+
+            # A new hexapod given a tracker in the same state
+            expected = VirtualHexapod(dimensions)
+            expected_tracker = ContactTracker()
+            if tracker.leg_trio is not None:
+                expected_tracker.remember(*last_trios)
+
+            random.seed(0)
+            expected.update(poses, False, expected_tracker)
+            random.seed(0)
+            hexapod.update(poses, False, tracker)
+            assert np.array_equal(hexapod.points, expected.points)
+            assert hexapod.ground_contact_ids == expected.ground_contact_ids
+
+    assert HEXAPOD_POOL.info()["built"] == 1
+    assert tracker.misses == 1
+    assert tracker.hit_rate > 0.9
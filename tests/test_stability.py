@@ -0,0 +1,93 @@
+from itertools import combinations
+import numpy as np
+from hexapod.models import VirtualHexapod
+from hexapod.points import Vector
+from hexapod.kinematics import batch_forward, poses_to_angles
+from hexapod.ground_contact_solver.shared import is_stable
+from hexapod.stability import (
+    compute_stability,
+    find_ground_contacts,
+    find_stability_margins,
+    find_support_polygons,
+    hexapod_stability,
+)
+from tests.kinematics_cases import case1, case2
+
+CASES = [case1, case2]
+
+
+def test_support_polygon():
+    # A square of four legs on the ground, (1, 1) inside it is not a vertex
+    contacts = np.array(
+        [[10, 0, 0], [10, 10, 0], [-10, 10, 0], [1, 1, 0], [-10, -10, 0], [10, -10, 0]]
+    )
+    on_ground = np.array([False, True, True, True, True, True])
+    polygon = find_support_polygons(contacts, on_ground)
+    assert polygon.tolist() == [4, 5, 1, 2, -1, -1]
+
+    cog = np.array([[5, 0, 50], [0, 0, 50], [15, 0, 50]])
+    margins = find_stability_margins(contacts, polygon, cog)
+    assert np.allclose(margins, [5, 10, -5])
+
+    # Less than three legs on the ground
+    on_ground[2:] = False
+    polygon = find_support_polygons(contacts, on_ground)
+    assert np.isnan(find_stability_margins(contacts, polygon, cog[0]))
+
+
+def test_stability_margins():
+    rng = np.random.default_rng(0)
+    for case in CASES:
+        angles = rng.uniform(-1, 1, (20, 6, 3)) * [30, 60, 60]
+        angles[0] = poses_to_angles(case.given_poses)
+        points = batch_forward(case.given_dimensions, angles)
+        polygons, margins = compute_stability(points)
+
+        hexapod = VirtualHexapod(case.given_dimensions)
+        hexapod.update(case.given_poses)
+        polygon, margin = hexapod_stability(hexapod)
+        assert polygon.tolist() == polygons[0].tolist(), case.description
+        assert np.isclose(margin, margins[0]) and margin > 0, case.description
+
+        for row_points, row_polygon, row_margin in zip(points, polygons, margins):
+            polygon, margin = compute_stability(row_points)
+            assert polygon.tolist() == row_polygon.tolist(), case.description
+            assert np.isclose(margin, row_margin, equal_nan=True), case.description
+
+
+def test_margin_sign_agrees_with_is_stable():
+    # The projection of a point on the ground is inside the support polygon
+    # if it is inside a triangle of three legs on the ground
+    rng = np.random.default_rng(1)
+    checked = {True: 0, False: 0}
+    for case in CASES:
+        for _ in range(50):
+            angles = rng.uniform(-1, 1, (6, 3)) * [30, 60, 60]
+            poses = {
+                i: dict(pose, coxia=alpha, femur=beta, tibia=gamma)
+                for (i, pose), (alpha, beta, gamma) in zip(
+                    case.given_poses.items(), angles.tolist()
+                )
+            }
+            hexapod = VirtualHexapod(case.given_dimensions)
+            if not hexapod.try_update(poses).ok:
+                continue
+
+            leg_points = hexapod.points[:24].reshape(6, 4, 3)
+            contacts, on_ground = find_ground_contacts(leg_points)
+            polygon = find_support_polygons(contacts, on_ground)
+
+            # The center of gravity and points on the ground around the hexapod
+            cog = hexapod.body.cog
+            for x, y in [(cog.x, cog.y)] + rng.uniform(-300, 300, (20, 2)).tolist():
+                margin = find_stability_margins(contacts, polygon, (x, y, 0))
+                # is_stable tells if the origin is inside, within a tolerance
+                if abs(margin) <= 0.2:
+                    continue
+
+                points = [Vector(*(p - (x, y, 0))) for p in contacts[on_ground]]
+                stable = any(is_stable(*trio) for trio in combinations(points, 3))
+                assert (margin > 0) == stable, case.description
+                checked[stable] += 1
+
+    assert min(checked.values()) > 100
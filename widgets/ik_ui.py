@@ -10,13 +10,8 @@ from style_settings import (
     SLIDER_COLOR,
     IK_SLIDER_SIZE,
 )
-from settings import (
-    UPDATE_MODE,
-    BODY_MAX_ANGLE,
-    HIP_STANCE_MAX_ANGLE,
-    LEG_STANCE_MAX_ANGLE,
-    SLIDER_ANGLE_RESOLUTION,
-)
+from settings import UPDATE_MODE
+from hexapod.const import IK_SLIDER_RANGES
 
 
 def make_row(divs):
@@ -26,7 +21,8 @@ def make_row(divs):
     return html.Div(widgets, style=row_style)
 
 
-def make_translate_slider(name, slider_label):
+def make_translate_slider(name, slider_label, slider_range):
+    min_value, max_value, step = slider_range
     handle_style = {
         "showCurrentValue": True,
         "color": SLIDER_HANDLE_COLOR,
@@ -35,10 +31,10 @@ def make_translate_slider(name, slider_label):
 
     return dash_daq.Slider(  # pylint: disable=not-callable
         id=name,
-        min=-1.0,
-        max=1.0,
+        min=min_value,
+        max=max_value,
         value=0.05,
-        step=0.05,
+        step=step,
         vertical=True,
         size=IK_SLIDER_SIZE,
         updatemode=UPDATE_MODE,
@@ -48,7 +44,8 @@ def make_translate_slider(name, slider_label):
     )
 
 
-def make_rotate_slider(name, slider_label, max_angle=BODY_MAX_ANGLE):
+def make_rotate_slider(name, slider_label, slider_range):
+    min_value, max_value, step = slider_range
     handle_style = {
         "showCurrentValue": True,
         "color": SLIDER_HANDLE_COLOR,
@@ -56,10 +53,10 @@ def make_rotate_slider(name, slider_label, max_angle=BODY_MAX_ANGLE):
     }
     return dash_daq.Slider(  # pylint: disable=not-callable
         id=name,
-        min=-max_angle,
-        max=max_angle,
+        min=min_value,
+        max=max_value,
         value=1.5,
-        step=SLIDER_ANGLE_RESOLUTION,
+        step=step,
         vertical=True,
         size=IK_SLIDER_SIZE,
         updatemode=UPDATE_MODE,
@@ -87,19 +84,25 @@ IK_WIDGETS_IDS = [
 IK_CALLBACK_INPUTS = [Input(input_id, "value") for input_id in IK_WIDGETS_IDS]
 
 w_hips = make_rotate_slider(
-    IK_WIDGETS_IDS[0], "start\nhip.stance", HIP_STANCE_MAX_ANGLE
+    IK_WIDGETS_IDS[0], "start\nhip.stance", IK_SLIDER_RANGES["hip_stance"]
 )
 w_legs = make_rotate_slider(
-    IK_WIDGETS_IDS[1], "start\nleg.stance", LEG_STANCE_MAX_ANGLE
+    IK_WIDGETS_IDS[1], "start\nleg.stance", IK_SLIDER_RANGES["leg_stance"]
 )
 
-w_tx = make_translate_slider(IK_WIDGETS_IDS[2], "percent.x")
-w_ty = make_translate_slider(IK_WIDGETS_IDS[3], "percent.y")
-w_tz = make_translate_slider(IK_WIDGETS_IDS[4], "percent.z")
+w_tx = make_translate_slider(
+    IK_WIDGETS_IDS[2], "percent.x", IK_SLIDER_RANGES["percent_x"]
+)
+w_ty = make_translate_slider(
+    IK_WIDGETS_IDS[3], "percent.y", IK_SLIDER_RANGES["percent_y"]
+)
+w_tz = make_translate_slider(
+    IK_WIDGETS_IDS[4], "percent.z", IK_SLIDER_RANGES["percent_z"]
+)
 
-w_rx = make_rotate_slider(IK_WIDGETS_IDS[5], "rot.x")
-w_ry = make_rotate_slider(IK_WIDGETS_IDS[6], "rot.y")
-w_rz = make_rotate_slider(IK_WIDGETS_IDS[7], "rot.z")
+w_rx = make_rotate_slider(IK_WIDGETS_IDS[5], "rot.x", IK_SLIDER_RANGES["rot_x"])
+w_ry = make_rotate_slider(IK_WIDGETS_IDS[6], "rot.y", IK_SLIDER_RANGES["rot_y"])
+w_rz = make_rotate_slider(IK_WIDGETS_IDS[7], "rot.z", IK_SLIDER_RANGES["rot_z"])
 
 row1 = make_row([w_hips, w_tx, w_ty, w_tz])
 row2 = make_row([w_legs, w_rx, w_ry, w_rz])